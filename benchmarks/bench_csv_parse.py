@@ -0,0 +1,90 @@
+"""Time how long Student.csv takes to parse with each engine and dtype setup.
+
+Generates Student.csv files of 10k, 100k and 1M rows in a temp folder and
+parses each one with pandas' default type inference, with the declared
+schema on the C engine, on pyarrow (when installed), and with only the
+Program Code column projected.
+
+    python benchmarks/bench_csv_parse.py [--rows 10000 100000 1000000] [--repeat 3]
+"""
+import argparse
+import importlib.util
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from csv_handler import TABLE_SCHEMAS
+
+SCHEMA = TABLE_SCHEMAS['Student.csv']
+
+FIRST_NAMES = ['Liam', 'Olivia', 'Noah', 'Emma', 'James', 'Ava', 'Lucas', 'Mia', 'Ethan', 'Zoey']
+LAST_NAMES = ['Santos', 'Reyes', 'Cruz', 'Garcia', 'Walker', 'Young', 'Wright', 'Roberts', 'Lim', 'Tan']
+GENDERS = ['Male', 'Female', 'Others']
+PROGRAM_CODES = [f'BS{code}' for code in ('CS', 'IT', 'IS', 'CA', 'ECE', 'CE', 'N', 'PSY', 'BIO', 'A')]
+
+
+def generate_students(rows, path):
+    rng = np.random.default_rng(151)
+    serials = np.arange(rows)
+    pd.DataFrame({
+        'ID Number': [f'{2020 + serial % 6}-{serial:07d}' for serial in serials],
+        # Suffixes keep most names distinct, as they are in a real registry
+        'First Name': rng.choice(FIRST_NAMES, rows) + rng.integers(0, 1000, rows).astype(str),
+        'Last Name': rng.choice(LAST_NAMES, rows) + rng.integers(0, 1000, rows).astype(str),
+        'Year Level': rng.integers(1, 5, rows),
+        'Gender': rng.choice(GENDERS, rows),
+        'Program Code': rng.choice(PROGRAM_CODES, rows)
+    }).to_csv(path, index=False)
+
+
+def parse_setups():
+    setups = [
+        ('c, inferred dtypes', {'engine': 'c'}),
+        ('c, schema', {'engine': 'c', 'dtype': SCHEMA}),
+        ('c, usecols=Program Code', {'engine': 'c', 'dtype': {'Program Code': 'category'}, 'usecols': ['Program Code']})
+    ]
+    if importlib.util.find_spec('pyarrow') is not None:
+        setups += [
+            ('pyarrow, schema', {'engine': 'pyarrow', 'dtype': SCHEMA}),
+            ('pyarrow, usecols=Program Code', {'engine': 'pyarrow', 'dtype': {'Program Code': 'category'}, 'usecols': ['Program Code']})
+        ]
+    return setups
+
+
+def best_time(path, options, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        df = pd.read_csv(path, **options)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, df.memory_usage(deep=True).sum()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Student.csv parse time per engine.")
+    parser.add_argument('--rows', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    parser.add_argument('--repeat', type=int, default=3, help="runs per setup, the best one is reported")
+    args = parser.parse_args()
+
+    if importlib.util.find_spec('pyarrow') is None:
+        print("pyarrow is not installed, only the C engine is measured")
+
+    with tempfile.TemporaryDirectory() as folder:
+        for rows in args.rows:
+            path = os.path.join(folder, f'Student-{rows}.csv')
+            generate_students(rows, path)
+            print(f"\n{rows:,} rows ({os.path.getsize(path) / 1e6:.1f} MB on disk)")
+            for name, options in parse_setups():
+                seconds, memory = best_time(path, options, args.repeat)
+                print(f"  {name:<32} {seconds * 1000:9.1f} ms  {memory / 1e6:8.1f} MB in memory")
+
+
+if __name__ == "__main__":
+    main()
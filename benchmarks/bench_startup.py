@@ -0,0 +1,99 @@
+"""Time how long the application takes to show its window and its first rows.
+
+Generates a Student.csv of each size in a temp folder (next to copies of the
+real Program.csv and College.csv) and starts the GUI in a fresh process for
+every run, so imports are paid each time. Reports, from process start:
+
+  imports      gui.py and its dependencies imported
+  first paint  the window painted for the first time
+  rows shown   the Students tab showing its rows
+
+The first run of each size parses the CSV; later runs load the binary
+snapshot the first one left in csv-files/.cache.
+
+    python benchmarks/bench_startup.py [--rows 10000 1000000] [--repeat 3]
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+from bench_csv_parse import generate_students
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Runs in the child process, with the temp folder as working directory
+CHILD = """
+import time
+start = time.perf_counter()
+import sys
+from PyQt6.QtCore import QEvent, QObject, QTimer
+from PyQt6.QtWidgets import QApplication
+import gui
+imported = time.perf_counter()
+
+app = QApplication(sys.argv)
+times = {'imports': imported - start}
+
+class FirstPaint(QObject):
+    def eventFilter(self, watched, event):
+        if event.type() == QEvent.Type.Paint and 'first paint' not in times:
+            times['first paint'] = time.perf_counter() - start
+        return False
+
+def check_rows():
+    if window.student_table.model().rowCount() > 0 and 'first paint' in times:
+        times['rows shown'] = time.perf_counter() - start
+        app.quit()
+
+window = gui.StudentInformationSystem()
+paint_filter = FirstPaint()
+window.installEventFilter(paint_filter)
+window.show()
+timer = QTimer()
+timer.timeout.connect(check_rows)
+timer.start(1)
+app.exec()
+window.worker.wait()
+print(json.dumps(times))
+"""
+
+
+def run_once(folder):
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    env.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    output = subprocess.run(
+        [sys.executable, '-c', 'import json\n' + CHILD], cwd=folder, env=env,
+        capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark time to first paint of the GUI.")
+    parser.add_argument('--rows', type=int, nargs='+', default=[10_000, 1_000_000])
+    parser.add_argument('--repeat', type=int, default=3, help="runs per size after the first, the best one is reported")
+    args = parser.parse_args()
+
+    for rows in args.rows:
+        with tempfile.TemporaryDirectory() as folder:
+            data = os.path.join(folder, 'csv-files')
+            os.makedirs(data)
+            for filename in ('Program.csv', 'College.csv'):
+                shutil.copy(os.path.join(ROOT, 'csv-files', filename), data)
+            generate_students(rows, os.path.join(data, 'Student.csv'))
+
+            first = run_once(folder)
+            runs = [run_once(folder) for _ in range(args.repeat)]
+            print(f"\n{rows:,} students")
+            for label, times in (('first run (CSV parsed)', first), ('snapshot loaded, best', None)):
+                if times is None:
+                    times = {name: min(run[name] for run in runs) for name in first}
+                print(f"  {label:<24} " + "  ".join(f"{name} {seconds * 1000:7.0f} ms" for name, seconds in times.items()))
+
+
+if __name__ == "__main__":
+    main()
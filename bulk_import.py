@@ -0,0 +1,86 @@
+import os
+
+import pandas as pd
+
+from csv_handler import TABLE_COLUMNS
+from student_handler import add_students
+from validation import REPEATED_ID_NUMBER, validate_students
+
+STUDENT_COLUMNS = TABLE_COLUMNS['Student.csv']
+
+# Rows read and validated at a time
+IMPORT_CHUNK_ROWS = 50000
+
+
+def rejects_path_for(path):
+    root, _ = os.path.splitext(path)
+    return f"{root}.rejects.csv"
+
+
+def import_students(path, rejects_path=None, chunk_rows=IMPORT_CHUNK_ROWS, progress=None):
+    """Import the students in the CSV at path.
+
+    The file is read in chunks and every row is checked by
+    validation.validate_students, the same checks the student dialog runs
+    on one row; an ID accepted from an earlier chunk counts as repeated.
+    Accepted rows are added with a single write; rejected rows are written
+    to rejects_path (next to the input by default) with their line number
+    and reason. progress(rows_read) is called after
+    each chunk. Returns (accepted, rejected, rejects_path).
+    """
+    rejects_path = rejects_path or rejects_path_for(path)
+    accepted_ids = set()
+
+    accepted = []
+    rejected = 0
+    rows_read = 0
+    if os.path.exists(rejects_path):
+        os.remove(rejects_path)
+    try:
+        reader = pd.read_csv(path, dtype=str, keep_default_na=False, chunksize=chunk_rows)
+        for chunk in reader:
+            missing_columns = [column for column in STUDENT_COLUMNS if column not in chunk.columns]
+            if missing_columns:
+                raise ValueError(f"{path} is missing the columns: {', '.join(missing_columns)}")
+            chunk = chunk[STUDENT_COLUMNS].apply(lambda column: column.str.strip())
+
+            reasons = validate_students(chunk)
+            reasons[(reasons == '') & chunk['ID Number'].isin(accepted_ids)] = REPEATED_ID_NUMBER
+            good = reasons == ''
+            accepted.append(chunk[good])
+            accepted_ids.update(chunk.loc[good, 'ID Number'])
+
+            bad = chunk[~good].copy()
+            if len(bad):
+                bad.insert(0, 'Line', bad.index + 2)  # 1-based, after the header line
+                bad['Reason'] = reasons[~good]
+                bad.to_csv(rejects_path, mode='a', index=False, header=rejected == 0)
+                rejected += len(bad)
+
+            rows_read += len(chunk)
+            if progress is not None:
+                progress(rows_read)
+    except Exception as e:
+        raise Exception(f"Error importing {path}: {e}")
+
+    added = add_students(pd.concat(accepted)) if accepted else 0
+    return added, rejected, rejects_path
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from storage import ensure_storage, flush
+
+    parser = argparse.ArgumentParser(description="Import students from a CSV file.")
+    parser.add_argument("path", help="CSV file with the columns: " + ", ".join(STUDENT_COLUMNS))
+    parser.add_argument("--rejects", help="where to write rejected rows (default: <path>.rejects.csv)")
+    parser.add_argument("--chunk-rows", type=int, default=IMPORT_CHUNK_ROWS, help="rows validated at a time")
+    args = parser.parse_args()
+
+    ensure_storage()
+    accepted, rejected, rejects_path = import_students(args.path, args.rejects, args.chunk_rows)
+    flush()
+    print(f"{accepted} students imported, {rejected} rejected")
+    if rejected:
+        print(f"Rejected rows were written to {rejects_path}")
@@ -0,0 +1,70 @@
+from PyQt6.QtCore import QStringListModel, Qt, pyqtSignal
+from PyQt6.QtWidgets import QComboBox, QCompleter
+
+import table_events
+
+
+class CodeListModel(QStringListModel):
+    """The codes of a reference table, shared by every picker that offers them.
+
+    The list is read on the storage worker the first time a picker asks for
+    it and kept until the table changes, so opening a dialog neither reads
+    the table nor builds an item per code: the pickers show this model
+    itself.
+    """
+
+    _table_changed = pyqtSignal()
+
+    def __init__(self, table, load_codes, worker, parent=None):
+        super().__init__(parent)
+        self._table = table
+        self._load_codes = load_codes
+        self._worker = worker
+        self._changes = 0        # table changes seen so far
+        self._loaded_at = None   # value of _changes when the current list was read
+        # Events may come from a worker thread; the signal hands them to the GUI thread
+        self._table_changed.connect(self._count_change)
+        listener = self._on_table_changed
+        table_events.subscribe(listener)
+        # Events after the Qt object is gone would reach a deleted model
+        self.destroyed.connect(lambda: table_events.unsubscribe(listener))
+
+    def _on_table_changed(self, filename, change):
+        if filename == self._table:
+            self._table_changed.emit()
+
+    def _count_change(self):
+        self._changes += 1
+
+    def load(self, on_done, on_error=None):
+        """Call on_done() once the model holds the table's current codes."""
+        if self._loaded_at == self._changes:
+            on_done()
+            return
+        changes = self._changes
+
+        def loaded(codes):
+            self.setStringList(list(codes))
+            self._loaded_at = changes
+            on_done()
+
+        self._worker.read(self._load_codes, on_done=loaded, on_error=on_error)
+
+
+def code_completer(model, parent=None):
+    """Completer popping up the codes that contain the typed text, ignoring case."""
+    completer = QCompleter(model, parent)
+    completer.setFilterMode(Qt.MatchFlag.MatchContains)
+    completer.setCaseSensitivity(Qt.CaseSensitivity.CaseInsensitive)
+    completer.setCompletionMode(QCompleter.CompletionMode.PopupCompletion)
+    return completer
+
+
+def attach_codes(combo, model):
+    """Show model's codes in an editable combo box, keeping any text already set or typed."""
+    text = combo.currentText()
+    # Pressing Enter on an unknown code would otherwise add it to the shared model
+    combo.setInsertPolicy(QComboBox.InsertPolicy.NoInsert)
+    combo.setModel(model)
+    if text:
+        combo.setCurrentText(text)
@@ -1,18 +1,126 @@
+import numpy as np
 import pandas as pd
+import atexit
+import importlib.util
+import json
 import os
+import threading
+from contextlib import contextmanager
+
+from search_index import SearchIndex
+from table_events import notify
 
 CSV_FOLDER = 'csv-files'
 
+# Declared column types of each table. Codes that repeat across many rows are
+# categoricals, Year Level is a small nullable integer and the rest are strings.
+TABLE_SCHEMAS = {
+    'Student.csv': {
+        'ID Number': 'string',
+        'First Name': 'string',
+        'Last Name': 'string',
+        'Year Level': 'Int8',
+        'Gender': 'category',
+        'Program Code': 'category'
+    },
+    'Program.csv': {
+        'Code': 'string',
+        'Name': 'string',
+        'College': 'category'
+    },
+    'College.csv': {
+        'Code': 'string',
+        'Name': 'string'
+    }
+}
+
+TABLE_COLUMNS = {filename: list(schema) for filename, schema in TABLE_SCHEMAS.items()}
+
+# Parser for the CSVs: pyarrow's multithreaded reader when it is installed,
+# pandas' C parser otherwise. SSIS_CSV_ENGINE ('pyarrow', 'c' or 'python')
+# overrides the choice.
+PARSE_ENGINE = os.environ.get('SSIS_CSV_ENGINE') or ('pyarrow' if importlib.util.find_spec('pyarrow') else 'c')
+
+# Binary copy of each CSV kept in csv-files/.cache and loaded instead of
+# parsing the CSV as long as the CSV's mtime/size still match the ones it was
+# made from. Arrow's Feather format (memory-mapped) when pyarrow is installed,
+# a pandas pickle otherwise. The CSVs stay the data of record.
+SNAPSHOT_FOLDER = os.path.join(CSV_FOLDER, '.cache')
+SNAPSHOT_FORMAT = 'feather' if importlib.util.find_spec('pyarrow') else 'pickle'
+
+# Primary key of each table, used for the hash index kept alongside the cache
+KEY_COLUMNS = {
+    'Student.csv': 'ID Number',
+    'Program.csv': 'Code',
+    'College.csv': 'Code'
+}
+
+# Foreign-key columns of each table and the table they point to. A reverse
+# index (referenced value -> row labels) is kept for each of them.
+FOREIGN_KEYS = {
+    'Student.csv': {'Program Code': 'Program.csv'},
+    'Program.csv': {'College': 'College.csv'}
+}
+
+# Process-wide table store: filename -> {'df': DataFrame, 'signature': ((mtime, size)
+# of the CSV, (mtime, size) of its journal or None), 'index': _KeyIndex or None,
+# 'references': {column: {value: {row labels}}}, 'search': SearchIndex or None,
+# 'journal': number of records in the journal}
+# Every handler call is served from here and the CSV is only re-parsed when
+# the CSV or its journal on disk no longer matches what was loaded.
+_tables = {}
+
+# Searches run on a worker thread, so building a search index and keeping it
+# up to date must not interleave
+_search_lock = threading.Lock()
+
+# Guards the table store; held for the whole of a transaction
+_store_lock = threading.RLock()
+
+# Open unit of work: changes are applied to the cached tables immediately but
+# only written to disk, once per table, when the outermost transaction() exits.
+# 'rewrite' holds tables to write as a whole, 'records' the journal records
+# of changes to the others.
+_transaction = {'depth': 0, 'rewrite': set(), 'records': {}}
+
+# Write-behind mode: when enabled, changes outside a transaction are kept in
+# memory as pending writes too and a background thread flushes them, one
+# write per table, every `interval` seconds
+_write_behind = {'interval': None, 'thread': None, 'stop': None}
+
+# Tables too large to load, browsed a page at a time (see paged_table): changes
+# to them are only appended to their journal and lookups scan the CSV a chunk
+# at a time. filename -> {'keys': set of primary keys as text, built by the
+# first lookup, or None}
+_streamed = {}
+
+# Lists the temp files of a commit while they are being renamed, and the
+# journals they replace
+COMMIT_MANIFEST = '.commit'
+
+# Each table has an append-only journal next to its CSV (Student.csv.journal)
+# with one JSON record per change made since the CSV was last written:
+#   {"op": "add", "row": [...]}
+#   {"op": "update", "column": ..., "value": ..., "data": {column: value}}
+#   {"op": "delete", "column": ..., "values": [...]}
+# update and delete apply to every row whose column holds value(s).
+JOURNAL_SUFFIX = '.journal'
+
+# A journal is compacted into a fresh CSV once it holds this many records, or
+# sooner on big tables: once replaying it would scan about JOURNAL_COMPACT_ROWS
+# rows (records x table rows), e.g. after 250 records at 200k rows
+JOURNAL_COMPACT_THRESHOLD = 1000
+JOURNAL_COMPACT_ROWS = 50_000_000
+
+# Rows parsed at a time when scanning or compacting a streamed table
+STREAM_CHUNK_ROWS = 100000
+
 def ensure_csv_files_exist():
     if not os.path.exists(CSV_FOLDER):
         os.makedirs(CSV_FOLDER)
-    
-    files = {
-        'Student.csv': ['ID Number', 'First Name', 'Last Name', 'Year Level', 'Gender', 'Program Code'],
-        'Program.csv': ['Code', 'Name', 'College'],
-        'College.csv': ['Code', 'Name']
-    }
-    for filename, columns in files.items():
+    recover_commit()
+
+    for filename, columns in TABLE_COLUMNS.items():
         filepath = os.path.join(CSV_FOLDER, filename)
         if not os.path.exists(filepath):
             try:
@@ -21,10 +129,386 @@ def ensure_csv_files_exist():
             except Exception as e:
                 raise Exception(f"Error creating {filepath}: {e}")
 
+def ensure_storage():
+    ensure_csv_files_exist()
+
+def _file_signature(filepath):
+    stat = os.stat(filepath)
+    return (stat.st_mtime_ns, stat.st_size)
+
+def _journal_path(filename):
+    return os.path.join(CSV_FOLDER, filename + JOURNAL_SUFFIX)
+
+def _table_signature(filename):
+    journal = _journal_path(filename)
+    return (
+        _file_signature(os.path.join(CSV_FOLDER, filename)),
+        _file_signature(journal) if os.path.exists(journal) else None
+    )
+
+def _load_table(filename):
+    """Return the cached DataFrame for filename, (re)loading it if the file or its journal changed."""
+    filepath = os.path.join(CSV_FOLDER, filename)
+    signature = _table_signature(filename)
+    table = _tables.get(filename)
+    if table is None or table['signature'] != signature:
+        reloaded = table is not None
+        df = _read_snapshot(filename)
+        if df is None:
+            df = _parse_csv(filename)
+            _write_snapshot(filename, df, signature[0])
+        df, records = _replay_journal(filename, df)
+        table = _new_table(df, signature)
+        table['journal'] = records
+        _tables[filename] = table
+        if reloaded:
+            notify(filename, reset=True)
+    return table
+
+def _parse_csv(filename, columns=None):
+    """Parse filename's CSV with the configured engine and declared dtypes, optionally only some columns."""
+    filepath = os.path.join(CSV_FOLDER, filename)
+    dtype = TABLE_SCHEMAS.get(filename)
+    if dtype is not None and columns is not None:
+        dtype = {column: dtype[column] for column in columns if column in dtype}
+    return pd.read_csv(filepath, engine=PARSE_ENGINE, dtype=dtype, usecols=columns)
+
+def _snapshot_paths(filename):
+    path = os.path.join(SNAPSHOT_FOLDER, filename)
+    return f"{path}.{SNAPSHOT_FORMAT}", f"{path}.json"
+
+def _read_snapshot(filename):
+    """Return the binary copy of filename's CSV, or None when there is none or it is out of date."""
+    data_path, meta_path = _snapshot_paths(filename)
+    try:
+        with open(meta_path, 'r') as file:
+            meta = json.load(file)
+        if meta.get('format') != SNAPSHOT_FORMAT or tuple(meta.get('csv', ())) != _file_signature(os.path.join(CSV_FOLDER, filename)):
+            return None
+        if SNAPSHOT_FORMAT == 'feather':
+            from pyarrow import feather
+            df = feather.read_table(data_path, memory_map=True).to_pandas()
+        else:
+            df = pd.read_pickle(data_path)
+    except Exception:
+        # A missing or unreadable snapshot just means parsing the CSV
+        return None
+    _apply_schema(filename, df)
+    return df
+
+def _write_snapshot(filename, df, csv_signature=None):
+    """Save df, the content of filename's CSV as of csv_signature (default: now), as its binary copy."""
+    data_path, meta_path = _snapshot_paths(filename)
+    try:
+        os.makedirs(SNAPSHOT_FOLDER, exist_ok=True)
+        # Drop the old metadata first so a half-written snapshot is never taken as valid
+        if os.path.exists(meta_path):
+            os.remove(meta_path)
+        df = df.reset_index(drop=True)
+        if SNAPSHOT_FORMAT == 'feather':
+            df.to_feather(data_path + '.tmp')
+        else:
+            df.to_pickle(data_path + '.tmp', compression=None)
+        os.replace(data_path + '.tmp', data_path)
+        if csv_signature is None:
+            csv_signature = _file_signature(os.path.join(CSV_FOLDER, filename))
+        meta = {'format': SNAPSHOT_FORMAT, 'csv': csv_signature}
+        with open(meta_path + '.tmp', 'w') as file:
+            json.dump(meta, file)
+        os.replace(meta_path + '.tmp', meta_path)
+    except Exception:
+        # The snapshot is only a shortcut; the next load parses the CSV instead
+        pass
+
+def _fresh_table(filename):
+    """Return the cached table if it still matches the files on disk, else None."""
+    table = _tables.get(filename)
+    if table is not None and table['signature'] == _table_signature(filename):
+        return table
+    return None
+
+def _new_table(df, signature):
+    return {'df': df, 'signature': signature, 'index': None, 'references': {}, 'search': None, 'journal': 0,
+            'appended': []}
+
+def _table_frame(filename, table):
+    """Return a table's DataFrame with the rows added since it was last read appended to it.
+
+    add_entry() buffers its rows rather than enlarging the frame, which
+    copies every column; they are appended here with a single concat.
+    """
+    if table['appended']:
+        table['df'] = _append_rows_to(filename, table['df'], table['appended'])
+        table['appended'] = []
+    return table['df']
+
+def _replay_journal(filename, df):
+    """Apply the records in filename's journal to df, its CSV snapshot.
+
+    Returns the resulting frame and how many records there were. Runs of
+    consecutive adds are appended with a single concat rather than a row at
+    a time, which would copy the whole table per record.
+    """
+    journal = _journal_path(filename)
+    if not os.path.exists(journal):
+        return df, 0
+    count = 0
+    rows = []
+    with open(journal, 'r') as file:
+        for line in file:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                # A record cut short by a crash was never acknowledged
+                continue
+            count += 1
+            if record.get('op') == 'add':
+                rows.append(record['row'])
+                continue
+            df = _append_rows_to(filename, df, rows)
+            rows = []
+            _apply_record(filename, df, record)
+    return _append_rows_to(filename, df, rows), count
+
+def _append_rows_to(filename, df, rows):
+    """Return df with rows (lists of column values) appended under new labels."""
+    if not rows:
+        return df
+    columns = {
+        column: [_typed_value(filename, column, row[position]) for row in rows]
+        for position, column in enumerate(df.columns)
+    }
+    first = _next_label(df)
+    added = pd.DataFrame(columns, index=pd.RangeIndex(first, first + len(rows)))
+    combined = pd.concat([df, added])
+    _apply_schema(filename, combined)
+    return combined
+
+def _apply_record(filename, df, record):
+    op = record['op']
+    if op == 'add':
+        _append_row(filename, df, record['row'])
+    elif op == 'update':
+        rows = df.index[df[record['column']] == record['value']]
+        for column, value in record['data'].items():
+            _assign(filename, df, rows, column, value)
+    elif op == 'delete':
+        df.drop(df.index[df[record['column']].isin(record['values'])], inplace=True)
+    else:
+        raise ValueError(f"Unknown journal operation '{op}'.")
+
+def _json_value(value):
+    if value is pd.NA:
+        return None
+    # numpy scalars taken from a DataFrame
+    if hasattr(value, 'item'):
+        return value.item()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+def _append_journal(filename, records):
+    journal = _journal_path(filename)
+    # Start on a fresh line if the last append was cut short
+    needs_newline = False
+    if os.path.exists(journal) and os.path.getsize(journal) > 0:
+        with open(journal, 'rb') as file:
+            file.seek(-1, os.SEEK_END)
+            needs_newline = file.read(1) != b'\n'
+    with open(journal, 'a') as file:
+        if needs_newline:
+            file.write('\n')
+        for record in records:
+            file.write(json.dumps(record, default=_json_value) + '\n')
+        file.flush()
+        os.fsync(file.fileno())
+    table = _tables.get(filename)
+    if table is not None:
+        table['journal'] += len(records)
+
+def _read_journal(filename):
+    """Return the records in filename's journal and its size in bytes."""
+    journal = _journal_path(filename)
+    if not os.path.exists(journal):
+        return [], 0
+    with open(journal, 'rb') as file:
+        data = file.read()
+    records = []
+    for line in data.decode('utf-8').splitlines():
+        try:
+            records.append(json.loads(line))
+        except ValueError:
+            # Cut short by a crash while appending
+            continue
+    return records, len(data)
+
+def _stage_journal(filename, records):
+    """Write filename's journal followed by records to a temp file next to it and flush it to disk."""
+    journal = _journal_path(filename)
+    temp_path = journal + '.tmp'
+    with open(temp_path, 'wb') as file:
+        if os.path.exists(journal):
+            with open(journal, 'rb') as current:
+                data = current.read()
+            file.write(data)
+            if data and not data.endswith(b'\n'):
+                file.write(b'\n')
+        for record in records:
+            file.write((json.dumps(record, default=_json_value) + '\n').encode('utf-8'))
+        file.flush()
+        os.fsync(file.fileno())
+    return temp_path, journal
+
+def _store_table(filename, df, keep_index=False):
+    """Cache df as the current content of filename's CSV and journal on disk."""
+    _set_table(filename, df, keep_index)
+    _tables[filename]['signature'] = _table_signature(filename)
+
+def _set_table(filename, df, keep_index=False):
+    table = _tables.get(filename)
+    if keep_index and table is not None and table['df'] is df:
+        # Frame was mutated through the helpers below, its index is still valid
+        return
+    if table is not None:
+        signature = table['signature']
+    else:
+        filepath = os.path.join(CSV_FOLDER, filename)
+        signature = _table_signature(filename) if os.path.exists(filepath) else None
+    _tables[filename] = _new_table(df, signature)
+    notify(filename, reset=True)
+
+def _get_table(filename):
+    read_csv(filename)
+    return _tables[filename]
+
+class _KeyIndex:
+    """Primary key -> row labels of a table.
+
+    Built from the key column as a pandas Index, whose hash table is made
+    in one vectorized pass, and kept up to date with the rows added and
+    removed since, which stay few until the table is next loaded.
+    """
+
+    def __init__(self, keys, labels):
+        self._keys = pd.Index(keys.to_numpy(dtype=object))
+        self._labels = np.asarray(labels)
+        self._added = {}       # key -> [labels] of rows added since
+        self._removed = set()  # labels of indexed rows removed since
+
+    def get(self, key):
+        """Return the labels of the rows holding key, oldest first."""
+        labels = []
+        try:
+            position = self._keys.get_loc(key)
+        except (KeyError, TypeError):
+            position = None
+        if position is not None:
+            found = self._labels[position]
+            labels = [label for label in np.atleast_1d(found).tolist() if label not in self._removed]
+        return labels + self._added.get(key, [])
+
+    def __contains__(self, key):
+        return bool(self.get(key))
+
+    def present(self, keys):
+        """Return the keys that some row holds."""
+        keys = list(keys)
+        if not self._keys.is_unique:
+            return {key for key in keys if key in self}
+        positions = self._keys.get_indexer(pd.Index(keys, dtype=object))
+        found = set()
+        for key, position in zip(keys, positions.tolist()):
+            if (position >= 0 and self._labels[position] not in self._removed) or self._added.get(key):
+                found.add(key)
+        return found
+
+    def add(self, key, label):
+        self._added.setdefault(key, []).append(label)
+
+    def remove(self, key, label):
+        added = self._added.get(key)
+        if added and label in added:
+            added.remove(label)
+            if not added:
+                del self._added[key]
+        else:
+            self._removed.add(label)
+
+def _key_index(table, filename):
+    """Return the primary-key hash index of a table, building it on first use."""
+    if table['index'] is None:
+        df = table['df']
+        table['index'] = _KeyIndex(df[KEY_COLUMNS[filename]], df.index)
+    return table['index']
+
+def _matching_labels(table, filename, key_column, key_value):
+    if KEY_COLUMNS.get(filename) == key_column:
+        return _key_index(table, filename).get(key_value)
+    df = table['df']
+    return list(df.index[df[key_column] == key_value])
+
+def _reference_index(table, column):
+    """Return the reverse index of a foreign-key column, building it on first use."""
+    references = table['references'].get(column)
+    if references is None:
+        df = table['df']
+        labels = df.index.to_numpy()
+        groups = df.groupby(column, sort=False, observed=True).indices
+        references = {value: set(labels[positions].tolist()) for value, positions in groups.items()}
+        table['references'][column] = references
+    return references
+
+def _index_rows(table, filename, labels, rows=None):
+    """Add rows to a table's indexes; rows maps each column to the values of the rows, default their values in the frame."""
+    if rows is None:
+        rows = table['df'].loc[labels]
+    if table['index'] is not None:
+        for label, key in zip(labels, rows[KEY_COLUMNS[filename]]):
+            table['index'].add(key, label)
+    for column, references in table['references'].items():
+        for label, value in zip(labels, rows[column]):
+            references.setdefault(value, set()).add(label)
+    with _search_lock:
+        if table['search'] is not None:
+            table['search'].add(labels, rows)
+
+def _unindex_rows(table, filename, labels):
+    df = table['df']
+    if table['index'] is not None:
+        keys = df.loc[labels, KEY_COLUMNS[filename]]
+        for label, key in zip(labels, keys):
+            table['index'].remove(key, label)
+    for column, references in table['references'].items():
+        for label, value in zip(labels, df.loc[labels, column]):
+            rows = references.get(value)
+            if rows is not None:
+                rows.discard(label)
+                if not rows:
+                    del references[value]
+    with _search_lock:
+        if table['search'] is not None:
+            table['search'].remove(labels)
+
+def _search_index(table):
+    """Return the substring search index of a table, building it on first use."""
+    with _search_lock:
+        if table['search'] is None:
+            table['search'] = SearchIndex.from_frame(table['df'])
+        return table['search']
+
+def _next_label(df):
+    return df.index.max() + 1 if len(df) else 0
+
+def invalidate_cache(filename=None):
+    """Drop cached tables so the next read goes back to disk."""
+    filenames = list(_tables) if filename is None else [filename]
+    for name in filenames:
+        if _tables.pop(name, None) is not None:
+            notify(name, reset=True)
+
 def read_csv(filename):
     filepath = os.path.join(CSV_FOLDER, filename)
     try:
-        return pd.read_csv(filepath)
+        with _store_lock:
+            return _table_frame(filename, _load_table(filename))
     except FileNotFoundError:
         raise FileNotFoundError(f"File {filepath} not found.")
     except pd.errors.EmptyDataError:
@@ -34,40 +518,733 @@ def read_csv(filename):
     except Exception as e:
         raise Exception(f"Error reading {filepath}: {e}")
 
-def write_csv(filename, df):
+def read_columns(filename, columns):
+    """Return only the given columns of a table.
+
+    Served from the cache when the table is loaded; otherwise only those
+    columns are parsed and nothing is cached. A table with a journal is
+    loaded in full since its records may refer to other columns.
+    """
+    filepath = os.path.join(CSV_FOLDER, filename)
+    try:
+        with _store_lock:
+            if _fresh_table(filename) is None and not os.path.exists(_journal_path(filename)):
+                return _parse_csv(filename, columns)
+            return _get_table(filename)['df'][columns]
+    except FileNotFoundError:
+        raise FileNotFoundError(f"File {filepath} not found.")
+    except ValueError as e:
+        raise ValueError(f"File {filepath} could not be read: {e}")
+    except Exception as e:
+        raise Exception(f"Error reading {filepath}: {e}")
+
+def _stage_csv(filename, df):
+    """Write df to a temp file next to its CSV and flush it to disk."""
+    filepath = os.path.join(CSV_FOLDER, filename)
+    temp_path = filepath + '.tmp'
+    df.to_csv(temp_path, index=False)
+    with open(temp_path, 'r+b') as file:
+        os.fsync(file.fileno())
+    return temp_path, filepath
+
+def _commit_staged(staged, journals=()):
+    """Rename staged temp files over their CSVs and remove the journals they replace.
+
+    Each rename is atomic. When several files are committed together, or a
+    journal has to go with the old CSV, a manifest is written first so
+    recover_commit() can finish the job if the process dies halfway through.
+    """
+    manifest = os.path.join(CSV_FOLDER, COMMIT_MANIFEST)
+    use_manifest = len(staged) > 1 or bool(journals)
+    if use_manifest:
+        with open(manifest + '.tmp', 'w') as file:
+            json.dump({'staged': staged, 'journals': list(journals)}, file)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(manifest + '.tmp', manifest)
+    for temp_path, filepath in staged:
+        os.replace(temp_path, filepath)
+    for journal in journals:
+        os.remove(journal)
+    if use_manifest:
+        os.remove(manifest)
+
+def recover_commit():
+    """Finish a commit that was interrupted and drop half-written temp files."""
+    manifest = os.path.join(CSV_FOLDER, COMMIT_MANIFEST)
+    if os.path.exists(manifest):
+        with open(manifest) as file:
+            commit = json.load(file)
+        for temp_path, filepath in commit['staged']:
+            if os.path.exists(temp_path):
+                os.replace(temp_path, filepath)
+        for journal in commit['journals']:
+            if os.path.exists(journal):
+                os.remove(journal)
+        os.remove(manifest)
+    leftovers = [manifest + '.tmp']
+    for filename in TABLE_COLUMNS:
+        leftovers += [os.path.join(CSV_FOLDER, filename) + '.tmp', _journal_path(filename) + '.tmp']
+    for temp_path in leftovers:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+def write_csv(filename, df, keep_index=False):
     filepath = os.path.join(CSV_FOLDER, filename)
     try:
-        df.to_csv(filepath, index=False)
+        with _store_lock:
+            _set_table(filename, df, keep_index)
+            _transaction['rewrite'].add(filename)
+            if not _deferring():
+                _commit_transaction()
     except Exception as e:
         raise Exception(f"Error writing to {filepath}: {e}")
 
+@contextmanager
+def transaction():
+    """Group changes to several tables into one unit of work.
+
+    Inside the block every change is applied to the cached tables right
+    away, but nothing is written until the outermost block exits: then each
+    touched table is flushed exactly once and multi-table commits go through
+    the rename manifest. If the block raises, the touched tables are
+    reloaded from disk and the changes are discarded.
+
+    In write-behind mode the committed changes stay pending until the next
+    flush; whatever was pending before the block is flushed first so a
+    rollback only discards the block's own changes.
+    """
+    with _store_lock:
+        if _transaction['depth'] == 0 and _write_behind['interval'] is not None:
+            flush()
+        _transaction['depth'] += 1
+        try:
+            yield
+        except BaseException:
+            _transaction['depth'] -= 1
+            if _transaction['depth'] == 0:
+                _rollback_transaction()
+            raise
+        _transaction['depth'] -= 1
+        if _transaction['depth'] == 0 and _write_behind['interval'] is None:
+            _commit_transaction()
+
+def _deferring():
+    return _transaction['depth'] > 0 or _write_behind['interval'] is not None
+
+def _take_transaction_changes():
+    rewrite = set(_transaction['rewrite'])
+    records = dict(_transaction['records'])
+    _transaction['rewrite'].clear()
+    _transaction['records'].clear()
+    return rewrite, records
+
+def _commit_transaction():
+    """Write the pending changes, once per table; returns the number of tables written.
+
+    Changes to a single table are appended to its journal. When several
+    tables changed they are all written as fresh CSVs through one manifest,
+    since journal appends can't be made atomic across files; streamed tables
+    aren't loaded, so a new copy of their journal goes through the manifest
+    instead.
+    """
+    rewrite, records = _take_transaction_changes()
+    # A rewritten table already contains the changes in its records
+    records = {filename: batch for filename, batch in records.items() if filename not in rewrite}
+    streamed = {filename: batch for filename, batch in records.items() if filename in _streamed}
+    journaled = {}
+    if len(rewrite | set(records)) > 1:
+        journaled = streamed
+        rewrite |= set(records) - set(streamed)
+        records = {}
+    written = rewrite | set(records) | set(journaled)
+    try:
+        for filename, batch in records.items():
+            _append_journal(filename, batch)
+            if filename not in _streamed and _journal_due(_tables[filename]):
+                rewrite.add(filename)
+        _write_snapshots(rewrite, journaled)
+        for filename in written:
+            if filename in _streamed:
+                # Any copy loaded before the table was streamed no longer matches
+                _tables.pop(filename, None)
+            else:
+                _store_table(filename, _tables[filename]['df'], keep_index=True)
+    except Exception as e:
+        if _write_behind['interval'] is not None:
+            # The cached tables still hold the changes; rewrite them on the next flush
+            _transaction['rewrite'].update(written - set(streamed))
+            for filename, batch in streamed.items():
+                _transaction['records'][filename] = batch + _transaction['records'].get(filename, [])
+        else:
+            for filename in written:
+                invalidate_cache(filename)
+        raise Exception(f"Error committing changes: {e}")
+    return len(written)
+
+def _journal_due(table):
+    """Whether a table's journal has grown enough to be folded into a fresh CSV."""
+    records = table['journal']
+    rows = len(table['df']) + len(table['appended'])
+    return records >= JOURNAL_COMPACT_THRESHOLD or records * rows >= JOURNAL_COMPACT_ROWS
+
+def _write_snapshots(filenames, journaled=None):
+    """Write the cached tables as fresh CSVs, replacing their journals.
+
+    journaled maps streamed tables to records to add to their journals in
+    the same commit.
+    """
+    journaled = journaled or {}
+    if not filenames and not journaled:
+        return
+    staged = [_stage_csv(filename, _table_frame(filename, _tables[filename])) for filename in sorted(filenames)]
+    staged += [_stage_journal(filename, journaled[filename]) for filename in sorted(journaled)]
+    journals = [_journal_path(filename) for filename in sorted(filenames) if os.path.exists(_journal_path(filename))]
+    _commit_staged(staged, journals)
+    for filename in filenames:
+        _tables[filename]['journal'] = 0
+        _write_snapshot(filename, _tables[filename]['df'])
+
+def compact(filename=None):
+    """Fold the journal of filename (or of every table) into a fresh CSV."""
+    try:
+        with _store_lock:
+            filenames = list(TABLE_COLUMNS) if filename is None else [filename]
+            for name in filenames:
+                if os.path.exists(_journal_path(name)) and name not in _streamed:
+                    _get_table(name)
+                    _transaction['rewrite'].add(name)
+            if not _transaction['depth']:
+                _commit_transaction()
+                for name in filenames:
+                    if name in _streamed and os.path.exists(_journal_path(name)):
+                        commit_compaction(stage_compaction(name))
+    except Exception as e:
+        raise Exception(f"Error compacting journals: {e}")
+
+def stream_table(filename):
+    """Keep filename out of memory from now on.
+
+    Changes to it are only appended to its journal, lookups scan its CSV a
+    chunk at a time, and the journal is folded into the CSV when the view
+    paging through the file calls stage_compaction() and commit_compaction().
+    """
+    with _store_lock:
+        _streamed.setdefault(filename, {'keys': None})
+        _tables.pop(filename, None)
+
+def journal_records(filename):
+    """Return the journal records of filename, including changes not written yet, oldest first."""
+    with _store_lock:
+        records, _ = _read_journal(filename)
+        return records + list(_transaction['records'].get(filename, ()))
+
+def compaction_due(filename):
+    """Whether a streamed table's journal has grown enough to be folded into its CSV."""
+    with _store_lock:
+        records, _ = _read_journal(filename)
+    return len(records) >= JOURNAL_COMPACT_THRESHOLD
+
+def stage_compaction(filename):
+    """Write a streamed table with its journal folded in to a temp file, a chunk at a time.
+
+    The store is only locked while the journal is read, so changes can
+    still be made meanwhile; returns what commit_compaction() needs.
+    """
+    filepath = os.path.join(CSV_FOLDER, filename)
+    with _store_lock:
+        records, journal_size = _read_journal(filename)
+        signature = _file_signature(filepath)
+    columns = TABLE_COLUMNS[filename]
+    temp_path = filepath + '.tmp'
+    with open(temp_path, 'w', newline='', encoding='utf-8') as file:
+        pd.DataFrame(columns=columns).to_csv(file, index=False)
+        for chunk in pd.read_csv(filepath, engine='c', dtype=str, keep_default_na=False, chunksize=STREAM_CHUNK_ROWS):
+            apply_journal_changes(chunk, records).to_csv(file, index=False, header=False)
+        pd.DataFrame(journal_added_rows(records, columns), columns=columns).to_csv(file, index=False, header=False)
+        file.flush()
+        os.fsync(file.fileno())
+    return {'filename': filename, 'temp_path': temp_path, 'csv': signature, 'journal_size': journal_size}
+
+def commit_compaction(staged):
+    """Replace the CSV with a staged compaction; returns False when the CSV changed since it was staged.
+
+    Records appended to the journal after it was staged are kept.
+    """
+    filename = staged['filename']
+    filepath = os.path.join(CSV_FOLDER, filename)
+    journal = _journal_path(filename)
+    try:
+        with _store_lock:
+            if _file_signature(filepath) != staged['csv']:
+                # Replaced meanwhile, e.g. by an import; staged again on the next reload
+                os.remove(staged['temp_path'])
+                return False
+            tail = b''
+            if os.path.exists(journal):
+                with open(journal, 'rb') as file:
+                    file.seek(staged['journal_size'])
+                    tail = file.read().lstrip(b'\n')
+            files = [(staged['temp_path'], filepath)]
+            journals = []
+            if tail:
+                # The records appended meanwhile become the whole journal
+                with open(journal + '.tmp', 'wb') as file:
+                    file.write(tail)
+                    file.flush()
+                    os.fsync(file.fileno())
+                files.append((journal + '.tmp', journal))
+            elif os.path.exists(journal):
+                journals.append(journal)
+            _commit_staged(files, journals)
+            _tables.pop(filename, None)
+    except Exception as e:
+        raise Exception(f"Error compacting {filename}: {e}")
+    notify(filename, reset=True)
+    return True
+
+def _queue_record(filename, record):
+    """Persist a change already applied to the cached table, now or when the transaction commits."""
+    _transaction['records'].setdefault(filename, []).append(record)
+    if not _deferring():
+        _commit_transaction()
+
+def _rollback_transaction():
+    rewrite, records = _take_transaction_changes()
+    for filename in rewrite | set(records):
+        invalidate_cache(filename)
+        if filename in _streamed:
+            # The key set already holds the discarded changes
+            _streamed[filename]['keys'] = None
+            notify(filename, reset=True)
+
+def flush():
+    """Write every pending change to disk now; returns the number of tables written.
+
+    Does nothing inside an open transaction, which decides for itself when
+    its changes are written.
+    """
+    with _store_lock:
+        if _transaction['depth']:
+            return 0
+        return _commit_transaction()
+
+def has_pending_changes():
+    with _store_lock:
+        return bool(_transaction['rewrite'] or _transaction['records'])
+
+def data_lock():
+    """The lock to hold while reading a DataFrame returned by list_entries from another thread."""
+    return _store_lock
+
+def enable_write_behind(interval):
+    """Keep changes in memory and flush them every `interval` seconds from a background thread.
+
+    Rapid edits to a table are coalesced into a single write per flush.
+    Pending changes are also flushed by flush(), disable_write_behind() and
+    when the interpreter exits.
+    """
+    if interval <= 0:
+        raise ValueError("The write-behind interval must be positive.")
+    disable_write_behind()
+    stop = threading.Event()
+    thread = threading.Thread(target=_flush_periodically, args=(stop, interval), name='csv-write-behind', daemon=True)
+    with _store_lock:
+        _write_behind.update(interval=interval, thread=thread, stop=stop)
+    thread.start()
+
+def disable_write_behind():
+    """Stop the background flusher and write whatever is still pending."""
+    with _store_lock:
+        thread, stop = _write_behind['thread'], _write_behind['stop']
+        _write_behind.update(interval=None, thread=None, stop=None)
+    if thread is not None:
+        stop.set()
+        thread.join()
+    flush()
+
+def _flush_periodically(stop, interval):
+    while not stop.wait(interval):
+        try:
+            flush()
+        except Exception:
+            # The changes stay pending; the next flush tries again
+            pass
+
+atexit.register(disable_write_behind)
+
+def _row_for(filename, columns, entry_data):
+    unknown = set(entry_data) - set(columns)
+    if unknown:
+        raise ValueError(f"Unknown columns for {filename}: {', '.join(sorted(unknown))}")
+    return [entry_data.get(column, '') for column in columns]
+
+def _typed_value(filename, column, value):
+    """Convert a value (the dialogs pass text) to the declared type of its column."""
+    dtype = TABLE_SCHEMAS.get(filename, {}).get(column)
+    if dtype is None:
+        return value
+    if value is None or pd.isna(value):
+        return pd.NA
+    if dtype == 'Int8':
+        return pd.NA if value == '' else int(value)
+    return str(value)
+
+def _apply_schema(filename, df):
+    # Snapshots and concatenated frames may come back with other dtypes, put the declared ones back
+    for column, dtype in TABLE_SCHEMAS.get(filename, {}).items():
+        if column in df and str(df[column].dtype) != dtype:
+            df[column] = df[column].astype(dtype)
+
+def _add_category(df, column, value):
+    """Make value a category of a categorical column, so assigning it keeps the dtype."""
+    values = df[column]
+    if isinstance(values.dtype, pd.CategoricalDtype) and not pd.isna(value) and value not in values.cat.categories:
+        df[column] = values.cat.add_categories([value])
+
+def _append_row(filename, df, row):
+    label = _next_label(df)
+    values = [_typed_value(filename, column, value) for column, value in zip(df.columns, row)]
+    for column, value in zip(df.columns, values):
+        _add_category(df, column, value)
+    # Setting a whole row would go through an object row and re-cast every
+    # column; enlarging through one column fills the others with NA, which
+    # each declared dtype holds, and the rest are then set in place
+    df.loc[label, df.columns[0]] = values[0]
+    for column, value in zip(df.columns[1:], values[1:]):
+        df.loc[label, column] = value
+    return label
+
+def _assign(filename, df, labels, column, value):
+    value = _typed_value(filename, column, value)
+    _add_category(df, column, value)
+    df.loc[labels, column] = value
+
+def _insert_row(table, filename, row):
+    """Buffer row as an added row of the table (see _table_frame) and index it."""
+    columns = table['df'].columns
+    values = [_typed_value(filename, column, value) for column, value in zip(columns, row)]
+    label = _next_label(table['df']) + len(table['appended'])
+    table['appended'].append(values)
+    _index_rows(table, filename, [label], {column: [value] for column, value in zip(columns, values)})
+    return label
+
+def _text(value):
+    """A value as it reads in the CSV."""
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return ''
+    return str(value)
+
+def journal_matched_values(records):
+    """Return {column: set of CSV text} for the values the update and delete records pick rows by.
+
+    Only rows holding one of them can be changed by the records.
+    """
+    matched = {}
+    for record in records:
+        if record['op'] == 'update':
+            matched.setdefault(record['column'], set()).add(_text(record['value']))
+        elif record['op'] == 'delete':
+            matched.setdefault(record['column'], set()).update(_text(value) for value in record['values'])
+    return matched
+
+def apply_journal_changes(rows, records):
+    """Apply the update and delete records to rows, a DataFrame of CSV text with a unique index; returns the result."""
+    # Only rows holding a value some record matches on can change, the
+    # records are replayed on those alone
+    candidates = np.zeros(len(rows), dtype=bool)
+    for column, values in journal_matched_values(records).items():
+        candidates |= rows[column].isin(values).to_numpy()
+    if not candidates.any():
+        return rows
+    before = rows[candidates]
+    after = before.copy()
+    for record in records:
+        if record['op'] == 'update':
+            matching = after[record['column']] == _text(record['value'])
+            for column, value in record['data'].items():
+                if column in after:
+                    after.loc[matching, column] = _text(value)
+        elif record['op'] == 'delete':
+            after = after[~after[record['column']].isin([_text(value) for value in record['values']])]
+    rows = rows.drop(before.index.difference(after.index))
+    if len(after):
+        rows.loc[after.index] = after
+    return rows
+
+def journal_added_rows(records, columns):
+    """Return the rows added by records as lists of CSV text, with the records after each add applied."""
+    added = []
+    for record in records:
+        op = record['op']
+        if op == 'add':
+            added.append([_text(value) for value in record['row']])
+            continue
+        position = columns.index(record['column'])
+        if op == 'update':
+            value = _text(record['value'])
+            changes = [(columns.index(column), _text(new)) for column, new in record['data'].items()]
+            for row in added:
+                if row[position] == value:
+                    for changed, new in changes:
+                        row[changed] = new
+        elif op == 'delete':
+            values = {_text(value) for value in record['values']}
+            added = [row for row in added if row[position] not in values]
+    return added
+
+def _stream_rows(filename, columns):
+    """Yield the given columns of a streamed table as DataFrames of CSV text, a chunk at a time, journal applied."""
+    filepath = os.path.join(CSV_FOLDER, filename)
+    records = journal_records(filename)
+    # The records may match rows on other columns
+    wanted = set(columns) | {record['column'] for record in records if record['op'] != 'add'}
+    usecols = [column for column in TABLE_COLUMNS[filename] if column in wanted]
+    for chunk in pd.read_csv(filepath, engine='c', usecols=usecols, dtype=str, keep_default_na=False,
+                             chunksize=STREAM_CHUNK_ROWS):
+        yield apply_journal_changes(chunk, records)[columns]
+    added = journal_added_rows(records, TABLE_COLUMNS[filename])
+    if added:
+        yield pd.DataFrame(added, columns=TABLE_COLUMNS[filename])[columns]
+
+def _streamed_keys(filename):
+    """Return the primary keys of a streamed table, scanning the key column the first time."""
+    state = _streamed[filename]
+    if state['keys'] is None:
+        key_column = KEY_COLUMNS[filename]
+        keys = set()
+        for chunk in _stream_rows(filename, [key_column]):
+            keys.update(chunk[key_column])
+        state['keys'] = keys
+    return state['keys']
+
+def _track_keys(filename, record):
+    """Keep the key set of a streamed table in step with a change made to it."""
+    state = _streamed[filename]
+    keys = state['keys']
+    key_column = KEY_COLUMNS[filename]
+    if keys is None:
+        return
+    if record['op'] == 'add':
+        keys.add(_text(record['row'][TABLE_COLUMNS[filename].index(key_column)]))
+    elif record['op'] == 'delete' and record['column'] == key_column:
+        keys.difference_update(_text(value) for value in record['values'])
+    elif record['op'] == 'update' and key_column in record['data']:
+        old_key = _text(record['value'])
+        if record['column'] == key_column:
+            if old_key in keys:
+                keys.discard(old_key)
+                keys.add(_text(record['data'][key_column]))
+        else:
+            # Which rows were renamed isn't known without scanning
+            state['keys'] = None
+    elif record['op'] == 'delete':
+        state['keys'] = None
+
+def _queue_streamed(filename, records):
+    """Persist changes to a streamed table through its journal alone, without loading it."""
+    for record in records:
+        _track_keys(filename, record)
+    _transaction['records'].setdefault(filename, []).extend(records)
+    if not _deferring():
+        _commit_transaction()
+    notify(filename, reset=True)
+
 def add_entry(filename, entry_data):
     try:
-        df = read_csv(filename)
-        df = pd.concat([df, pd.DataFrame([entry_data])], ignore_index=True)
-        write_csv(filename, df)
+        with _store_lock:
+            if filename in _streamed:
+                _queue_streamed(filename, [{'op': 'add', 'row': _row_for(filename, TABLE_COLUMNS[filename], entry_data)}])
+                return
+            # Loaded without appending the rows buffered so far, add_entry() adds to them
+            table = _load_table(filename)
+            row = _row_for(filename, list(table['df'].columns), entry_data)
+            label = _insert_row(table, filename, row)
+            _queue_record(filename, {'op': 'add', 'row': row})
+            notify(filename, inserted=[label])
     except Exception as e:
         raise Exception(f"Error adding entry to {filename}: {e}")
 
+def add_entries(filename, entries):
+    """Add many rows (a DataFrame or a list of dicts) with a single write; returns how many were added."""
+    try:
+        with _store_lock:
+            rows = pd.DataFrame(entries)
+            unknown = set(rows.columns) - set(TABLE_COLUMNS[filename])
+            if unknown:
+                raise ValueError(f"Unknown columns for {filename}: {', '.join(sorted(unknown))}")
+            if rows.empty:
+                return 0
+            if filename in _streamed:
+                rows = rows.reindex(columns=TABLE_COLUMNS[filename], fill_value='')
+                _queue_streamed(filename, [{'op': 'add', 'row': row} for row in rows.values.tolist()])
+                return len(rows)
+            df = _get_table(filename)['df']
+            rows = rows.reindex(columns=df.columns, fill_value='')
+            for column, dtype in TABLE_SCHEMAS.get(filename, {}).items():
+                if dtype == 'Int8':
+                    rows[column] = pd.to_numeric(rows[column].replace('', None))
+            first = _next_label(df)
+            rows.index = pd.RangeIndex(first, first + len(rows))
+            combined = pd.concat([df, rows])
+            _apply_schema(filename, combined)
+            # A new frame: the table is rewritten once and views reset
+            write_csv(filename, combined)
+            return len(rows)
+    except Exception as e:
+        raise Exception(f"Error adding entries to {filename}: {e}")
+
 def delete_entry(filename, key_column, key_value):
     try:
-        df = read_csv(filename)
-        df = df[df[key_column] != key_value]
-        write_csv(filename, df)
+        delete_entries(filename, key_column, [key_value])
     except Exception as e:
         raise Exception(f"Error deleting entry from {filename}: {e}")
 
+def delete_entries(filename, key_column, key_values):
+    """Delete every row whose key_column is in key_values with a single journal record."""
+    try:
+        with _store_lock:
+            if filename in _streamed:
+                return _delete_streamed(filename, key_column, set(key_values))
+            table = _get_table(filename)
+            if KEY_COLUMNS.get(filename) == key_column:
+                labels = []
+                for key_value in set(key_values):
+                    labels.extend(_matching_labels(table, filename, key_column, key_value))
+            else:
+                df = table['df']
+                labels = list(df.index[df[key_column].isin(list(key_values))])
+            if not labels:
+                return 0
+            _unindex_rows(table, filename, labels)
+            table['df'].drop(labels, inplace=True)
+            _queue_record(filename, {'op': 'delete', 'column': key_column, 'values': list(set(key_values))})
+            notify(filename, removed=labels)
+            return len(labels)
+    except Exception as e:
+        raise Exception(f"Error deleting entries from {filename}: {e}")
+
+def _delete_streamed(filename, key_column, key_values):
+    if key_column == KEY_COLUMNS[filename]:
+        count = len(_streamed_keys(filename) & {_text(value) for value in key_values})
+    else:
+        values = [_text(value) for value in key_values]
+        count = sum(int(chunk[key_column].isin(values).sum()) for chunk in _stream_rows(filename, [key_column]))
+    if count:
+        _queue_streamed(filename, [{'op': 'delete', 'column': key_column, 'values': list(key_values)}])
+    return count
+
 def update_entry(filename, key_column, key_value, updated_data):
     try:
-        df = read_csv(filename)
-        for key, value in updated_data.items():
-            df.loc[df[key_column] == key_value, key] = value
-        write_csv(filename, df)
+        with _store_lock:
+            if filename in _streamed:
+                _queue_streamed(filename, [{'op': 'update', 'column': key_column, 'value': key_value, 'data': dict(updated_data)}])
+                return
+            table = _get_table(filename)
+            labels = _matching_labels(table, filename, key_column, key_value)
+            if not labels:
+                return
+            df = table['df']
+            _unindex_rows(table, filename, labels)
+            for key, value in updated_data.items():
+                _assign(filename, df, labels, key, value)
+            _index_rows(table, filename, labels)
+            _queue_record(filename, {'op': 'update', 'column': key_column, 'value': key_value, 'data': dict(updated_data)})
+            notify(filename, updated=labels)
     except Exception as e:
         raise Exception(f"Error updating entry in {filename}: {e}")
 
+def entry_exists(filename, key_value):
+    """Check whether a primary key is present using the hash index (O(1))."""
+    try:
+        with _store_lock:
+            if filename in _streamed:
+                return _text(key_value) in _streamed_keys(filename)
+            return key_value in _key_index(_get_table(filename), filename)
+    except Exception as e:
+        raise Exception(f"Error looking up entry in {filename}: {e}")
+
+def existing_keys(filename, key_values):
+    """Return the key_values that are present as primary keys, with one hash lookup each."""
+    try:
+        with _store_lock:
+            if filename in _streamed:
+                keys = _streamed_keys(filename)
+                return {key_value for key_value in key_values if _text(key_value) in keys}
+            return _key_index(_get_table(filename), filename).present(key_values)
+    except Exception as e:
+        raise Exception(f"Error looking up entries in {filename}: {e}")
+
+def get_entry(filename, key_value):
+    """Return the row stored under a primary key as a dict, or None."""
+    try:
+        with _store_lock:
+            if filename in _streamed:
+                key_column = KEY_COLUMNS[filename]
+                for chunk in _stream_rows(filename, TABLE_COLUMNS[filename]):
+                    found = chunk[chunk[key_column] == _text(key_value)]
+                    if not found.empty:
+                        return found.iloc[0].to_dict()
+                return None
+            table = _get_table(filename)
+            labels = _key_index(table, filename).get(key_value)
+            if not labels:
+                return None
+            return table['df'].loc[labels[0]].to_dict()
+    except Exception as e:
+        raise Exception(f"Error looking up entry in {filename}: {e}")
+
+def is_referenced(filename, column, value):
+    """Check whether any row of filename still points at value through a foreign key."""
+    try:
+        with _store_lock:
+            if filename in _streamed:
+                return any((chunk[column] == _text(value)).any() for chunk in _stream_rows(filename, [column]))
+            if _fresh_table(filename) is None:
+                # Not loaded yet: parse just this column rather than the whole table
+                values = read_columns(filename, [column])[column]
+                return bool((values == value).any())
+            return bool(_reference_index(_get_table(filename), column).get(value))
+    except Exception as e:
+        raise Exception(f"Error checking references in {filename}: {e}")
+
+def update_references(filename, column, old_value, new_value):
+    """Cascade a renamed key to the rows that reference it, touching only those rows.
+
+    Returns the number of rows updated, or None for a streamed table, whose
+    rows aren't read: the change is journaled for whichever rows match.
+    """
+    try:
+        with _store_lock:
+            if filename in _streamed:
+                _queue_streamed(filename, [{'op': 'update', 'column': column, 'value': old_value, 'data': {column: new_value}}])
+                return None
+            table = _get_table(filename)
+            labels = sorted(_reference_index(table, column).get(old_value, ()))
+            if not labels:
+                return 0
+            _unindex_rows(table, filename, labels)
+            _assign(filename, table['df'], labels, column, new_value)
+            _index_rows(table, filename, labels)
+            _queue_record(filename, {'op': 'update', 'column': column, 'value': old_value, 'data': {column: new_value}})
+            notify(filename, updated=labels)
+            return len(labels)
+    except Exception as e:
+        raise Exception(f"Error updating references in {filename}: {e}")
+
+def search_entries(filename, text, column=None):
+    """Return the row labels whose text contains text (case-insensitive), in column or in any column."""
+    try:
+        with _store_lock:
+            index = _search_index(_get_table(filename))
+        return index.search(text, column)
+    except Exception as e:
+        raise Exception(f"Error searching {filename}: {e}")
+
 def list_entries(filename):
+    # Returns the shared in-memory table; callers that modify it must
+    # persist the change through write_csv.
     try:
         return read_csv(filename)
     except Exception as e:
-        raise Exception(f"Error listing entries from {filename}: {e}")
\ No newline at end of file
+        raise Exception(f"Error listing entries from {filename}: {e}")
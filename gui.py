@@ -1,18 +1,93 @@
+import functools
 import sys
-import pandas as pd
-import re
+import threading
 from PyQt6.QtGui import QIcon, QShortcut, QKeySequence
-from PyQt6.QtCore import QSize, Qt
+from PyQt6.QtCore import QSize, Qt, QTimer
 from PyQt6.QtWidgets import (
-    QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QTableWidget, QTableWidgetItem,
-    QPushButton, QLineEdit, QLabel, QDialog, QFormLayout, QMessageBox, QComboBox, QTabWidget, QHeaderView
+    QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QTableView,
+    QPushButton, QLineEdit, QLabel, QDialog, QFormLayout, QMessageBox, QComboBox, QTabWidget, QHeaderView,
+    QFileDialog, QProgressDialog, QProgressBar
 )
 
-from csv_handler import ensure_csv_files_exist, read_csv
+from storage import data_lock, ensure_storage, flush, has_pending_changes, transaction
 from student_handler import *
 from program_handler import *
 from college_handler import *
+from table_model import DataFrameTableModel
+from paged_table import PagedTableModel, paged_path
+from search_worker import SearchController
+from storage_worker import StorageWorker
+from reference_data import college_codes, program_codes
+from code_picker import CodeListModel, attach_codes, code_completer
+from bulk_import import import_students
+from table_export import ExportCancelled, export_chunks, with_program_and_college
+from validation import (
+    DUPLICATE_CODE, DUPLICATE_ID_NUMBER, DUPLICATE_NAME, EMPTY_FIELD, INVALID_COLLEGE_CODE, INVALID_ID_NUMBER,
+    INVALID_PROGRAM_CODE, INVALID_YEAR_LEVEL, UNKNOWN_COLLEGE_CODE, UNKNOWN_PROGRAM_CODE,
+    validate_colleges, validate_programs, validate_students
+)
+
+
+# Title and message shown for each validation error code; {column} is filled in from the row
+STUDENT_ERRORS = {
+    EMPTY_FIELD: ("Empty Fields", "All fields are required."),
+    INVALID_ID_NUMBER: ("Invalid ID Number", "ID Number must be in the format YYYY-NNNN."),
+    INVALID_YEAR_LEVEL: ("Invalid Year Level", "Year Level must be 1, 2, 3, or 4."),
+    INVALID_PROGRAM_CODE: ("Invalid Program Code", "Program Code must be 2-10 characters long and can include uppercase, lowercase letters, and '-' (e.g., BSCS, bs-it)."),
+    UNKNOWN_PROGRAM_CODE: ("Invalid Program Code", "Program Code '{Program Code}' does not exist in the Programs table."),
+    DUPLICATE_ID_NUMBER: ("Duplicate ID", "A student with this ID Number already exists.")
+}
+
+PROGRAM_ERRORS = {
+    EMPTY_FIELD: ("Empty Fields", "All fields are required."),
+    INVALID_PROGRAM_CODE: ("Invalid Program Code", "Program Code must be 2-10 characters long and can include uppercase, lowercase letters, and '-' (e.g., BSCS)."),
+    UNKNOWN_COLLEGE_CODE: ("Invalid College Code", "College Code '{College}' does not exist in the Colleges table."),
+    DUPLICATE_CODE: ("Duplicate Code", "A program with the Code '{Code}' already exists."),
+    DUPLICATE_NAME: ("Duplicate Name", "A program with the Name '{Name}' already exists.")
+}
+
+COLLEGE_ERRORS = {
+    EMPTY_FIELD: ("Empty Fields", "All fields are required."),
+    INVALID_COLLEGE_CODE: ("Invalid College Code", "College Code must consist of all letters and no numbers."),
+    DUPLICATE_CODE: ("Duplicate Code", "A college with this Code already exists."),
+    DUPLICATE_NAME: ("Duplicate Name", "A college with this Name already exists.")
+}
+
+
+def show_validation_error(dialog, messages, error, values):
+    title, message = messages.get(error, ("Invalid Entry", error))
+    QMessageBox.warning(dialog, title, message.format_map(values))
+
+
+def save_in_background(dialog, table, validate, messages, values, function, *args):
+    """Validate and save a dialog's row in one task on the storage worker; the dialog closes once it is saved.
+
+    validate() returns the row's validation error code, '' when it is
+    valid; an invalid row is not saved and its error is shown instead.
+    """
+    dialog.save_button.setEnabled(False)
+
+    def failed(error):
+        dialog.save_button.setEnabled(True)
+        QMessageBox.critical(dialog, "Error", f"An error occurred: {error}")
+
+    def done(error):
+        if error:
+            dialog.save_button.setEnabled(True)
+            show_validation_error(dialog, messages, error, values)
+            return
+        dialog.accept()
+
+    dialog.parent().worker.write(table, _validated_save, validate, function, *args, on_done=done, on_error=failed)
+
 
+def _validated_save(validate, function, *args):
+    # Runs on the storage worker; the transaction keeps other writers out between the check and the save
+    with transaction():
+        error = validate()
+        if not error:
+            function(*args)
+    return error
 
 
 class AddEditStudentDialog(QDialog):
@@ -47,12 +122,12 @@ class AddEditStudentDialog(QDialog):
         self.program_code.setObjectName("programCode")
         self.program_code.setEditable(True)  # Allow typing and searching
 
-        # Populate Program Code dropdown with valid codes from Program.csv
-        try:
-            programs = list_programs()
-            self.program_code.addItems(programs['Code'].tolist())
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Failed to load programs: {e}")
+        # Program Code dropdown shows the code list shared by every dialog, typing pops up the codes containing the text
+        self.program_code.setCompleter(code_completer(parent.program_code_model, self.program_code))
+        parent.program_code_model.load(
+            lambda: attach_codes(self.program_code, parent.program_code_model),
+            on_error=lambda e: QMessageBox.critical(self, "Error", f"Failed to load programs: {e}")
+        )
 
         layout.addRow("ID Number:", self.id_number)
         layout.addRow("First Name:", self.first_name)
@@ -88,50 +163,21 @@ class AddEditStudentDialog(QDialog):
 
     def save_student(self):
         try:
-            # Get input values
-            id_number = self.id_number.text().strip()
-            first_name = self.first_name.text().strip()
-            last_name = self.last_name.text().strip()
-            year_level = self.year_level.currentText()
-            gender = self.gender.currentText()
-            program_code = self.program_code.currentText().strip()  # Get the current text from the combo box
-
-            # Validate ID Number format (YYYY-NNNN)
-            if not re.match(r"^\d{4}-\d{4}$", id_number):
-                QMessageBox.warning(self, "Invalid ID Number", "ID Number must be in the format YYYY-NNNN.")
-                return
-
-            # Validate Program Code format (uppercase, lowercase, and '-')
-            if not re.match(r"^[A-Za-z\- ]{2,10}$", program_code):
-                QMessageBox.warning(self, "Invalid Program Code", "Program Code must be 2-10 characters long and can include uppercase, lowercase letters, and '-' (e.g., BSCS, bs-it).")
-                return
-
-            # Validate Year Level (must be 1, 2, 3, or 4)
-            if year_level not in ["1", "2", "3", "4"]:
-                QMessageBox.warning(self, "Invalid Year Level", "Year Level must be 1, 2, 3, or 4.")
-                return
-
-            # Validate empty fields
-            if not all([id_number, first_name, last_name, program_code]):
-                QMessageBox.warning(self, "Empty Fields", "All fields are required.")
-                return
-
-            # Foreign Key Validation: Check if Program Code exists in Program.csv
-            programs = list_programs()
-            if program_code not in programs['Code'].values:
-                QMessageBox.warning(self, "Invalid Program Code", f"Program Code '{program_code}' does not exist in the Programs table.")
-                return
-
-            # Prepare student data
+            # Prepare student data from the input values
             student_data = {
-                'ID Number': id_number,
-                'First Name': first_name,
-                'Last Name': last_name,
-                'Year Level': year_level,
-                'Gender': gender,
-                'Program Code': program_code
+                'ID Number': self.id_number.text().strip(),
+                'First Name': self.first_name.text().strip(),
+                'Last Name': self.last_name.text().strip(),
+                'Year Level': self.year_level.currentText(),
+                'Gender': self.gender.currentText(),
+                'Program Code': self.program_code.currentText().strip()  # Get the current text from the combo box
             }
 
+            # Validated as a batch of one when saving: formats, empty fields, existing program,
+            # unused ID (the student's own ID when editing doesn't count as taken)
+            own_ids = [self.student_data['ID Number']] if self.student_data else []
+            validate = lambda: validate_students([student_data], ignore_ids=own_ids).iloc[0]
+
             # Add or update student
             if self.student_data:
                 save_confirmation = QMessageBox.question(
@@ -139,25 +185,17 @@ class AddEditStudentDialog(QDialog):
                     QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
                 )
                 if save_confirmation == QMessageBox.StandardButton.Yes:
-                    # Check for duplicate ID if the ID number was changed
-                    if id_number != self.student_data['ID Number']:
-                        students = list_students()
-                        if id_number in students['ID Number'].values:
-                            QMessageBox.warning(self, "Duplicate ID", "A student with this ID Number already exists.")
-                            return
-                    update_student(self.student_data['ID Number'], student_data)
+                    save_in_background(self, 'Student.csv', validate, STUDENT_ERRORS, student_data,
+                                       update_student, self.student_data['ID Number'], student_data)
+                    return
             else:
                 save_confirmation = QMessageBox.question(
                     self, "Add Student", "Are you sure you want to add this student?",
                     QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
                 )
                 if save_confirmation == QMessageBox.StandardButton.Yes:
-                    # Check if ID Number already exists
-                    students = list_students()
-                    if id_number in students['ID Number'].values:
-                        QMessageBox.warning(self, "Duplicate ID", "A student with this ID Number already exists.")
-                        return
-                    add_student(student_data)
+                    save_in_background(self, 'Student.csv', validate, STUDENT_ERRORS, student_data, add_student, student_data)
+                    return
 
             
             self.accept()
@@ -184,13 +222,14 @@ class AddEditProgramDialog(QDialog):
         self.college = QComboBox()
         self.college.setObjectName("collegeCodeCombo")
         self.college.setFixedWidth(75)
+        self.college.setEditable(True)
 
-        # Populate College dropdown with valid codes from College.csv
-        try:
-            colleges = list_colleges()
-            self.college.addItems(colleges['Code'].tolist())
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Failed to load colleges: {e}")
+        # College dropdown shows the code list shared by every dialog, typing pops up the codes containing the text
+        self.college.setCompleter(code_completer(parent.college_code_model, self.college))
+        parent.college_code_model.load(
+            lambda: attach_codes(self.college, parent.college_code_model),
+            on_error=lambda e: QMessageBox.critical(self, "Error", f"Failed to load colleges: {e}")
+        )
 
         layout.addRow("Program code:", self.code)
         layout.addRow("Name:", self.name)
@@ -214,43 +253,20 @@ class AddEditProgramDialog(QDialog):
 
     def save_program(self):
         try:
-            # Get input values
-            code = self.code.text().strip()
-            name = self.name.text().strip()
-            college = self.college.currentText().strip()
-
-            # Validate Program Code format (uppercase, lowercase, and '-')
-            if not re.match(r"^[A-Za-z\- ]{2,10}$", code):
-                QMessageBox.warning(self, "Invalid Program Code", "Program Code must be 2-10 characters long and can include uppercase, lowercase letters, and '-' (e.g., BSCS).")
-                return
-
-            # Validate empty fields
-            if not all([code, name, college]):
-                QMessageBox.warning(self, "Empty Fields", "All fields are required.")
-                return
-
-            # Foreign Key Validation: Check if College Code exists in College.csv
-            colleges = list_colleges()
-            if college not in colleges['Code'].values:
-                QMessageBox.warning(self, "Invalid College Code", f"College Code '{college}' does not exist in the Colleges table.")
-                return
-            
-            # Check if Program Code and Name already exists
-            programs = list_programs()
-            if code in programs['Code'].values and (not self.program_data or self.program_data['Code'] != code):
-                QMessageBox.warning(self, "Duplicate Code", f"A program with the Code '{code}' already exists.")
-                return
-            if name in programs['Name'].values and (not self.program_data or self.program_data['Name'] != name):
-                QMessageBox.warning(self, "Duplicate Name", f"A program with the Name '{name}' already exists.")
-                return
-
-            # Prepare program data
+            # Prepare program data from the input values
             program_data = {
-                'Code': code,
-                'Name': name,
-                'College': college
+                'Code': self.code.text().strip(),
+                'Name': self.name.text().strip(),
+                'College': self.college.currentText().strip()
             }
 
+            # Validated as a batch of one when saving: code format, empty fields, existing college, unused code and name
+            validate = lambda: validate_programs(
+                [program_data],
+                ignore_codes=[self.program_data['Code']] if self.program_data else [],
+                ignore_names=[self.program_data['Name']] if self.program_data else []
+            ).iloc[0]
+
             # Add or update program
             if self.program_data:
                 save_confirmation = QMessageBox.question(
@@ -258,26 +274,19 @@ class AddEditProgramDialog(QDialog):
                     QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
                 )
                 if save_confirmation == QMessageBox.StandardButton.Yes:
-                    old_code = self.program_data['Code']
-                    update_program(old_code, program_data)
-                    if old_code != code:
-                        update_student_program_code(old_code, code)
-                    
+                    # update_program cascades a code change to the students itself
+                    save_in_background(self, 'Program.csv', validate, PROGRAM_ERRORS, program_data,
+                                       update_program, self.program_data['Code'], program_data)
+                    return
+
             else:
                 save_confirmation = QMessageBox.question(
                     self, "Add Program", "Are you sure you want to add this program?",
                     QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
                 )
                 if save_confirmation == QMessageBox.StandardButton.Yes:
-                    # Check if Code already exists
-                    programs = list_programs()
-                    if code in programs['Code'].values:
-                        QMessageBox.warning(self, "Duplicate Code", "A program with this Code already exists.")
-                        return
-                    if name in programs['Name'].values:
-                        QMessageBox.warning(self, "Duplicate Name", "A program with this Name already exists.")
-                        return
-                    add_program(program_data)
+                    save_in_background(self, 'Program.csv', validate, PROGRAM_ERRORS, program_data, add_program, program_data)
+                    return
 
             self.accept()
         except Exception as e:
@@ -323,55 +332,26 @@ class AddEditCollegeDialog(QDialog):
 
     def save_college(self):
         try:
-            # Get input values
-            code = self.code.text().strip()
-            name = self.name.text().strip()
-
-            # Validate College Code format (all letters, no numbers)
-            if not re.match(r"^[A-Za-z]+$", code):
-                QMessageBox.warning(self, "Invalid College Code", "College Code must consist of all letters and no numbers.")
-                return
-
-            # Validate empty fields
-            if not all([code, name]):
-                QMessageBox.warning(self, "Empty Fields", "All fields are required.")
-                return
-
-            # Prepare college data
+            # Prepare college data from the input values
             college_data = {
-                'Code': code,
-                'Name': name
+                'Code': self.code.text().strip(),
+                'Name': self.name.text().strip()
             }
 
+            # Validated as a batch of one when saving: code format, empty fields, unused code and name
+            validate = lambda: validate_colleges(
+                [college_data],
+                ignore_codes=[self.college_data['Code']] if self.college_data else [],
+                ignore_names=[self.college_data['Name']] if self.college_data else []
+            ).iloc[0]
 
             # Add or update college
             if self.college_data:
-                old_code = self.college_data['Code']
-                if old_code != code:
-                    # Check if new Code already exists
-                    colleges = list_colleges()
-                    if code in colleges['Code'].values:
-                        QMessageBox.warning(self, "Duplicate Code", "A college with this Code already exists.")
-                        return
-                    update_college(old_code, college_data)
-                    update_program_college_code(old_code, code)
-                else:
-                    update_college(old_code, college_data)
-
+                # Also renames the code in the programs
+                save_in_background(self, 'College.csv', validate, COLLEGE_ERRORS, college_data,
+                                   update_college, self.college_data['Code'], college_data)
             else:
-                # Check if Code already exists
-                colleges = list_colleges()
-                if code in colleges['Code'].values:
-                    QMessageBox.warning(self, "Duplicate Code", "A college with this Code already exists.")
-                    return
-                if name in colleges['Name'].values:
-                    QMessageBox.warning(self, "Duplicate Name", "A college with this Name already exists.")
-                    return
-                add_college(college_data)
-
-
-
-            self.accept()
+                save_in_background(self, 'College.csv', validate, COLLEGE_ERRORS, college_data, add_college, college_data)
         except Exception as e:
             QMessageBox.critical(self, "Error", f"An error occurred: {e}")
 
@@ -383,13 +363,28 @@ class StudentInformationSystem(QMainWindow):
         self.setWindowIcon(QIcon("icons/windowIcon.png"))
         self.setGeometry(100, 100, 900, 600)
 
-        # Initialize CSV files
+        # Initialize CSV files (or the database when SSIS_STORAGE=sqlite)
         try:
-            ensure_csv_files_exist()
+            ensure_storage()
         except Exception as e:
-            QMessageBox.critical(self, "Error", f"Failed to initialize CSV files: {e}")
+            QMessageBox.critical(self, "Error", f"Failed to initialize storage: {e}")
             sys.exit(1)
 
+        # Table loads and saves run on background threads; the status bar shows while any are running
+        self.worker = StorageWorker(self)
+        self.busy_indicator = QProgressBar()
+        self.busy_indicator.setObjectName("busyIndicator")
+        self.busy_indicator.setRange(0, 0)  # Indeterminate
+        self.busy_indicator.setMaximumWidth(120)
+        self.busy_indicator.hide()
+        self.statusBar().addPermanentWidget(self.busy_indicator)
+        self.worker.busy_changed.connect(self.show_busy)
+        self.worker.failed.connect(lambda message: QMessageBox.critical(self, "Error", message))
+
+        # Code lists shared by the pickers of every dialog
+        self.program_code_model = CodeListModel('Program.csv', program_codes, self.worker, self)
+        self.college_code_model = CodeListModel('College.csv', college_codes, self.worker, self)
+
         self.central_widget = QWidget()
         self.setCentralWidget(self.central_widget)
 
@@ -407,10 +402,19 @@ class StudentInformationSystem(QMainWindow):
 
         self.layout.addWidget(self.tabs)
 
-        # Initialize tabs
+        # Initialize tabs; their tables are loaded when the tab is first shown
         self.init_student_tab()
         self.init_program_tab()
         self.init_college_tab()
+        self.tab_loaders = {
+            self.student_tab: self.refresh_student_table,
+            self.program_tab: self.refresh_program_table,
+            self.college_tab: self.refresh_college_table
+        }
+        self.loaded_tabs = set()
+        self.tabs.currentChanged.connect(self.load_tab)
+        # Start reading the visible table once the window is up
+        QTimer.singleShot(0, lambda: self.load_tab(self.tabs.currentIndex()))
 
         # Add shortcut for unselecting rows
         self.add_shortcuts()
@@ -419,6 +423,45 @@ class StudentInformationSystem(QMainWindow):
         self.escape_shortcut = QShortcut(QKeySequence(Qt.Key.Key_Escape), self)
         self.escape_shortcut.activated.connect(self.unselect_all_rows)
 
+        # Write pending changes now when write-behind mode is on (SSIS_WRITE_BEHIND)
+        self.save_shortcut = QShortcut(QKeySequence.StandardKey.Save, self)
+        self.save_shortcut.activated.connect(self.save_changes)
+
+    def save_changes(self):
+        try:
+            flush()
+        except Exception as e:
+            QMessageBox.critical(self, "Error", f"Failed to save changes: {e}")
+            return False
+        return True
+
+    def show_busy(self, busy):
+        self.busy_indicator.setVisible(busy)
+        if busy:
+            self.statusBar().showMessage("Working...")
+            QApplication.setOverrideCursor(Qt.CursorShape.BusyCursor)
+        else:
+            self.statusBar().clearMessage()
+            QApplication.restoreOverrideCursor()
+
+    def closeEvent(self, event):
+        self.worker.wait()  # Let queued saves finish before the pending changes are flushed
+        if has_pending_changes() and not self.save_changes():
+            reply = QMessageBox.question(self, "Unsaved Changes", "Some changes could not be saved. Quit anyway?",
+                                         QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No)
+            if reply != QMessageBox.StandardButton.Yes:
+                event.ignore()
+                return
+        event.accept()
+
+    def load_tab(self, index):
+        """Load a tab's table the first time the tab is shown."""
+        tab = self.tabs.widget(index)
+        if tab is None or tab in self.loaded_tabs:
+            return
+        self.loaded_tabs.add(tab)
+        self.tab_loaders[tab]()
+
     def unselect_all_rows(self):
         self.student_table.clearSelection()
         self.program_table.clearSelection()
@@ -432,8 +475,8 @@ class StudentInformationSystem(QMainWindow):
         self.student_search_bar = QLineEdit()
         self.student_search_bar.setObjectName("studentSearchBar")
         self.student_search_bar.setPlaceholderText("Search by ID, Name, or Program Code")
-        self.student_search_bar.textChanged.connect(self.filter_student_table)
-        self.student_search_bar.returnPressed.connect(self.filter_student_table)  # Run search on Enter key press
+        self.student_search_bar.textChanged.connect(self.search_student_table)  # Debounced, runs off the GUI thread
+        self.student_search_bar.returnPressed.connect(self.run_student_search)  # Run search on Enter key press
 
         self.search_by_label = QComboBox()
         self.search_by_label.setObjectName("searchByLabel")
@@ -453,15 +496,33 @@ class StudentInformationSystem(QMainWindow):
         layout.addLayout(search_layout)
 
         # Table to display students
-        self.student_table = QTableWidget()
-        self.student_table.setColumnCount(6)
-        self.student_table.setHorizontalHeaderLabels(['ID Number', 'First Name', 'Last Name', 'Year Level', 'Gender', 'Program Code'])
+        self.student_table = QTableView()
+        student_alignments = {0: Qt.AlignmentFlag.AlignCenter, 3: Qt.AlignmentFlag.AlignCenter, 4: Qt.AlignmentFlag.AlignCenter}
+        student_path = paged_path('Student.csv')
+        if student_path:
+            # Too large to load: rows are read from the file as they are scrolled into view
+            self.student_model = PagedTableModel(
+                student_path, table='Student.csv', column_alignments=student_alignments, worker=self.worker
+            )
+        else:
+            self.student_model = DataFrameTableModel(
+                ['ID Number', 'First Name', 'Last Name', 'Year Level', 'Gender', 'Program Code'],
+                column_alignments=student_alignments,
+                search_function=search_students,
+                table='Student.csv',
+                source=list_students,
+                lock=data_lock(),
+                worker=self.worker
+            )
+        self.student_model.error.connect(lambda message: QMessageBox.critical(self, "Error", message))
+        self.student_table.setModel(self.student_model)
+        self.student_search = SearchController(self.student_model, self)
         self.student_table.setSortingEnabled(True)  # Enable sorting
-        self.student_table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)  # Select entire row
-        self.student_table.setSelectionMode(QTableWidget.SelectionMode.MultiSelection)  # Allow multiple selection
+        self.student_table.setSelectionBehavior(QTableView.SelectionBehavior.SelectRows)  # Select entire row
+        self.student_table.setSelectionMode(QTableView.SelectionMode.MultiSelection)  # Allow multiple selection
         self.student_table.horizontalHeader().setStretchLastSection(True)  # Stretch last section to fit window
         self.student_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)  # Resize columns to fit window
-        self.student_table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)  # Disable cell editing
+        self.student_table.setEditTriggers(QTableView.EditTrigger.NoEditTriggers)  # Disable cell editing
         self.student_table.verticalHeader().setVisible(False)  # Hide row numbers
         layout.addWidget(self.student_table)
 
@@ -489,14 +550,23 @@ class StudentInformationSystem(QMainWindow):
         self.refresh_student_button.clicked.connect(self.refresh_student_table)
         self.refresh_student_button.setIcon(QIcon("icons/refresh.png"))
 
+        self.export_student_button = QPushButton("Export")
+        self.export_student_button.setObjectName("exportStudentButton")
+        self.export_student_button.clicked.connect(self.export_students)
+
+        self.import_student_button = QPushButton("Import CSV")
+        self.import_student_button.setObjectName("importStudentButton")
+        self.import_student_button.clicked.connect(self.import_students)
+        self.import_student_button.setIcon(QIcon("icons/add.png"))
+
         self.student_button_layout.addWidget(self.add_student_button)
         self.student_button_layout.addWidget(self.edit_student_button)
         self.student_button_layout.addWidget(self.delete_student_button)
         self.student_button_layout.addWidget(self.refresh_student_button)
+        self.student_button_layout.addWidget(self.export_student_button)
+        self.student_button_layout.addWidget(self.import_student_button)
         layout.addLayout(self.student_button_layout)
 
-        self.refresh_student_table()
-
     def init_program_tab(self):
         layout = QVBoxLayout(self.program_tab)
 
@@ -505,8 +575,8 @@ class StudentInformationSystem(QMainWindow):
         self.program_search_bar = QLineEdit()
         self.program_search_bar.setObjectName("programSearchBar")
         self.program_search_bar.setPlaceholderText("Search by Code or Name")
-        self.program_search_bar.textChanged.connect(self.filter_program_table)
-        self.program_search_bar.returnPressed.connect(self.filter_program_table)  # Run search on Enter key press
+        self.program_search_bar.textChanged.connect(self.search_program_table)
+        self.program_search_bar.returnPressed.connect(self.run_program_search)  # Run search on Enter key press
 
         self.clear_program_search_button = QPushButton("")
         self.clear_program_search_button.setMinimumHeight(50)
@@ -521,14 +591,24 @@ class StudentInformationSystem(QMainWindow):
         layout.addLayout(search_layout)
 
         # Table to display programs
-        self.program_table = QTableWidget()
-        self.program_table.setColumnCount(3)
-        self.program_table.setHorizontalHeaderLabels(['Code', 'Name', 'College'])
+        self.program_table = QTableView()
+        self.program_model = DataFrameTableModel(
+            ['Code', 'Name', 'College'],
+            column_alignments={0: Qt.AlignmentFlag.AlignCenter, 2: Qt.AlignmentFlag.AlignCenter},
+            search_function=search_programs,
+            table='Program.csv',
+            source=list_programs,
+            lock=data_lock(),
+            worker=self.worker
+        )
+        self.program_model.error.connect(lambda message: QMessageBox.critical(self, "Error", message))
+        self.program_table.setModel(self.program_model)
+        self.program_search = SearchController(self.program_model, self)
         self.program_table.setSortingEnabled(True)  # Enable sorting
-        self.program_table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)  # Select entire row
+        self.program_table.setSelectionBehavior(QTableView.SelectionBehavior.SelectRows)  # Select entire row
         self.program_table.horizontalHeader().setStretchLastSection(True)  # Stretch last section to fit window
         self.program_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)  # Resize columns to fit window
-        self.program_table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)  # Disable cell editing
+        self.program_table.setEditTriggers(QTableView.EditTrigger.NoEditTriggers)  # Disable cell editing
         self.program_table.verticalHeader().setVisible(False)  # Hide row numbers
         layout.addWidget(self.program_table)
 
@@ -555,14 +635,17 @@ class StudentInformationSystem(QMainWindow):
         self.refresh_program_button.clicked.connect(self.refresh_program_table)
         self.refresh_program_button.setIcon(QIcon("icons/refresh.png"))
 
+        self.export_program_button = QPushButton("Export")
+        self.export_program_button.setObjectName("exportProgramButton")
+        self.export_program_button.clicked.connect(self.export_programs)
+
         self.program_button_layout.addWidget(self.add_program_button)
         self.program_button_layout.addWidget(self.edit_program_button)
         self.program_button_layout.addWidget(self.delete_program_button)
         self.program_button_layout.addWidget(self.refresh_program_button)
+        self.program_button_layout.addWidget(self.export_program_button)
         layout.addLayout(self.program_button_layout)
 
-        self.refresh_program_table()
-
     def init_college_tab(self):
         layout = QVBoxLayout(self.college_tab)
 
@@ -571,8 +654,8 @@ class StudentInformationSystem(QMainWindow):
         self.college_search_bar = QLineEdit()
         self.college_search_bar.setObjectName("collegeSearchBar")
         self.college_search_bar.setPlaceholderText("Search by Code or Name")
-        self.college_search_bar.textChanged.connect(self.filter_college_table)
-        self.college_search_bar.returnPressed.connect(self.filter_college_table)  # Run search on Enter key press
+        self.college_search_bar.textChanged.connect(self.search_college_table)
+        self.college_search_bar.returnPressed.connect(self.run_college_search)  # Run search on Enter key press
 
         self.clear_college_search_button = QPushButton("")
         self.clear_college_search_button.setMinimumHeight(50)
@@ -587,14 +670,24 @@ class StudentInformationSystem(QMainWindow):
         layout.addLayout(search_layout)
 
         # Table to display colleges
-        self.college_table = QTableWidget()
-        self.college_table.setColumnCount(2)
-        self.college_table.setHorizontalHeaderLabels(['Code', 'Name'])
+        self.college_table = QTableView()
+        self.college_model = DataFrameTableModel(
+            ['Code', 'Name'],
+            column_alignments={0: Qt.AlignmentFlag.AlignCenter},
+            search_function=search_colleges,
+            table='College.csv',
+            source=list_colleges,
+            lock=data_lock(),
+            worker=self.worker
+        )
+        self.college_model.error.connect(lambda message: QMessageBox.critical(self, "Error", message))
+        self.college_table.setModel(self.college_model)
+        self.college_search = SearchController(self.college_model, self)
         self.college_table.setSortingEnabled(True)  # Enable sorting
-        self.college_table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)  # Select entire row
+        self.college_table.setSelectionBehavior(QTableView.SelectionBehavior.SelectRows)  # Select entire row
         self.college_table.horizontalHeader().setStretchLastSection(True)  # Stretch last section to fit window
         self.college_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)  # Resize columns to fit window
-        self.college_table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)  # Disable cell editing
+        self.college_table.setEditTriggers(QTableView.EditTrigger.NoEditTriggers)  # Disable cell editing
         self.college_table.verticalHeader().setVisible(False)  # Hide row numbers
         layout.addWidget(self.college_table)
 
@@ -621,14 +714,17 @@ class StudentInformationSystem(QMainWindow):
         self.refresh_college_button.clicked.connect(self.refresh_college_table)
         self.refresh_college_button.setIcon(QIcon("icons/refresh.png"))
 
+        self.export_college_button = QPushButton("Export")
+        self.export_college_button.setObjectName("exportCollegeButton")
+        self.export_college_button.clicked.connect(self.export_colleges)
+
         self.college_button_layout.addWidget(self.add_college_button)
         self.college_button_layout.addWidget(self.edit_college_button)
         self.college_button_layout.addWidget(self.delete_college_button)
         self.college_button_layout.addWidget(self.refresh_college_button)
+        self.college_button_layout.addWidget(self.export_college_button)
         layout.addLayout(self.college_button_layout)
 
-        self.refresh_college_table()
-
     def delete_confirm(self, message):
         return QMessageBox.question(
             self, f"Delete {message}", f"Are you sure you want to delete the selected {message}?",
@@ -639,121 +735,121 @@ class StudentInformationSystem(QMainWindow):
         selected_rows = self.student_table.selectionModel().selectedRows()
         delete_confirmation = self.delete_confirm("students")
         if delete_confirmation == QMessageBox.StandardButton.Yes and selected_rows:
-            try:
-                for index in sorted(selected_rows, reverse=True):
-                    student_id = self.student_table.item(index.row(), 0).text()
-                    delete_student(student_id)
-                self.refresh_student_table()
-            except Exception as e:
-                QMessageBox.critical(self, "Error", f"Failed to delete students: {e}")
+            student_ids = [self.student_model.value(index.row(), 0) for index in selected_rows]
+            # The table drops the rows through change events
+            self.worker.write('Student.csv', delete_students, student_ids,
+                              on_error=lambda e: QMessageBox.critical(self, "Error", f"Failed to delete students: {e}"))
+
+    def import_students(self):
+        path, _ = QFileDialog.getOpenFileName(self, "Import Students", "", "CSV Files (*.csv)")
+        if not path:
+            return
+        progress = QProgressDialog("Importing students...", None, 0, 0, self)
+        progress.setWindowTitle("Import Students")
+        progress.setWindowModality(Qt.WindowModality.WindowModal)
+        progress.show()
+
+        def report(rows_read):
+            progress.setLabelText(f"Checked {rows_read:,} rows...")
+
+        def imported(result):
+            progress.close()
+            accepted, rejected, rejects_path = result
+            message = f"{accepted} students imported."
+            if rejected:
+                message += f"\n{rejected} rows were rejected; see {rejects_path}"
+            QMessageBox.information(self, "Import Students", message)
+
+        def failed(e):
+            progress.close()
+            QMessageBox.critical(self, "Error", f"Failed to import students: {e}")
+
+        # Read, checked and saved on the storage worker, after any student saves already queued
+        self.worker.write('Student.csv', import_students, path, on_done=imported, on_error=failed, on_progress=report)
+
+    def export_table(self, table_view, title, join=None):
+        """Stream the rows currently shown in table_view to a CSV, JSON or Parquet file."""
+        path, _ = QFileDialog.getSaveFileName(
+            self, f"Export {title}", f"{title}.csv", "CSV Files (*.csv);;JSON Files (*.json);;Parquet Files (*.parquet)"
+        )
+        if not path:
+            return
+        model = table_view.model()
+        chunks = model.export_chunks()
+        if join is not None:
+            chunks = join(chunks)
+
+        progress = QProgressDialog(f"Exporting {title.lower()}...", "Cancel", 0, model.rowCount(), self)
+        progress.setWindowTitle(f"Export {title}")
+        progress.setWindowModality(Qt.WindowModality.WindowModal)
+        progress.setMinimumDuration(0)
+        progress.setAutoClose(False)
+        # Checked from the worker thread between chunks
+        cancelled = threading.Event()
+        progress.canceled.connect(cancelled.set)
+
+        def exported(written):
+            progress.close()
+            QMessageBox.information(self, f"Export {title}", f"{written} rows exported to {path}.")
+
+        def failed(e):
+            progress.close()
+            if not isinstance(e, ExportCancelled):
+                QMessageBox.critical(self, "Error", f"Failed to export {title.lower()}: {e}")
+
+        # The chunks are read and written on the storage worker
+        self.worker.read(
+            functools.partial(export_chunks, is_cancelled=cancelled.is_set), chunks, path,
+            on_done=exported, on_error=failed, on_progress=progress.setValue
+        )
+
+    def export_students(self):
+        reply = QMessageBox.question(
+            self, "Export Students", "Include each student's program and college names?",
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
+        )
+        join = with_program_and_college if reply == QMessageBox.StandardButton.Yes else None
+        self.export_table(self.student_table, "Students", join)
+
+    def export_programs(self):
+        self.export_table(self.program_table, "Programs")
+
+    def export_colleges(self):
+        self.export_table(self.college_table, "Colleges")
 
     def delete_program(self):
-        selected_row = self.program_table.currentRow()
+        selected_row = self.program_table.currentIndex().row()
         delete_confirmation = self.delete_confirm("program")
         if delete_confirmation == QMessageBox.StandardButton.Yes and selected_row >= 0:
-            try:
-                program_code = self.program_table.item(selected_row, 0).text()
-                delete_program(program_code)
-                self.refresh_program_table()
-                self.refresh_student_table()
-            except Exception as e:
-                QMessageBox.critical(self, "Error", f"Failed to delete program: {e}")
+            program_code = self.program_model.value(selected_row, 0)
+            self.worker.write('Program.csv', delete_program, program_code,
+                              on_error=lambda e: QMessageBox.critical(self, "Error", f"Failed to delete program: {e}"))
 
     def delete_college(self):
-        selected_row = self.college_table.currentRow()
+        selected_row = self.college_table.currentIndex().row()
         delete_confirmation = self.delete_confirm("college")
         if delete_confirmation == QMessageBox.StandardButton.Yes and selected_row >= 0:
-            try:
-                college_code = self.college_table.item(selected_row, 0).text()
-                delete_college(college_code)
-                self.refresh_college_table()
-                self.refresh_program_table()
-            except Exception as e:
-                QMessageBox.critical(self, "Error", f"Failed to delete college: {e}")
-
-    def refresh_table(self, table_widget, list_function, search_bar, column_alignments=None):
-        try:
-            # Disable sorting before refreshing (fixed a bug)
-            table_widget.setSortingEnabled(False)
-
-            # Clear the table
-            table_widget.setRowCount(0)  # Remove all rows
-
-            # Fetch data
-            data = list_function()
-
-            # Set the number of columns and headers
-            table_widget.setColumnCount(len(data.columns))
-            table_widget.setHorizontalHeaderLabels(data.columns)
-
-            # Populate the table with data
-            for _, row in data.iterrows():
-                row_position = table_widget.rowCount()
-                table_widget.insertRow(row_position)
-                for col_index, value in enumerate(row):
-                    item = QTableWidgetItem(str(value))
-                    if column_alignments and col_index in column_alignments:
-                        item.setTextAlignment(column_alignments[col_index])
-                    table_widget.setItem(row_position, col_index, item)
-
-            # Resize columns to fit contents
-            table_widget.resizeColumnsToContents()
+            college_code = self.college_model.value(selected_row, 0)
+            self.worker.write('College.csv', delete_college, college_code,
+                              on_error=lambda e: QMessageBox.critical(self, "Error", f"Failed to delete college: {e}"))
 
-            # Allow columns to stretch to fit the window
-            table_widget.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
-
-            # Reapply the search filter
-            self.filter_table(table_widget, search_bar, self.search_by_label)
-
-            # Re-enable sorting after refreshing
-            table_widget.setSortingEnabled(True)
-
-        except Exception as e:
-            QMessageBox.critical(self, "Error", f"Failed to refresh table: {e}")
+    def refresh_table(self, table_view, search_bar):
+        # The model reads, and searches, the table on the storage worker; failures come back through its error signal
+        self.filter_table(table_view, search_bar, self.search_by_label)
+        table_view.model().reload()
 
     def refresh_student_table(self):
-        self.refresh_table(
-            self.student_table,
-            list_students,
-            self.student_search_bar,
-            column_alignments={0: Qt.AlignmentFlag.AlignCenter, 3: Qt.AlignmentFlag.AlignCenter, 4: Qt.AlignmentFlag.AlignCenter}
-        )
+        self.refresh_table(self.student_table, self.student_search_bar)
 
     def refresh_program_table(self):
-        self.refresh_table(
-            self.program_table,
-            list_programs,
-            self.program_search_bar,
-            column_alignments={0: Qt.AlignmentFlag.AlignCenter, 2: Qt.AlignmentFlag.AlignCenter}
-        )
+        self.refresh_table(self.program_table, self.program_search_bar)
 
     def refresh_college_table(self):
-        self.refresh_table(
-            self.college_table,
-            list_colleges,
-            self.college_search_bar,
-            column_alignments={0: Qt.AlignmentFlag.AlignCenter}
-        )
+        self.refresh_table(self.college_table, self.college_search_bar)
 
-    def filter_table(self, table_widget, search_bar, search_by_combo):
-        search_text = search_bar.text().lower()
-        search_by = search_by_combo.currentText().lower()
-
-        for row in range(table_widget.rowCount()):
-            match = False
-            for col in range(table_widget.columnCount()):
-                item = table_widget.item(row, col)
-                if item:
-                    header_text = table_widget.horizontalHeaderItem(col).text().lower()
-                    if search_by == "gender" and header_text == "gender":
-                        if search_text in item.text().lower():
-                            match = True
-                            break
-                    elif search_by == "all" or header_text == search_by:
-                        if search_text in item.text().lower():
-                            match = True
-                            break
-            table_widget.setRowHidden(row, not match)
+    def filter_table(self, table_view, search_bar, search_by_combo):
+        # Matching runs inside the model over whole columns, no per-row widget calls
+        table_view.model().set_filter(search_bar.text(), search_by_combo.currentText())
 
     def filter_student_table(self):
         self.filter_table(self.student_table, self.student_search_bar, self.search_by_label)
@@ -764,6 +860,24 @@ class StudentInformationSystem(QMainWindow):
     def filter_college_table(self):
         self.filter_table(self.college_table, self.college_search_bar, self.search_by_label)
 
+    def search_student_table(self):
+        self.student_search.request(self.student_search_bar.text(), self.search_by_label.currentText())
+
+    def search_program_table(self):
+        self.program_search.request(self.program_search_bar.text(), self.search_by_label.currentText())
+
+    def search_college_table(self):
+        self.college_search.request(self.college_search_bar.text(), self.search_by_label.currentText())
+
+    def run_student_search(self):
+        self.student_search.run_now(self.student_search_bar.text(), self.search_by_label.currentText())
+
+    def run_program_search(self):
+        self.program_search.run_now(self.program_search_bar.text(), self.search_by_label.currentText())
+
+    def run_college_search(self):
+        self.college_search.run_now(self.college_search_bar.text(), self.search_by_label.currentText())
+
     def clear_student_search(self):
         self.student_search_bar.clear()
         self.search_by_label.setCurrentIndex(0)  
@@ -780,28 +894,18 @@ class StudentInformationSystem(QMainWindow):
         self.filter_college_table()
 
     def open_add_student_dialog(self):
+        # Saved rows reach the tables through change events, no refresh needed
         dialog = AddEditStudentDialog(self)
-        if dialog.exec() == QDialog.DialogCode.Accepted:
-            self.refresh_student_table()
-            self.student_table.resizeColumnsToContents()  # Ensure columns are resized after adding a student
-            self.student_table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)  # Ensure columns fit window
+        dialog.exec()
             
     def open_edit_student_dialog(self):
         selected_rows = self.student_table.selectionModel().selectedRows()
         if selected_rows:
             selected_row = selected_rows[0].row()
             try:
-                student_data = {
-                    'ID Number': self.student_table.item(selected_row, 0).text(),
-                    'First Name': self.student_table.item(selected_row, 1).text(),
-                    'Last Name': self.student_table.item(selected_row, 2).text(),
-                    'Year Level': self.student_table.item(selected_row, 3).text(),
-                    'Gender': self.student_table.item(selected_row, 4).text(),
-                    'Program Code': self.student_table.item(selected_row, 5).text()
-                }
+                student_data = self.student_model.row_data(selected_row)
                 dialog = AddEditStudentDialog(self, student_data)
-                if dialog.exec() == QDialog.DialogCode.Accepted:
-                    self.refresh_student_table()
+                dialog.exec()
             except Exception as e:
                 QMessageBox.critical(self, "Error", f"Failed to edit student: {e}")
         else:
@@ -809,23 +913,16 @@ class StudentInformationSystem(QMainWindow):
 
     def open_add_program_dialog(self):
         dialog = AddEditProgramDialog(self)
-        if dialog.exec() == QDialog.DialogCode.Accepted:
-            self.refresh_program_table()     
+        dialog.exec()
             
     def open_edit_program_dialog(self):
         selected_rows = self.program_table.selectionModel().selectedRows()
         if selected_rows:
             selected_row = selected_rows[0].row()
             try:
-                program_data = {
-                    'Code': self.program_table.item(selected_row, 0).text(),
-                    'Name': self.program_table.item(selected_row, 1).text(),
-                    'College': self.program_table.item(selected_row, 2).text()
-                }
+                program_data = self.program_model.row_data(selected_row)
                 dialog = AddEditProgramDialog(self, program_data)
-                if dialog.exec() == QDialog.DialogCode.Accepted:
-                    self.refresh_program_table()
-                    self.refresh_student_table()
+                dialog.exec()
             except Exception as e:
                 QMessageBox.critical(self, "Error", f"Failed to edit program: {e}")
         else:
@@ -835,22 +932,16 @@ class StudentInformationSystem(QMainWindow):
                             
     def open_add_college_dialog(self):
         dialog = AddEditCollegeDialog(self)
-        if dialog.exec() == QDialog.DialogCode.Accepted:
-            self.refresh_college_table()             
+        dialog.exec()
                 
     def open_edit_college_dialog(self):
         selected_rows = self.college_table.selectionModel().selectedRows()
         if selected_rows:
             selected_row = selected_rows[0].row()
             try:
-                college_data = {
-                    'Code': self.college_table.item(selected_row, 0).text(),
-                    'Name': self.college_table.item(selected_row, 1).text()
-                }
+                college_data = self.college_model.row_data(selected_row)
                 dialog = AddEditCollegeDialog(self, college_data)
-                if dialog.exec() == QDialog.DialogCode.Accepted:
-                    self.refresh_college_table()
-                    self.refresh_program_table()
+                dialog.exec()
             except Exception as e:
                 QMessageBox.critical(self, "Error", f"Failed to edit college: {e}")
         else:
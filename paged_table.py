@@ -0,0 +1,551 @@
+import copy
+import csv
+import io
+import mmap
+import os
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+from PyQt6.QtCore import QAbstractTableModel, QModelIndex, Qt, QTimer, pyqtSignal
+
+import csv_handler
+import storage
+import table_events
+from table_model import SearchCancelled
+
+# CSVs at least this big are browsed through PagedTableModel instead of being loaded
+PAGED_THRESHOLD_BYTES = int(float(os.environ.get('SSIS_PAGED_THRESHOLD_MB', 200)) * 1024 * 1024)
+
+PAGE_ROWS = 1000           # rows decoded together when the view asks for a cell
+CACHED_PAGES = 64          # decoded pages kept around, least recently used dropped first
+SEARCH_CHUNK_ROWS = 50000  # rows parsed at a time while searching
+SCAN_BYTES = 64 * 1024 * 1024
+
+
+def paged_path(filename):
+    """Return the CSV to page through for filename, or None when the table should be loaded as usual."""
+    if storage.backend() is not csv_handler:
+        return None
+    filepath = os.path.join(csv_handler.CSV_FOLDER, filename)
+    if not os.path.exists(filepath) or os.path.getsize(filepath) < PAGED_THRESHOLD_BYTES:
+        return None
+    return filepath
+
+
+def _read_header(filepath):
+    with open(filepath, 'r', newline='', encoding='utf-8-sig') as file:
+        return next(csv.reader(file), [])
+
+
+class PagedCSV:
+    """Read-only view of a CSV file that decodes rows only when they are asked for.
+
+    The file is memory-mapped and scanned once for line starts; that offset
+    index (8 bytes per row) and a few recently used pages of decoded rows are
+    all that is kept in memory. Fields must not contain line breaks.
+    """
+
+    def __init__(self, filepath):
+        self.filepath = filepath
+        self._file = open(filepath, 'rb')
+        stat = os.fstat(self._file.fileno())
+        self._signature = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        size = stat.st_size
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else None
+        self._offsets = self._index_lines(size)  # start of every data row, then the end of the file
+        header = self._slice(0, self._offsets[0]).decode('utf-8-sig')
+        self.columns = next(csv.reader(io.StringIO(header)), [])
+        self.row_count = len(self._offsets) - 1
+        self._pages = OrderedDict()
+
+    def _index_lines(self, size):
+        starts = [np.zeros(1, dtype=np.int64)]
+        if self._map is not None:
+            data = np.frombuffer(self._map, dtype=np.uint8)
+            for begin in range(0, size, SCAN_BYTES):
+                newlines = np.flatnonzero(data[begin:begin + SCAN_BYTES] == ord('\n'))
+                starts.append(newlines.astype(np.int64) + begin + 1)
+            del data  # the mmap can't be closed while a numpy view of it exists
+        starts = np.concatenate(starts)
+        if starts[-1] != size:
+            starts = np.append(starts, size)
+        # Line 0 is the header
+        return starts[1:] if len(starts) > 1 else np.array([size], dtype=np.int64)
+
+    def _slice(self, start, stop):
+        if self._map is None:
+            return b''
+        return self._map[int(start):int(stop)]
+
+    def close(self):
+        self._pages.clear()
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+    @property
+    def closed(self):
+        return self._file.closed
+
+    def stale(self):
+        """Whether the file was replaced or changed since it was indexed."""
+        try:
+            stat = os.stat(self.filepath)
+        except FileNotFoundError:
+            return True
+        return (stat.st_ino, stat.st_mtime_ns, stat.st_size) != self._signature
+
+    def row(self, number):
+        """Return row `number` as a list of strings."""
+        page = self._page(number // PAGE_ROWS)
+        return page[number % PAGE_ROWS]
+
+    def read_row(self, number):
+        """Return row `number` as a list of strings, padded to the header, without using the page cache.
+
+        Unlike row() it is safe to call from a worker thread.
+        """
+        text = self._slice(self._offsets[number], self._offsets[number + 1]).decode('utf-8')
+        values = next(csv.reader(io.StringIO(text)), [])
+        return values + [''] * (len(self.columns) - len(values))
+
+    def _page(self, page_number):
+        page = self._pages.get(page_number)
+        if page is not None:
+            self._pages.move_to_end(page_number)
+            return page
+        start = page_number * PAGE_ROWS
+        stop = min(start + PAGE_ROWS, self.row_count)
+        text = self._slice(self._offsets[start], self._offsets[stop]).decode('utf-8')
+        page = list(csv.reader(io.StringIO(text)))
+        self._pages[page_number] = page
+        if len(self._pages) > CACHED_PAGES:
+            self._pages.popitem(last=False)
+        return page
+
+    def chunks(self, rows=SEARCH_CHUNK_ROWS, lower=False, columns=None):
+        """Yield (first row number, DataFrame of the rows as text) for consecutive blocks of rows.
+
+        columns limits the frames to those columns.
+        """
+        for start in range(0, self.row_count, rows):
+            stop = min(start + rows, self.row_count)
+            data = self._slice(self._offsets[start], self._offsets[stop])
+            if lower:
+                data = data.decode('utf-8').lower().encode('utf-8')
+            frame = pd.read_csv(io.BytesIO(data), header=None, names=self.columns, usecols=columns, dtype=str,
+                                keep_default_na=False, skip_blank_lines=False)
+            yield start, frame
+
+
+class JournalOverlay:
+    """The changes journaled for a table since its CSV was written, laid over a PagedCSV of it.
+
+    Rows are numbered as the file's rows followed by the added ones.
+    deleted holds the numbers of the file rows deleted since, changed maps
+    the file rows that changed to their values now and added holds the rows
+    added since, all as text. records counts the journal records laid over.
+
+    The file rows an update or delete picks are looked up through a hash
+    index of the column it matches on, built with one scan of that column
+    the first time; extended() lays newer records over a copy the same way,
+    so the file is only read whole again once it is indexed again.
+    """
+
+    def __init__(self, paged, records=()):
+        self._paged = paged
+        self._hashes = {}  # column -> (sorted hashes of its values in the file, row numbers in that order)
+        self.records = 0
+        self.added = []
+        self.changed = {}
+        self.deleted = np.empty(0, dtype=np.int64)
+        self._extend(records)
+
+    def extended(self, records):
+        """Return a copy with records, the ones journaled since this overlay was made, laid over it too."""
+        overlay = copy.copy(self)  # the file's hash indexes are shared
+        overlay.added = list(self.added)
+        overlay.changed = dict(self.changed)
+        overlay._extend(records)
+        return overlay
+
+    def _extend(self, records):
+        if not records:
+            return
+        columns = self._paged.columns
+        # Rows are replaced rather than changed in place, so copies can share them
+        self.added = csv_handler.journal_added_rows(
+            [{'op': 'add', 'row': row} for row in self.added] + records, columns)
+        numbers = set()
+        for column, values in csv_handler.journal_matched_values(records).items():
+            numbers.update(self._rows_holding(column, values))
+        if numbers:
+            numbers = sorted(numbers)
+            before = pd.DataFrame([self._row(number) for number in numbers], index=numbers, columns=columns)
+            after = csv_handler.apply_journal_changes(before, records)
+            deleted = before.index.difference(after.index)
+            for number in deleted:
+                self.changed.pop(number, None)
+            self.deleted = np.union1d(self.deleted, deleted.to_numpy(dtype=np.int64))
+            self.changed.update(zip(after.index.tolist(), after.values.tolist()))
+        self.records += len(records)
+
+    def _row(self, number):
+        values = self.changed.get(number)
+        return values if values is not None else self._paged.read_row(number)
+
+    def _rows_holding(self, column, values):
+        """Return the numbers of the file rows that hold one of values in column now."""
+        position = self._paged.columns.index(column)
+        hashes, numbers = self._hash_index(column)
+        wanted = pd.util.hash_array(np.array(list(values), dtype=object))
+        found = set()
+        for first, last in zip(np.searchsorted(hashes, wanted, 'left'), np.searchsorted(hashes, wanted, 'right')):
+            for number in numbers[first:last].tolist():
+                # The row is read to rule out a hash collision
+                if number not in self.changed and self._paged.read_row(number)[position] in values:
+                    found.add(number)
+        found.update(number for number, row in self.changed.items() if row[position] in values)
+        return found.difference(self.deleted.tolist())
+
+    def _hash_index(self, column):
+        index = self._hashes.get(column)
+        if index is None:
+            hashes = [pd.util.hash_array(frame[column].to_numpy(dtype=object))
+                      for _, frame in self._paged.chunks(columns=[column])]
+            hashes = np.concatenate(hashes) if hashes else np.empty(0, dtype=np.uint64)
+            numbers = np.argsort(hashes, kind='stable')
+            index = self._hashes[column] = (hashes[numbers], numbers)
+        return index
+
+    def apply(self, start, frame):
+        """Return frame, file rows from start on, as the rows read now, indexed by row number."""
+        stop = start + len(frame)
+        frame.index = pd.RangeIndex(start, stop)
+        changed = [row for row in self.changed if start <= row < stop]
+        if changed:
+            frame.loc[changed] = [self.changed[row] for row in changed]
+        deleted = self.deleted[(self.deleted >= start) & (self.deleted < stop)]
+        return frame.drop(deleted) if len(deleted) else frame
+
+
+class PagedSearch:
+    """Streams a search over a PagedCSV and its journal overlay a chunk at a time; safe to run on a worker thread."""
+
+    def __init__(self, paged, overlay=None):
+        self.paged = paged
+        self.overlay = overlay
+
+    def match(self, text, search_by="All", is_cancelled=None):
+        """Return a bool per row for rows containing text, or None when text is empty."""
+        needle = text.lower()
+        if not needle:
+            return None
+        if self.paged is None:
+            # The file is being indexed again; the search is rerun once it is
+            raise SearchCancelled()
+        wanted = search_by.lower()
+        columns = [name for name in self.paged.columns if wanted == "all" or name.lower() == wanted]
+        overlay = self.overlay
+        added = overlay.added if overlay is not None else []
+        match = np.zeros(self.paged.row_count + len(added), dtype=bool)
+        try:
+            for start, frame in self.paged.chunks(lower=True):
+                if is_cancelled is not None and is_cancelled():
+                    raise SearchCancelled()
+                found = np.zeros(len(frame), dtype=bool)
+                for column in columns:
+                    found |= frame[column].str.contains(needle, regex=False).to_numpy(dtype=bool)
+                match[start:start + len(frame)] = found
+        except ValueError:
+            if self.paged.closed:
+                # The file was re-indexed while searching
+                raise SearchCancelled()
+            raise
+        if overlay is not None:
+            positions = [self.paged.columns.index(name) for name in columns]
+            for row, values in overlay.changed.items():
+                match[row] = _contains(values, positions, needle)
+            match[overlay.deleted] = False
+            for row, values in enumerate(added, self.paged.row_count):
+                match[row] = _contains(values, positions, needle)
+        return match
+
+
+def _contains(values, positions, needle):
+    return any(needle in values[position].lower() for position in positions)
+
+
+class PagedTableModel(QAbstractTableModel):
+    """Read-only table model over a CSV too large to load into memory.
+
+    Rows are decoded a page at a time as the view scrolls and searches
+    stream over the file in chunks, so memory stays bounded by the offset
+    index and the visible rows. Sorting is not supported. The table is
+    streamed (see csv_handler.stream_table): edits still go through the
+    storage functions but only append to its journal, and on every change
+    the records journaled since are laid over the file's rows through a
+    JournalOverlay. Once
+    the journal is due for compaction the file is rewritten and indexed
+    again.
+
+    Reloads and searches run on the storage worker when one is given; the
+    model shows no rows until the first reload() is done, and
+    error(message) is emitted when one fails.
+
+    Offers the same set_filter / search_snapshot / apply_match / value /
+    row_data interface as DataFrameTableModel, so SearchController and the
+    dialogs work with either.
+    """
+
+    _table_changed = pyqtSignal(object)
+    error = pyqtSignal(str)
+
+    def __init__(self, filepath, table=None, column_alignments=None, worker=None, parent=None):
+        super().__init__(parent)
+        self._filepath = filepath
+        self._table = table
+        self._alignments = column_alignments or {}
+        self._worker = worker
+        self._columns = _read_header(filepath)
+        self._paged = None  # PagedCSV, None until indexed and while the file is replaced
+        self._overlay = None
+        self._search = PagedSearch(None)
+        self._rows = None  # row numbers shown, None for every row
+        self._search_text = ""
+        self._search_by = "All"
+        self._reloading = False
+        self._reload_again = False
+
+        self._reload_timer = QTimer(self)
+        self._reload_timer.setSingleShot(True)
+        self._reload_timer.timeout.connect(self.reload)
+        if table is not None:
+            csv_handler.stream_table(table)
+            self._table_changed.connect(self._schedule_reload)
+            listener = self._on_table_changed
+            table_events.subscribe(listener)
+            # Events after the Qt object is gone would reach a deleted model
+            self.destroyed.connect(lambda: table_events.unsubscribe(listener))
+
+    def _on_table_changed(self, filename, change):
+        if filename == self._table:
+            self._table_changed.emit(change)
+
+    def _schedule_reload(self, change):
+        # Coalesce a burst of change events into one reload
+        self._reload_timer.start(0)
+
+    def reload(self):
+        """Lay the table's journal over the file again, indexing the file again if it was replaced."""
+        if self._reloading:
+            # Done once the running reload is
+            self._reload_again = True
+            return
+        self._reloading = True
+        text, search_by = self._search_text, self._search_by
+        if self._worker is None:
+            loaded = self._load(self._paged, self._overlay, text, search_by)
+            if 'staged' in loaded:
+                self._release()
+                loaded = self._compact_and_load(loaded['staged'], text, search_by)
+            self._finish_reload(loaded)
+            return
+        self._write(self._load, self._paged, self._overlay, text, search_by)
+
+    def _write(self, function, *args):
+        self._worker.write(self._table or self._filepath, function, *args,
+                           on_done=self._finish_reload, on_error=self._reload_failed)
+
+    def _load(self, paged, overlay, text, search_by):
+        # Runs on the worker
+        if self._table is not None and csv_handler.compaction_due(self._table):
+            return {'staged': csv_handler.stage_compaction(self._table), 'filter': (text, search_by)}
+        if paged is None or paged.stale():
+            paged = PagedCSV(self._filepath)
+            overlay = None
+        records = csv_handler.journal_records(self._table) if self._table is not None else []
+        if overlay is None or len(records) < overlay.records:
+            # A file indexed again, or a journal folded into the file
+            overlay = JournalOverlay(paged, records)
+        else:
+            # Only the records journaled since the last load are new
+            overlay = overlay.extended(records[overlay.records:])
+        search = PagedSearch(paged, overlay)
+        return {'paged': paged, 'overlay': overlay, 'search': search,
+                'filter': (text, search_by), 'match': search.match(text, search_by)}
+
+    def _compact_and_load(self, staged, text, search_by):
+        # Runs on the worker, once the old mapping is released
+        csv_handler.commit_compaction(staged)
+        return self._load(None, None, text, search_by)
+
+    def _finish_reload(self, loaded):
+        if 'staged' in loaded:
+            # The CSV is about to be replaced, so let go of the mapping first
+            self._release()
+            self._write(self._compact_and_load, loaded['staged'], *loaded['filter'])
+            return
+        self._show(loaded)
+        self._reloading = False
+        if self._reload_again:
+            self._reload_again = False
+            self.reload()
+
+    def _reload_failed(self, e):
+        self._reloading = False
+        self._reload_again = False
+        self.error.emit(f"Failed to load {self._filepath}: {e}")
+
+    def _release(self):
+        self.beginResetModel()
+        if self._paged is not None:
+            self._paged.close()
+        self._paged = None
+        self._overlay = None
+        self._search = PagedSearch(None)
+        self._rows = None
+        self.endResetModel()
+
+    def _show(self, loaded):
+        paged = loaded['paged']
+        self.beginResetModel()
+        if self._paged is not None and self._paged is not paged:
+            self._paged.close()
+        self._paged = paged
+        self._columns = paged.columns
+        self._overlay = loaded['overlay']
+        self._search = loaded['search']
+        self._rows = self._visible_rows(loaded['match'])
+        self.endResetModel()
+        if loaded['filter'] != (self._search_text, self._search_by):
+            # The filter changed while the file was being read
+            self.set_filter(self._search_text, self._search_by)
+
+    def _visible_rows(self, match):
+        if match is not None:
+            return np.flatnonzero(match)
+        if not len(self._overlay.deleted):
+            return None
+        shown = np.ones(self._row_total(), dtype=bool)
+        shown[self._overlay.deleted] = False
+        return np.flatnonzero(shown)
+
+    def _row_total(self):
+        return self._paged.row_count + len(self._overlay.added)
+
+    def _row_number(self, row):
+        return row if self._rows is None else int(self._rows[row])
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.isValid() or self._paged is None:
+            return 0
+        return self._row_total() if self._rows is None else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._columns)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == Qt.ItemDataRole.DisplayRole:
+            return self.value(index.row(), index.column())
+        if role == Qt.ItemDataRole.TextAlignmentRole:
+            alignment = self._alignments.get(index.column())
+            if alignment is not None:
+                return alignment | Qt.AlignmentFlag.AlignVCenter
+        return None
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role != Qt.ItemDataRole.DisplayRole:
+            return None
+        if orientation == Qt.Orientation.Horizontal:
+            return self._columns[section] if section < len(self._columns) else None
+        return str(section + 1)
+
+    def value(self, row, column):
+        """Return the text shown at (row, column)."""
+        number = self._row_number(row)
+        if number >= self._paged.row_count:
+            values = self._overlay.added[number - self._paged.row_count]
+        else:
+            values = self._overlay.changed.get(number) or self._paged.row(number)
+        return values[column] if column < len(values) else ""
+
+    def row_data(self, row):
+        """Return a visible row as {column name: text}, as the dialogs expect it."""
+        return {name: self.value(row, column) for column, name in enumerate(self._columns)}
+
+    def export_chunks(self, chunk_rows=SEARCH_CHUNK_ROWS):
+        """Return the visible rows, in file order, as a stream of DataFrames of text read from the file.
+
+        The rows shown now are the ones exported, so the stream can be read
+        on a worker thread.
+        """
+        return self._export_chunks(self._paged, self._overlay, self._rows, chunk_rows)
+
+    @staticmethod
+    def _export_chunks(paged, overlay, rows, chunk_rows):
+        if paged is None:
+            return
+        for start, frame in paged.chunks(chunk_rows):
+            stop = start + len(frame)
+            frame = overlay.apply(start, frame)
+            if rows is not None:
+                first, last = np.searchsorted(rows, [start, stop])
+                frame = frame.loc[rows[first:last]]
+            if len(frame):
+                yield frame
+        added = pd.DataFrame(overlay.added, columns=paged.columns,
+                             index=pd.RangeIndex(paged.row_count, paged.row_count + len(overlay.added)))
+        if rows is not None:
+            added = added.loc[rows[rows >= paged.row_count]]
+        if len(added):
+            yield added
+
+    def sort(self, column, order=Qt.SortOrder.AscendingOrder):
+        pass
+
+    def set_filter(self, text, search_by="All"):
+        """Show only rows containing text (case-insensitive) in the search_by column, or any column for "All".
+
+        The file is searched on the worker when there is one.
+        """
+        self._search_text = text
+        self._search_by = search_by
+        snapshot = self._search
+        if snapshot.paged is None:
+            # Applied once the file is indexed
+            return
+        if self._worker is None:
+            self.apply_match(snapshot, text, search_by, snapshot.match(text, search_by))
+            return
+        self._worker.read(
+            snapshot.match, text, search_by,
+            on_done=lambda match: self._apply_latest(snapshot, text, search_by, match),
+            on_error=lambda e: None if isinstance(e, SearchCancelled) else self.error.emit(f"Search failed: {e}")
+        )
+
+    def _apply_latest(self, snapshot, text, search_by, match):
+        # A search started before the last set_filter() is no longer wanted
+        if (text, search_by) == (self._search_text, self._search_by):
+            self.apply_match(snapshot, text, search_by, match)
+
+    def current_filter(self):
+        return (self._search_text, self._search_by)
+
+    def search_snapshot(self):
+        return self._search
+
+    def apply_match(self, snapshot, text, search_by, match):
+        """Show the result of snapshot.match(); results for a file indexed since are ignored."""
+        if snapshot is not self._search:
+            return False
+        self._search_text = text
+        self._search_by = search_by
+        self.beginResetModel()
+        self._rows = self._visible_rows(match)
+        self.endResetModel()
+        return True
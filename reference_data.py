@@ -0,0 +1,59 @@
+import threading
+
+import table_events
+from storage import data_lock, list_entries
+
+# Cached per reference table: its codes in table order, the same codes as a
+# set for lookups, and the set of names. Built on first use from the loaded
+# table and dropped whenever the table changes, so opening or saving a dialog
+# never has to scan Program.csv or College.csv again.
+_cache = {}
+_generation = {}  # filename -> changes seen, so a build that raced a change isn't kept
+_lock = threading.Lock()
+
+
+def _on_table_changed(filename, change):
+    with _lock:
+        _generation[filename] = _generation.get(filename, 0) + 1
+        _cache.pop(filename, None)
+
+
+table_events.subscribe(_on_table_changed)
+
+
+def _reference(filename):
+    with _lock:
+        entry = _cache.get(filename)
+        generation = _generation.get(filename, 0)
+    if entry is not None:
+        return entry
+    with data_lock():
+        df = list_entries(filename)
+        codes = tuple(df['Code'].dropna().astype(str))
+        names = frozenset(df['Name'].dropna().astype(str))
+    entry = {'codes': codes, 'code_set': frozenset(codes), 'names': names}
+    with _lock:
+        if _generation.get(filename, 0) == generation:
+            _cache[filename] = entry
+    return entry
+
+
+def program_codes():
+    """Program codes in table order, for pickers."""
+    return _reference('Program.csv')['codes']
+
+def program_code_set():
+    return _reference('Program.csv')['code_set']
+
+def program_names():
+    return _reference('Program.csv')['names']
+
+def college_codes():
+    """College codes in table order, for pickers."""
+    return _reference('College.csv')['codes']
+
+def college_code_set():
+    return _reference('College.csv')['code_set']
+
+def college_names():
+    return _reference('College.csv')['names']
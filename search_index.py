@@ -0,0 +1,173 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+# A column gets a trigram index only when its values repeat, i.e. it has at
+# most this many distinct values per row. Mostly-unique columns (IDs, names
+# of a small table) would need a trigram entry per row for little gain, so
+# their distinct values are scanned instead.
+TRIGRAM_MAX_DISTINCT_SHARE = 0.5
+
+# A column's distinct values are renumbered, dropping the ones no row holds
+# any more, once there are this many more of them than twice the rows
+COMPACT_SLACK = 1024
+
+
+def _lower(value):
+    return "" if pd.isna(value) else str(value).lower()
+
+
+def _trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def _grown(array, capacity, fill=None):
+    grown = np.empty(capacity, dtype=array.dtype) if fill is None else np.full(capacity, fill, dtype=array.dtype)
+    grown[:len(array)] = array
+    return grown
+
+
+class SearchIndex:
+    """Case-insensitive substring index over the columns of one table.
+
+    Every cell is lowercased once when the index is built. Each column keeps
+    its distinct lowercased values and, per row, the number of its value in
+    a numpy array; a query finds the values containing it and then the rows
+    holding those values with one vectorized pass. Columns whose values
+    repeat also map each trigram to the values containing it, so a query of
+    three or more characters only has to verify the values sharing all of
+    its trigrams. Rows are added and removed incrementally as the table
+    changes: a removed row's slot is blanked and reused by the next added
+    row, and values no row holds any more are dropped once they pile up.
+    """
+
+    def __init__(self, columns):
+        self.columns = list(columns)
+        self._labels = np.empty(0, dtype=object)     # row label per slot
+        self._size = 0                               # slots handed out
+        self._slots = {}                             # row label -> slot
+        self._free = []                              # blanked slots, reused first
+        self._rows = {column: np.empty(0, dtype=np.int32) for column in self.columns}  # value number per slot, -1 when removed
+        self._texts = {column: [] for column in self.columns}  # distinct lowercased values
+        self._numbers = {}   # column -> {value: number}, for trigram-indexed columns
+        self._trigrams = {}  # column -> {trigram: {value numbers}}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_frame(cls, frame):
+        index = cls(frame.columns)
+        index._labels = frame.index.to_numpy(copy=True)
+        index._size = len(frame)
+        index._slots = dict(zip(index._labels.tolist(), range(len(frame))))
+        for column in index.columns:
+            # Number the rows by lowercased value in one vectorized pass
+            values = frame[column].astype(object)
+            lowered = values.where(values.notna(), "").astype(str).str.lower()
+            codes, uniques = pd.factorize(lowered)
+            index._rows[column] = codes.astype(np.int32)
+            index._texts[column] = list(uniques)
+            if len(uniques) <= TRIGRAM_MAX_DISTINCT_SHARE * len(frame):
+                index._index_texts(column)
+        return index
+
+    def _index_texts(self, column):
+        texts = self._texts[column]
+        trigrams = self._trigrams[column] = {}
+        for number, text in enumerate(texts):
+            for trigram in _trigrams(text):
+                trigrams.setdefault(trigram, set()).add(number)
+        self._numbers[column] = {text: number for number, text in enumerate(texts)}
+
+    def add(self, labels, rows):
+        """Index the given rows (a DataFrame slice) under their row labels."""
+        labels = list(labels)
+        with self._lock:
+            slots = self._take_slots(len(labels))
+            for slot, label in zip(slots, labels):
+                self._labels[slot] = label
+                self._slots[label] = slot
+            for column in self.columns:
+                numbers = self._rows[column]
+                for slot, value in zip(slots, rows[column]):
+                    numbers[slot] = self._number(column, _lower(value))
+                if len(self._texts[column]) > 2 * len(self._slots) + COMPACT_SLACK:
+                    self._compact(column)
+
+    def _take_slots(self, count):
+        reused = self._free[-count:] if count else []
+        del self._free[len(self._free) - len(reused):]
+        start = self._size
+        self._reserve(count - len(reused))
+        self._size += count - len(reused)
+        return reused + list(range(start, self._size))
+
+    def _number(self, column, text):
+        texts = self._texts[column]
+        numbers = self._numbers.get(column)
+        if numbers is None:
+            # Scanned column: values are rarely shared, don't look them up
+            texts.append(text)
+            return len(texts) - 1
+        number = numbers.get(text)
+        if number is None:
+            number = numbers[text] = len(texts)
+            texts.append(text)
+            for trigram in _trigrams(text):
+                self._trigrams[column].setdefault(trigram, set()).add(number)
+        return number
+
+    def _reserve(self, count):
+        needed = self._size + count
+        capacity = len(self._labels)
+        if needed <= capacity:
+            return
+        capacity = max(needed, 2 * capacity, 16)
+        self._labels = _grown(self._labels, capacity)
+        for column in self.columns:
+            self._rows[column] = _grown(self._rows[column], capacity, -1)
+
+    def remove(self, labels):
+        """Forget the rows with the given labels."""
+        with self._lock:
+            slots = [self._slots.pop(label) for label in labels if label in self._slots]
+            for column in self.columns:
+                self._rows[column][slots] = -1
+            self._free.extend(slots)
+
+    def _compact(self, column):
+        """Renumber a column's values, dropping the ones no row holds."""
+        numbers = self._rows[column][:self._size]
+        held = numbers >= 0
+        used, renumbered = np.unique(numbers[held], return_inverse=True)
+        texts = self._texts[column]
+        self._texts[column] = [texts[number] for number in used]
+        numbers[held] = renumbered
+        if column in self._numbers:
+            self._index_texts(column)
+
+    def search(self, text, column=None):
+        """Return the labels of rows containing text, in one column or in any column."""
+        needle = text.lower()
+        columns = self.columns if column is None else [c for c in self.columns if c == column]
+        with self._lock:
+            found = np.zeros(self._size, dtype=bool)
+            for name in columns:
+                texts = self._texts[name]
+                matching = [number for number in self._candidates(name, needle) if needle in texts[number]]
+                if matching:
+                    found |= np.isin(self._rows[name][:self._size], matching)
+            return set(self._labels[:self._size][found].tolist())
+
+    def _candidates(self, column, needle):
+        trigrams = self._trigrams.get(column)
+        if trigrams is None or len(needle) < 3:
+            return range(len(self._texts[column]))
+        sets = []
+        for trigram in _trigrams(needle):
+            containing = trigrams.get(trigram)
+            if not containing:
+                return []
+            sets.append(containing)
+        sets.sort(key=len)
+        return set.intersection(*sets) if len(sets) > 1 else sets[0]
@@ -0,0 +1,87 @@
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, QTimer, pyqtSignal
+
+from table_model import SearchCancelled
+
+SEARCH_DEBOUNCE_MS = 200
+
+
+class _SearchSignals(QObject):
+    finished = pyqtSignal(int, object, str, str, object)  # generation, snapshot, text, search_by, match
+
+
+class _SearchTask(QRunnable):
+    def __init__(self, controller, generation, snapshot, text, search_by):
+        super().__init__()
+        self.controller = controller
+        self.generation = generation
+        self.snapshot = snapshot
+        self.text = text
+        self.search_by = search_by
+        self.signals = controller._signals
+
+    def run(self):
+        try:
+            match = self.snapshot.match(self.text, self.search_by, is_cancelled=self.is_stale)
+        except SearchCancelled:
+            return
+        self.signals.finished.emit(self.generation, self.snapshot, self.text, self.search_by, match)
+
+    def is_stale(self):
+        return self.generation != self.controller._generation
+
+
+class SearchController(QObject):
+    """Debounces search input for a DataFrameTableModel and filters off the GUI thread.
+
+    Each request bumps a generation counter; a running search checks it
+    between columns and gives up as soon as a newer query arrives, and only
+    the result of the latest query is handed back to the model.
+    """
+
+    def __init__(self, model, parent=None):
+        super().__init__(parent)
+        self.model = model
+        self._generation = 0
+        self._pending = ("", "All")
+
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(1)
+
+        self._signals = _SearchSignals()
+        self._signals.finished.connect(self._on_finished)
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(SEARCH_DEBOUNCE_MS)
+        self._timer.timeout.connect(self._start)
+
+    def request(self, text, search_by="All"):
+        """Schedule a search; it only starts once input has been quiet for the debounce window."""
+        self._pending = (text, search_by)
+        self._generation += 1
+        self._timer.start()
+
+    def run_now(self, text, search_by="All"):
+        """Skip the debounce window, e.g. when Enter is pressed."""
+        self._timer.stop()
+        self._pending = (text, search_by)
+        if self.model.current_filter() == self._pending:
+            return
+        self._generation += 1
+        self._start()
+
+    def _start(self):
+        self._pool.clear()  # drop queued searches that never started
+        text, search_by = self._pending
+        task = _SearchTask(self, self._generation, self.model.search_snapshot(), text, search_by)
+        self._pool.start(task)
+
+    def _on_finished(self, generation, snapshot, text, search_by, match):
+        if generation != self._generation:
+            return
+        if not self.model.apply_match(snapshot, text, search_by, match):
+            # The frame was replaced while searching, search the new one
+            self._start()
+
+    def wait(self):
+        self._pool.waitForDone()
@@ -0,0 +1,367 @@
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+import pandas as pd
+
+import csv_handler
+from csv_handler import CSV_FOLDER, TABLE_COLUMNS, KEY_COLUMNS, FOREIGN_KEYS
+from table_events import notify
+
+DATABASE_PATH = os.path.join(CSV_FOLDER, 'ssis.db')
+
+# The API keeps addressing tables by their CSV filename
+TABLE_NAMES = {
+    'Student.csv': 'student',
+    'Program.csv': 'program',
+    'College.csv': 'college'
+}
+COLUMN_TYPES = {'Year Level': 'INTEGER'}
+
+# SQLite caps the number of parameters in one statement
+MAX_PARAMETERS = 900
+
+_connection = None
+_lock = threading.RLock()
+
+# filename -> DataFrame indexed by rowid, loaded on first list_entries and
+# patched in place by every mutation so table views can apply deltas
+_frames = {}
+
+
+def _quote(name):
+    return '"' + name.replace('"', '""') + '"'
+
+def _table(filename):
+    try:
+        return TABLE_NAMES[filename]
+    except KeyError:
+        raise ValueError(f"Unknown table {filename}.")
+
+def _connect():
+    global _connection
+    if _connection is None:
+        # Autocommit mode; transaction() issues BEGIN/COMMIT itself
+        _connection = sqlite3.connect(DATABASE_PATH, check_same_thread=False, isolation_level=None)
+        _connection.execute('PRAGMA journal_mode=WAL')
+        _connection.execute('PRAGMA synchronous=NORMAL')
+    return _connection
+
+def close():
+    global _connection
+    with _lock:
+        if _connection is not None:
+            _connection.close()
+            _connection = None
+        _frames.clear()
+
+def ensure_storage():
+    """Create the database, its tables and the foreign-key indexes if they are missing."""
+    if not os.path.exists(CSV_FOLDER):
+        os.makedirs(CSV_FOLDER)
+    try:
+        with _lock:
+            connection = _connect()
+            for filename, columns in TABLE_COLUMNS.items():
+                table = _table(filename)
+                definitions = []
+                for column in columns:
+                    definition = f"{_quote(column)} {COLUMN_TYPES.get(column, 'TEXT')}"
+                    if column == KEY_COLUMNS[filename]:
+                        definition += " PRIMARY KEY"
+                    definitions.append(definition)
+                connection.execute(f"CREATE TABLE IF NOT EXISTS {table} ({', '.join(definitions)})")
+                # Referential checks and code-rename cascades look rows up by these columns
+                for column in FOREIGN_KEYS.get(filename, {}):
+                    index_name = f"{table}_{column.lower().replace(' ', '_')}"
+                    connection.execute(f"CREATE INDEX IF NOT EXISTS {index_name} ON {table} ({_quote(column)})")
+    except Exception as e:
+        raise Exception(f"Error creating database {DATABASE_PATH}: {e}")
+
+@contextmanager
+def transaction():
+    """Run the enclosed operations as one SQLite transaction; nested uses join the outer one."""
+    with _lock:
+        connection = _connect()
+        nested = connection.in_transaction
+        if not nested:
+            connection.execute('BEGIN IMMEDIATE')
+        try:
+            yield connection
+        except BaseException:
+            if not nested:
+                connection.execute('ROLLBACK')
+                # Cached frames may hold rows that were just rolled back
+                invalidate_cache()
+            raise
+        else:
+            if not nested:
+                connection.execute('COMMIT')
+
+# Every change is committed in its own small transaction, which is cheap
+# enough that there is nothing for write-behind mode to hold back
+def flush():
+    return 0
+
+def has_pending_changes():
+    return False
+
+def enable_write_behind(interval):
+    pass
+
+def disable_write_behind():
+    pass
+
+def data_lock():
+    """The lock to hold while reading a DataFrame returned by list_entries from another thread."""
+    return _lock
+
+def _chunks(values):
+    values = list(values)
+    for start in range(0, len(values), MAX_PARAMETERS):
+        yield values[start:start + MAX_PARAMETERS]
+
+def _rowids(connection, filename, column, values):
+    rowids = []
+    for chunk in _chunks(values):
+        placeholders = ', '.join('?' * len(chunk))
+        query = f"SELECT rowid FROM {_table(filename)} WHERE {_quote(column)} IN ({placeholders})"
+        rowids.extend(row[0] for row in connection.execute(query, chunk))
+    return rowids
+
+def invalidate_cache(filename=None):
+    """Drop cached frames so the next list_entries re-reads the database."""
+    with _lock:
+        filenames = list(_frames) if filename is None else [filename]
+        for name in filenames:
+            if _frames.pop(name, None) is not None:
+                notify(name, reset=True)
+
+def _checked_columns(filename, data):
+    unknown = set(data) - set(TABLE_COLUMNS[filename])
+    if unknown:
+        raise ValueError(f"Unknown columns for {filename}: {', '.join(sorted(unknown))}")
+
+def _sql_value(column, value):
+    """Convert a value (the dialogs pass text) to the SQL type of its column."""
+    if value is None or pd.isna(value):
+        return None
+    if COLUMN_TYPES.get(column) == 'INTEGER':
+        return None if value == '' else int(value)
+    return str(value)
+
+def add_entry(filename, entry_data):
+    try:
+        columns = TABLE_COLUMNS[filename]
+        _checked_columns(filename, entry_data)
+        row = [_sql_value(column, entry_data.get(column)) for column in columns]
+        with transaction() as connection:
+            placeholders = ', '.join('?' * len(columns))
+            cursor = connection.execute(
+                f"INSERT INTO {_table(filename)} ({', '.join(map(_quote, columns))}) VALUES ({placeholders})", row
+            )
+            rowid = cursor.lastrowid
+            df = _frames.get(filename)
+            if df is not None:
+                df.loc[rowid] = row
+        notify(filename, inserted=[rowid])
+    except Exception as e:
+        raise Exception(f"Error adding entry to {filename}: {e}")
+
+def add_entries(filename, entries):
+    """Insert many rows (a DataFrame or a list of dicts) in one transaction; returns how many were added."""
+    try:
+        columns = TABLE_COLUMNS[filename]
+        rows = pd.DataFrame(entries)
+        unknown = set(rows.columns) - set(columns)
+        if unknown:
+            raise ValueError(f"Unknown columns for {filename}: {', '.join(sorted(unknown))}")
+        if rows.empty:
+            return 0
+        values = rows.reindex(columns=columns).astype(object)
+        values = values.where(values.notna(), None).itertuples(index=False, name=None)
+        with transaction() as connection:
+            placeholders = ', '.join('?' * len(columns))
+            connection.executemany(
+                f"INSERT INTO {_table(filename)} ({', '.join(map(_quote, columns))}) VALUES ({placeholders})", values
+            )
+        # Too many rows to patch one by one, let the views reload
+        invalidate_cache(filename)
+        return len(rows)
+    except Exception as e:
+        raise Exception(f"Error adding entries to {filename}: {e}")
+
+def delete_entry(filename, key_column, key_value):
+    try:
+        delete_entries(filename, key_column, [key_value])
+    except Exception as e:
+        raise Exception(f"Error deleting entry from {filename}: {e}")
+
+def delete_entries(filename, key_column, key_values):
+    """Delete every row whose key_column is in key_values in one transaction."""
+    try:
+        with transaction() as connection:
+            rowids = _rowids(connection, filename, key_column, set(key_values))
+            for chunk in _chunks(rowids):
+                placeholders = ', '.join('?' * len(chunk))
+                connection.execute(f"DELETE FROM {_table(filename)} WHERE rowid IN ({placeholders})", chunk)
+            df = _frames.get(filename)
+            if df is not None and rowids:
+                df.drop(rowids, inplace=True)
+        notify(filename, removed=rowids)
+        return len(rowids)
+    except Exception as e:
+        raise Exception(f"Error deleting entries from {filename}: {e}")
+
+def update_entry(filename, key_column, key_value, updated_data):
+    try:
+        _checked_columns(filename, updated_data)
+        values = {column: _sql_value(column, value) for column, value in updated_data.items()}
+        with transaction() as connection:
+            rowids = _rowids(connection, filename, key_column, [key_value])
+            if not rowids:
+                return
+            assignments = ', '.join(f"{_quote(column)} = ?" for column in values)
+            connection.execute(
+                f"UPDATE {_table(filename)} SET {assignments} WHERE {_quote(key_column)} = ?",
+                list(values.values()) + [key_value]
+            )
+            df = _frames.get(filename)
+            if df is not None:
+                for column, value in values.items():
+                    df.loc[rowids, column] = value
+        notify(filename, updated=rowids)
+    except Exception as e:
+        raise Exception(f"Error updating entry in {filename}: {e}")
+
+def entry_exists(filename, key_value):
+    try:
+        query = f"SELECT 1 FROM {_table(filename)} WHERE {_quote(KEY_COLUMNS[filename])} = ? LIMIT 1"
+        with _lock:
+            return _connect().execute(query, (key_value,)).fetchone() is not None
+    except Exception as e:
+        raise Exception(f"Error looking up entry in {filename}: {e}")
+
+def existing_keys(filename, key_values):
+    try:
+        key_column = _quote(KEY_COLUMNS[filename])
+        found = set()
+        with _lock:
+            connection = _connect()
+            for chunk in _chunks(set(key_values)):
+                placeholders = ', '.join('?' * len(chunk))
+                query = f"SELECT {key_column} FROM {_table(filename)} WHERE {key_column} IN ({placeholders})"
+                found.update(row[0] for row in connection.execute(query, chunk))
+        return found
+    except Exception as e:
+        raise Exception(f"Error looking up entries in {filename}: {e}")
+
+def get_entry(filename, key_value):
+    try:
+        columns = TABLE_COLUMNS[filename]
+        query = (f"SELECT {', '.join(map(_quote, columns))} FROM {_table(filename)} "
+                 f"WHERE {_quote(KEY_COLUMNS[filename])} = ? LIMIT 1")
+        with _lock:
+            row = _connect().execute(query, (key_value,)).fetchone()
+        return None if row is None else dict(zip(columns, row))
+    except Exception as e:
+        raise Exception(f"Error looking up entry in {filename}: {e}")
+
+def is_referenced(filename, column, value):
+    try:
+        query = f"SELECT 1 FROM {_table(filename)} WHERE {_quote(column)} = ? LIMIT 1"
+        with _lock:
+            return _connect().execute(query, (value,)).fetchone() is not None
+    except Exception as e:
+        raise Exception(f"Error checking references in {filename}: {e}")
+
+def update_references(filename, column, old_value, new_value):
+    try:
+        with transaction() as connection:
+            rowids = _rowids(connection, filename, column, [old_value])
+            if not rowids:
+                return 0
+            connection.execute(
+                f"UPDATE {_table(filename)} SET {_quote(column)} = ? WHERE {_quote(column)} = ?",
+                (new_value, old_value)
+            )
+            df = _frames.get(filename)
+            if df is not None:
+                df.loc[rowids, column] = new_value
+        notify(filename, updated=rowids)
+        return len(rowids)
+    except Exception as e:
+        raise Exception(f"Error updating references in {filename}: {e}")
+
+def search_entries(filename, text, column=None):
+    """Return the rowids whose text contains text (case-insensitive), in column or in any column."""
+    try:
+        columns = TABLE_COLUMNS[filename] if column is None else [column]
+        if column is not None and column not in TABLE_COLUMNS[filename]:
+            return set()
+        condition = ' OR '.join(f"instr(lower({_quote(name)}), ?) > 0" for name in columns)
+        with _lock:
+            rows = _connect().execute(
+                f"SELECT rowid FROM {_table(filename)} WHERE {condition}", [text.lower()] * len(columns)
+            )
+            return {row[0] for row in rows}
+    except Exception as e:
+        raise Exception(f"Error searching {filename}: {e}")
+
+def list_entries(filename):
+    # Returns the shared cached frame, indexed by rowid
+    try:
+        with _lock:
+            df = _frames.get(filename)
+            if df is None:
+                columns = TABLE_COLUMNS[filename]
+                df = pd.read_sql_query(
+                    f"SELECT rowid AS _rowid, {', '.join(map(_quote, columns))} FROM {_table(filename)}",
+                    _connect(), index_col='_rowid'
+                )
+                df.index.name = None
+                _frames[filename] = df
+            return df
+    except Exception as e:
+        raise Exception(f"Error listing entries from {filename}: {e}")
+
+def migrate_from_csv():
+    """Import csv-files/*.csv into the database.
+
+    Rows whose key is already in the database (including duplicate keys
+    within a CSV) are skipped. Returns {filename: (imported, skipped)}.
+    """
+    ensure_storage()
+    report = {}
+    with transaction() as connection:
+        for filename, columns in TABLE_COLUMNS.items():
+            df = csv_handler.read_csv(filename)
+            values = df[columns].astype(object)
+            rows = values.where(values.notna(), None).itertuples(index=False, name=None)
+            placeholders = ', '.join('?' * len(columns))
+            before = connection.total_changes
+            connection.executemany(
+                f"INSERT OR IGNORE INTO {_table(filename)} ({', '.join(map(_quote, columns))}) VALUES ({placeholders})",
+                rows
+            )
+            imported = connection.total_changes - before
+            report[filename] = (imported, len(df) - imported)
+    invalidate_cache()
+    return report
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="SQLite storage for the Student Information System.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    migrate = commands.add_parser("migrate", help="import the CSV files in csv-files/ into the database")
+    migrate.add_argument("--db", default=DATABASE_PATH, help=f"database file (default: {DATABASE_PATH})")
+    args = parser.parse_args()
+
+    if args.command == "migrate":
+        DATABASE_PATH = args.db
+        for filename, (imported, skipped) in migrate_from_csv().items():
+            print(f"{filename}: {imported} imported, {skipped} skipped")
+        close()
@@ -0,0 +1,94 @@
+import importlib
+import os
+
+# Every backend module exposes the same functions as csv_handler
+BACKENDS = {
+    'csv': 'csv_handler',
+    'sqlite': 'sqlite_handler'
+}
+
+# Chosen with the SSIS_STORAGE environment variable unless use_backend() is called first
+DEFAULT_BACKEND = os.environ.get('SSIS_STORAGE', 'csv')
+
+# Seconds between background flushes in write-behind mode (SSIS_WRITE_BEHIND);
+# 0 writes every change as soon as it is made
+WRITE_BEHIND_INTERVAL = float(os.environ.get('SSIS_WRITE_BEHIND') or 0)
+
+_backend = None
+
+def use_backend(name):
+    global _backend
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown storage backend '{name}', expected one of: {', '.join(BACKENDS)}")
+    _backend = importlib.import_module(BACKENDS[name])
+    return _backend
+
+def backend():
+    if _backend is None:
+        use_backend(DEFAULT_BACKEND)
+    return _backend
+
+def ensure_storage():
+    backend().ensure_storage()
+    if WRITE_BEHIND_INTERVAL > 0:
+        backend().enable_write_behind(WRITE_BEHIND_INTERVAL)
+
+def transaction():
+    """Context manager grouping changes to several tables into one commit."""
+    return backend().transaction()
+
+def flush():
+    """Write changes still held back by write-behind mode."""
+    return backend().flush()
+
+def has_pending_changes():
+    return backend().has_pending_changes()
+
+def enable_write_behind(interval):
+    return backend().enable_write_behind(interval)
+
+def disable_write_behind():
+    return backend().disable_write_behind()
+
+def data_lock():
+    """Lock guarding the cached tables; hold it while copying a listed table off another thread's changes."""
+    return backend().data_lock()
+
+def add_entry(filename, entry_data):
+    return backend().add_entry(filename, entry_data)
+
+def add_entries(filename, entries):
+    return backend().add_entries(filename, entries)
+
+def delete_entry(filename, key_column, key_value):
+    return backend().delete_entry(filename, key_column, key_value)
+
+def delete_entries(filename, key_column, key_values):
+    return backend().delete_entries(filename, key_column, key_values)
+
+def update_entry(filename, key_column, key_value, updated_data):
+    return backend().update_entry(filename, key_column, key_value, updated_data)
+
+def entry_exists(filename, key_value):
+    return backend().entry_exists(filename, key_value)
+
+def existing_keys(filename, key_values):
+    return backend().existing_keys(filename, key_values)
+
+def get_entry(filename, key_value):
+    return backend().get_entry(filename, key_value)
+
+def is_referenced(filename, column, value):
+    return backend().is_referenced(filename, column, value)
+
+def update_references(filename, column, old_value, new_value):
+    return backend().update_references(filename, column, old_value, new_value)
+
+def search_entries(filename, text, column=None):
+    return backend().search_entries(filename, text, column)
+
+def list_entries(filename):
+    return backend().list_entries(filename)
+
+def invalidate_cache(filename=None):
+    return backend().invalidate_cache(filename)
@@ -0,0 +1,119 @@
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+
+class _TaskSignals(QObject):
+    finished = pyqtSignal(int, object)    # task id, result
+    failed = pyqtSignal(int, object)      # task id, exception
+    progressed = pyqtSignal(int, object)  # task id, progress value
+
+
+class _Task(QRunnable):
+    def __init__(self, task_id, function, args, signals, report_progress=False):
+        super().__init__()
+        self.task_id = task_id
+        self.function = function
+        self.args = args
+        self.signals = signals
+        self.report_progress = report_progress
+
+    def progress(self, value):
+        self.signals.progressed.emit(self.task_id, value)
+
+    def run(self):
+        try:
+            if self.report_progress:
+                result = self.function(*self.args, progress=self.progress)
+            else:
+                result = self.function(*self.args)
+        except Exception as e:
+            self.signals.failed.emit(self.task_id, e)
+            return
+        self.signals.finished.emit(self.task_id, result)
+
+
+class StorageWorker(QObject):
+    """Runs storage calls on background threads so the GUI never waits on file I/O.
+
+    Reads share a small thread pool. Writes are queued per table on a pool
+    with a single thread, so the writes to one table run one at a time and
+    in the order they were submitted. on_done(result) / on_error(exception)
+    are called back on the GUI thread, and busy_changed tells whether any
+    call is still running. When on_progress is given the function is also
+    passed a progress= callable, and each value it reports is handed to
+    on_progress(value) on the GUI thread. A call that fails without an
+    on_error is reported through failed(message) instead.
+    """
+
+    busy_changed = pyqtSignal(bool)
+    failed = pyqtSignal(str)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._reads = QThreadPool(self)
+        self._reads.setMaxThreadCount(2)
+        self._writes = {}     # table -> QThreadPool with one thread
+        self._callbacks = {}  # task id -> (on_done, on_error, on_progress)
+        self._next_id = 0
+
+        self._signals = _TaskSignals()
+        self._signals.finished.connect(self._on_finished)
+        self._signals.failed.connect(self._on_failed)
+        self._signals.progressed.connect(self._on_progressed)
+
+    def read(self, function, *args, on_done=None, on_error=None, on_progress=None):
+        """Run function(*args) on the read pool."""
+        self._start(self._reads, function, args, on_done, on_error, on_progress)
+
+    def write(self, table, function, *args, on_done=None, on_error=None, on_progress=None):
+        """Run function(*args) after every write already queued for table."""
+        pool = self._writes.get(table)
+        if pool is None:
+            pool = QThreadPool(self)
+            pool.setMaxThreadCount(1)
+            self._writes[table] = pool
+        self._start(pool, function, args, on_done, on_error, on_progress)
+
+    def is_busy(self):
+        return bool(self._callbacks)
+
+    def wait(self):
+        """Block until every queued call has run.
+
+        Their callbacks are queued on the GUI thread and run once its event
+        loop is back.
+        """
+        for pool in [self._reads] + list(self._writes.values()):
+            pool.waitForDone()
+
+    def _start(self, pool, function, args, on_done, on_error, on_progress):
+        task_id = self._next_id
+        self._next_id += 1
+        was_busy = self.is_busy()
+        self._callbacks[task_id] = (on_done, on_error, on_progress)
+        if not was_busy:
+            self.busy_changed.emit(True)
+        pool.start(_Task(task_id, function, args, self._signals, on_progress is not None))
+
+    def _finish(self, task_id):
+        callbacks = self._callbacks.pop(task_id, (None, None, None))
+        if not self._callbacks:
+            self.busy_changed.emit(False)
+        return callbacks
+
+    def _on_progressed(self, task_id, value):
+        callbacks = self._callbacks.get(task_id)
+        if callbacks is not None and callbacks[2] is not None:
+            callbacks[2](value)
+
+    def _on_finished(self, task_id, result):
+        on_done, _, _ = self._finish(task_id)
+        if on_done is not None:
+            on_done(result)
+
+    def _on_failed(self, task_id, error):
+        _, on_error, _ = self._finish(task_id)
+        if on_error is not None:
+            on_error(error)
+        else:
+            # Raising in a slot would abort the process
+            self.failed.emit(str(error))
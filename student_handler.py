@@ -1,21 +1,33 @@
 import os
-import pandas as pd
-from csv_handler import add_entry, delete_entry, update_entry, list_entries, write_csv
+from storage import add_entry, add_entries, delete_entry, delete_entries, update_entry, list_entries, search_entries, entry_exists, is_referenced, update_references
 
 
 def add_student(student_data):
     add_entry('Student.csv', student_data)
 
+def add_students(students):
+    return add_entries('Student.csv', students)
+
 def delete_student(student_id):
     delete_entry('Student.csv', 'ID Number', student_id)
 
+def delete_students(student_ids):
+    return delete_entries('Student.csv', 'ID Number', student_ids)
+
 def update_student(student_id, updated_data):
     update_entry('Student.csv', 'ID Number', student_id, updated_data)
 
+def student_exists(student_id):
+    return entry_exists('Student.csv', student_id)
+
+def search_students(text, column=None):
+    return search_entries('Student.csv', text, column)
+
 def list_students():
     return list_entries('Student.csv')
 
+def program_has_students(program_code):
+    return is_referenced('Student.csv', 'Program Code', program_code)
+
 def update_student_program_code(old_code, new_code):
-    students = list_students()
-    students.loc[students['Program Code'] == old_code, 'Program Code'] = new_code
-    write_csv('Student.csv', students)
\ No newline at end of file
+    update_references('Student.csv', 'Program Code', old_code, new_code)
\ No newline at end of file
@@ -0,0 +1,35 @@
+import threading
+
+# Listeners are called as listener(filename, change) where change is a dict:
+#   'inserted' / 'updated' / 'removed': row labels of the rows affected
+#   'reset': True when the whole table was reloaded or replaced
+_listeners = []
+_lock = threading.Lock()
+
+
+def subscribe(listener):
+    with _lock:
+        if listener not in _listeners:
+            _listeners.append(listener)
+
+
+def unsubscribe(listener):
+    with _lock:
+        if listener in _listeners:
+            _listeners.remove(listener)
+
+
+def notify(filename, inserted=(), updated=(), removed=(), reset=False):
+    """Tell every listener which rows of filename changed."""
+    change = {
+        'inserted': list(inserted),
+        'updated': list(updated),
+        'removed': list(removed),
+        'reset': reset
+    }
+    if not (reset or change['inserted'] or change['updated'] or change['removed']):
+        return
+    with _lock:
+        listeners = list(_listeners)
+    for listener in listeners:
+        listener(filename, change)
@@ -0,0 +1,136 @@
+import os
+
+import pandas as pd
+
+from college_handler import list_colleges
+from program_handler import list_programs
+from storage import data_lock
+
+# File formats by extension
+EXPORT_FORMATS = {
+    '.csv': 'csv',
+    '.json': 'json',
+    '.parquet': 'parquet'
+}
+
+
+class ExportCancelled(Exception):
+    pass
+
+
+def export_format(path):
+    extension = os.path.splitext(path)[1].lower()
+    try:
+        return EXPORT_FORMATS[extension]
+    except KeyError:
+        raise ValueError(f"Cannot export to '{extension or path}', expected one of: {', '.join(EXPORT_FORMATS)}")
+
+
+def with_program_and_college(student_chunks):
+    """Add each student's program name, college code and college name to a stream of student chunks."""
+    with data_lock():
+        programs = list_programs().drop_duplicates('Code')
+        colleges = list_colleges().drop_duplicates('Code')
+    program_names = pd.Series(programs['Name'].to_numpy(), index=programs['Code'].to_numpy())
+    program_colleges = pd.Series(programs['College'].to_numpy(), index=programs['Code'].to_numpy())
+    college_names = pd.Series(colleges['Name'].to_numpy(), index=colleges['Code'].to_numpy())
+    for chunk in student_chunks:
+        codes = chunk['Program Code'].astype(object)
+        college_codes = codes.map(program_colleges)
+        yield chunk.assign(**{
+            'Program Name': codes.map(program_names),
+            'College': college_codes,
+            'College Name': college_codes.map(college_names)
+        })
+
+
+def export_chunks(chunks, path, progress=None, is_cancelled=None):
+    """Write a stream of DataFrame chunks to path as CSV, JSON (an array of objects) or Parquet.
+
+    Only one chunk is held at a time. progress(rows_written) is called
+    after each chunk; when is_cancelled() returns True the partial file is
+    removed and ExportCancelled is raised. Returns the number of rows written.
+    """
+    file_format = export_format(path)
+    writer = {'csv': _CsvWriter, 'json': _JsonWriter, 'parquet': _ParquetWriter}[file_format](path)
+    written = 0
+    try:
+        for chunk in chunks:
+            if is_cancelled is not None and is_cancelled():
+                raise ExportCancelled()
+            writer.write(chunk)
+            written += len(chunk)
+            if progress is not None:
+                progress(written)
+        writer.close()
+    except BaseException as e:
+        writer.close()
+        if os.path.exists(path):
+            os.remove(path)
+        if isinstance(e, ExportCancelled):
+            raise
+        raise Exception(f"Error exporting to {path}: {e}")
+    return written
+
+
+class _CsvWriter:
+    def __init__(self, path):
+        self.file = open(path, 'w', newline='', encoding='utf-8')
+        self.header = True
+
+    def write(self, chunk):
+        chunk.to_csv(self.file, index=False, header=self.header)
+        self.header = False
+
+    def close(self):
+        self.file.close()
+
+
+class _JsonWriter:
+    def __init__(self, path):
+        self.file = open(path, 'w', encoding='utf-8')
+        self.file.write('[')
+        self.first = True
+
+    def write(self, chunk):
+        if chunk.empty:
+            return
+        # to_json gives "[{...},{...}]"; strip the brackets and join the chunks with commas
+        records = chunk.to_json(orient='records', force_ascii=False)[1:-1]
+        if not self.first:
+            self.file.write(',')
+        self.file.write(records)
+        self.first = False
+
+    def close(self):
+        if not self.file.closed:
+            self.file.write(']')
+            self.file.close()
+
+
+class _ParquetWriter:
+    def __init__(self, path):
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            raise ImportError("Exporting to Parquet needs pyarrow (pip install pyarrow).")
+        self.pyarrow = pyarrow
+        self.path = path
+        self.writer = None
+
+    def write(self, chunk):
+        # Categories differ from chunk to chunk; store plain values so every row group shares one schema
+        chunk = chunk.astype({column: object for column, dtype in chunk.dtypes.items()
+                              if isinstance(dtype, pd.CategoricalDtype)})
+        if self.writer is None:
+            table = self.pyarrow.Table.from_pandas(chunk, preserve_index=False)
+            self.writer = self.pyarrow.parquet.ParquetWriter(self.path, table.schema)
+        else:
+            table = self.pyarrow.Table.from_pandas(chunk, schema=self.writer.schema, preserve_index=False)
+        self.writer.write_table(table)
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
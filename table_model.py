@@ -0,0 +1,534 @@
+from contextlib import nullcontext
+
+import numpy as np
+import pandas as pd
+from PyQt6.QtCore import QAbstractTableModel, QModelIndex, Qt, pyqtSignal
+
+import table_events
+
+
+class SearchCancelled(Exception):
+    pass
+
+
+class SearchSnapshot:
+    """The searchable columns of one frame, safe to read from a worker thread.
+
+    A new snapshot is made whenever the model gets a new frame, so a search
+    that was started on an older snapshot can be recognised as stale. When a
+    search_function is given (text, column or None -> matching row labels)
+    the query is answered by that index instead of scanning the columns.
+    """
+
+    def __init__(self, columns, arrays, labels=None, search_function=None):
+        self.columns = list(columns)
+        self.arrays = arrays
+        self.labels = labels
+        self.search_function = search_function
+        self.row_count = len(arrays[0]) if arrays else 0
+        self._lowered = {}  # column -> lowercased text, built on first search
+
+    def lowered_column(self, column):
+        lowered = self._lowered.get(column)
+        if lowered is None:
+            values = pd.Series(self.arrays[column], dtype=object)
+            lowered = values.where(values.notna(), "").astype(str).str.lower()
+            self._lowered[column] = lowered
+        return lowered
+
+    def match(self, text, search_by="All", is_cancelled=None):
+        """Return a bool per row for rows containing text, or None when text is empty."""
+        needle = text.lower()
+        if not needle:
+            return None
+        wanted = search_by.lower()
+        if self.search_function is not None:
+            return self._indexed_match(text, wanted, is_cancelled)
+        match = np.zeros(self.row_count, dtype=bool)
+        for column, name in enumerate(self.columns):
+            if is_cancelled is not None and is_cancelled():
+                raise SearchCancelled()
+            if wanted == "all" or name.lower() == wanted:
+                match |= self.lowered_column(column).str.contains(needle, regex=False).to_numpy(dtype=bool)
+        return match
+
+    def _indexed_match(self, text, wanted, is_cancelled):
+        column = None
+        if wanted != "all":
+            column = next((name for name in self.columns if name.lower() == wanted), None)
+            if column is None:
+                return np.zeros(self.row_count, dtype=bool)
+        labels = self.search_function(text, column)
+        if is_cancelled is not None and is_cancelled():
+            raise SearchCancelled()
+        return pd.Index(self.labels).isin(list(labels))
+
+
+class DataFrameTableModel(QAbstractTableModel):
+    """Read-only table model that serves cells straight from a DataFrame.
+
+    Nothing is copied into Qt items: the model keeps the column arrays of the
+    frame plus the row order currently shown, and only converts a value to
+    text when the view asks for a visible cell. Searching goes through the
+    table's search index when a search_function is given and falls back to
+    vectorized string operations over the columns otherwise; rows that do
+    not match are simply left out of the visible order.
+
+    reload() reads the frame from source() and, when table is given too,
+    the model follows row-level change events for that table and applies
+    them as inserted/removed/changed rows instead of resetting. Frames and
+    changed rows are copied out under lock on the storage worker, in that
+    table's write queue so they arrive in order, and the model only applies
+    the rows it is handed: the GUI thread never reads the table store.
+    Without a worker they are read on the calling thread. error(message) is
+    emitted when a read fails.
+    """
+
+    _table_changed = pyqtSignal(object)
+    error = pyqtSignal(str)
+
+    def __init__(self, columns, column_alignments=None, search_function=None, table=None, source=None, lock=None,
+                 worker=None, parent=None):
+        super().__init__(parent)
+        self._columns = list(columns)
+        self._alignments = column_alignments or {}
+        self._search_function = search_function
+        self._table = table
+        self._source = source
+        self._lock = lock if lock is not None else nullcontext()
+        self._worker = worker
+        self._frame = None
+        # Rows are kept in slots: the first len(frame) slots follow the frame
+        # set last, rows inserted later get new slots at the end and removed
+        # rows leave theirs unused. The arrays have room for more slots than
+        # are in use so inserts don't copy them.
+        self._arrays = []
+        self._search = SearchSnapshot([], [])
+        self._frame_labels = np.empty(0, dtype=object)  # row label per slot
+        self._size = 0                                # slots in use
+        self._slots = None                            # row label -> slot, built on the first change
+        self._order = np.empty(0, dtype=np.intp)      # every live slot, in sort order
+        self._match = None                            # bool per slot, None when not filtering
+        self._labels = np.empty(0, dtype=object)     # visible row labels in display order
+        self._positions = np.empty(0, dtype=np.intp)  # slots of the visible rows, in display order
+        self._sort_column = None
+        self._sort_order = Qt.SortOrder.AscendingOrder
+        self._search_text = ""
+        self._search_by = "All"
+        if table is not None:
+            # Events may come from a worker thread; the signal hands them to the GUI thread
+            self._table_changed.connect(self.apply_change)
+            listener = self._on_table_changed
+            table_events.subscribe(listener)
+            # Events after the Qt object is gone would reach a deleted model
+            self.destroyed.connect(lambda: table_events.unsubscribe(listener))
+
+    def set_frame(self, frame):
+        """Replace the backing DataFrame and reset the view.
+
+        The frame is copied out on the calling thread, so it must not be
+        changing meanwhile; reload() reads the source on the worker.
+        """
+        self._show(_copy_frame(frame))
+
+    def reload(self):
+        """Read the frame from source() again and reset the view with it."""
+        self._run(self._load, self._search_text, self._search_by, on_done=self._show)
+
+    def _load(self, text, search_by):
+        # Runs on the worker
+        with self._lock:
+            loaded = _copy_frame(self._source())
+        search = SearchSnapshot(loaded['columns'], loaded['arrays'], loaded['labels'], self._search_function)
+        loaded.update(search=search, filter=(text, search_by), match=search.match(text, search_by))
+        return loaded
+
+    def _run(self, function, *args, on_done):
+        if self._worker is None:
+            on_done(function(*args))
+            return
+        on_error = lambda e: self.error.emit(f"Failed to read {self._table or 'the table'}: {e}")
+        if self._table is None:
+            self._worker.read(function, *args, on_done=on_done, on_error=on_error)
+        else:
+            self._worker.write(self._table, function, *args, on_done=on_done, on_error=on_error)
+
+    def _show(self, loaded):
+        self.beginResetModel()
+        self._frame = loaded['frame']
+        self._columns = loaded['columns']
+        self._arrays = loaded['arrays']
+        self._frame_labels = loaded['labels']
+        self._size = len(loaded['labels'])
+        self._slots = None
+        if 'search' in loaded:
+            self._search = loaded['search']
+        else:
+            self._new_search_snapshot()
+        self._order = np.arange(self._size, dtype=np.intp)
+        if self._sort_column is not None:
+            self._apply_sort(self._sort_column, self._sort_order)
+        if loaded.get('filter') == (self._search_text, self._search_by):
+            self._match = loaded['match']
+        else:
+            # Handed a frame, or the filter changed while it was read: scan its columns
+            self._match = self._search_rows(np.arange(self._size, dtype=np.intp))
+        self._update_visible()
+        self.endResetModel()
+
+    def frame(self):
+        return self._frame
+
+    def _on_table_changed(self, filename, change):
+        if filename == self._table:
+            self._table_changed.emit(change)
+
+    def apply_change(self, change):
+        """Apply a table_events change to the rows shown, touching only the affected rows.
+
+        The rows the change touched are read on the worker first, after any
+        reload queued before them.
+        """
+        if self._source is None:
+            return
+        if change['reset']:
+            if self._frame is not None:
+                self.reload()
+            return
+        self._run(self._read_rows, change, list(self._columns), on_done=self._apply_rows)
+
+    def _read_rows(self, change, columns):
+        # Runs on the worker: copies out the rows the change touched that are still in the frame
+        with self._lock:
+            frame = self._source()
+            index = frame.index
+            labels = [label for label in dict.fromkeys(list(change['updated']) + list(change['inserted'])) if label in index]
+            rows = frame.loc[labels, columns]
+            values = [rows[column].to_numpy(dtype=object) for column in columns]
+        return {'change': change, 'frame': frame, 'labels': labels, 'values': values}
+
+    def _apply_rows(self, read):
+        if self._frame is None:
+            return
+        removed = self._release_slots(read['change']['removed'])
+        self._frame = read['frame']
+        updated, inserted, moved = self._store_rows(read['labels'], read['values'])
+        self._new_search_snapshot()
+
+        old_positions = self._positions
+        old_match = self._match
+        # Rows whose sort value changed are taken out and placed again like new ones
+        if len(removed) or len(moved):
+            self._order = self._order[~np.isin(self._order, np.concatenate([removed, moved]))]
+        self._order = self._place(self._order, np.concatenate([moved, inserted]))
+
+        # Only the changed rows are searched again
+        changed = np.concatenate([updated, inserted])
+        matched = self._search_rows(changed)
+        if matched is None:
+            self._match = None
+            hidden = removed
+            shown = inserted
+        else:
+            self._match = np.zeros(self._size, dtype=bool)
+            self._match[:len(old_match)] = old_match if old_match is not None else True
+            was_shown = self._match[updated]
+            self._match[changed] = matched
+            is_shown = self._match[updated]
+            hidden = np.concatenate([removed, updated[was_shown & ~is_shown]])
+            shown = np.concatenate([updated[~was_shown & is_shown], inserted[self._match[inserted]]])
+        if len(moved):
+            # A moved row leaves its old place and shows up at its new one
+            still_shown = moved if self._match is None else moved[self._match[moved]]
+            hidden = np.concatenate([hidden, moved])
+            shown = np.concatenate([shown, still_shown])
+        new_positions = self._order if self._match is None else self._order[self._match[self._order]]
+
+        # Rows that are no longer shown, removed bottom-up so row numbers stay valid
+        for first, last in reversed(_blocks(np.flatnonzero(np.isin(old_positions, hidden)))):
+            self.beginRemoveRows(QModelIndex(), first, last)
+            self._labels = np.delete(self._labels, slice(first, last + 1))
+            self._positions = np.delete(self._positions, slice(first, last + 1))
+            self.endRemoveRows()
+
+        # Rows that became visible, inserted top-down at their final row number
+        appearing = np.isin(new_positions, shown)
+        for first, last in _blocks(np.flatnonzero(appearing)):
+            self.beginInsertRows(QModelIndex(), first, last)
+            self._positions = np.concatenate([new_positions[:last + 1], new_positions[last + 1:][~appearing[last + 1:]]])
+            self._labels = self._frame_labels[self._positions]
+            self.endInsertRows()
+
+        self._positions = new_positions
+        self._labels = self._frame_labels[new_positions]
+
+        changed_rows = np.flatnonzero(np.isin(new_positions, updated) & ~appearing)
+        for first, last in _blocks(changed_rows):
+            self.dataChanged.emit(self.index(first, 0), self.index(last, len(self._columns) - 1))
+
+    def _slot_index(self):
+        if self._slots is None:
+            self._slots = dict(zip(self._frame_labels[:self._size].tolist(), range(self._size)))
+        return self._slots
+
+    def _release_slots(self, labels):
+        """Forget the slots of removed rows; returns them."""
+        slots = self._slot_index()
+        released = [slots.pop(label) for label in labels if label in slots]
+        return np.asarray(released, dtype=np.intp)
+
+    def _store_rows(self, labels, values):
+        """Copy rows read from the frame (values: one array per column) into their slots.
+
+        Returns (updated slots, new slots, updated slots whose value in the
+        sort column changed).
+        """
+        slots = self._slot_index()
+        new_labels = [label for label in labels if label not in slots]
+        self._reserve(len(new_labels))
+        for label in new_labels:
+            slots[label] = self._size
+            self._frame_labels[self._size] = label
+            self._size += 1
+        new = set(new_labels)
+        updated = np.asarray([slots[label] for label in labels if label not in new], dtype=np.intp)
+        moved = np.empty(0, dtype=np.intp)
+        if self._sort_column is not None and len(updated):
+            before = self._arrays[self._sort_column][updated]
+        if labels:
+            positions = np.fromiter((slots[label] for label in labels), dtype=np.intp, count=len(labels))
+            for array, column in zip(self._arrays, values):
+                array[positions] = column
+        if self._sort_column is not None and len(updated):
+            after = self._arrays[self._sort_column][updated]
+            moved = updated[[not _same(old, now) for old, now in zip(before, after)]]
+        return updated, np.asarray([slots[label] for label in new_labels], dtype=np.intp), moved
+
+    def _reserve(self, count):
+        """Make room for count more slots, growing the arrays geometrically."""
+        needed = self._size + count
+        capacity = len(self._frame_labels)
+        if needed <= capacity:
+            return
+        capacity = max(needed, 2 * capacity, 16)
+        self._arrays = [_grown(array, capacity) for array in self._arrays]
+        self._frame_labels = _grown(self._frame_labels, capacity)
+
+    def _search_rows(self, slots):
+        """Whether the rows in slots match the current search, or None when not filtering.
+
+        Their columns are scanned rather than asking the table's search
+        index, which would mean taking the store lock on the GUI thread.
+        """
+        if not self._search_text:
+            return None
+        snapshot = SearchSnapshot(self._columns, [array[slots] for array in self._arrays], self._frame_labels[slots])
+        return snapshot.match(self._search_text, self._search_by)
+
+    def _new_search_snapshot(self):
+        # A new snapshot marks searches running on the old one as stale
+        self._search = SearchSnapshot(
+            self._columns, [array[:self._size] for array in self._arrays],
+            self._frame_labels[:self._size], self._search_function
+        )
+
+    def _place(self, order, inserted):
+        """Add new slots to the sort order, keeping it sorted when a sort column is set."""
+        if len(inserted) == 0:
+            return order
+        if self._sort_column is None:
+            return np.concatenate([order, inserted])
+        values = self._arrays[self._sort_column]
+        descending = self._sort_order == Qt.SortOrder.DescendingOrder
+        try:
+            inserted = sorted(inserted, key=lambda slot: values[slot], reverse=descending)
+            points = [_insertion_point(order, values, values[slot], descending) for slot in inserted]
+        except TypeError:
+            # Values that cannot be compared (mixed types, missing values): show new rows last
+            return np.concatenate([order, inserted])
+        return np.insert(order, points, inserted)
+
+    def _update_visible(self):
+        positions = self._order if self._match is None else self._order[self._match[self._order]]
+        self._positions = positions
+        self._labels = self._frame_labels[positions]
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._labels)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._columns)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == Qt.ItemDataRole.DisplayRole:
+            return self.value(index.row(), index.column())
+        if role == Qt.ItemDataRole.TextAlignmentRole:
+            alignment = self._alignments.get(index.column())
+            if alignment is not None:
+                return alignment | Qt.AlignmentFlag.AlignVCenter
+        return None
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role != Qt.ItemDataRole.DisplayRole:
+            return None
+        if orientation == Qt.Orientation.Horizontal:
+            return self._columns[section] if section < len(self._columns) else None
+        return str(section + 1)
+
+    def value(self, row, column):
+        """Return the text shown at (row, column)."""
+        value = self._arrays[column][self._positions[row]]
+        return "" if pd.isna(value) else str(value)
+
+    def row_data(self, row):
+        """Return a visible row as {column name: text}, as the dialogs expect it."""
+        return {name: self.value(row, column) for column, name in enumerate(self._columns)}
+
+    def export_chunks(self, chunk_rows=50000):
+        """Return the visible rows, in display order, as a stream of DataFrames of at most chunk_rows rows.
+
+        The rows shown now are the ones exported, so the stream can be read
+        on a worker thread. Each chunk is copied out under lock while a
+        storage worker may be changing the frame; rows deleted meanwhile are
+        left out.
+        """
+        return self._export_chunks(self._frame, self._labels, list(self._columns), chunk_rows)
+
+    def _export_chunks(self, frame, labels, columns, chunk_rows):
+        if frame is None:
+            return
+        for start in range(0, len(labels), chunk_rows):
+            with self._lock:
+                positions = frame.index.get_indexer(labels[start:start + chunk_rows])
+                chunk = frame.iloc[positions[positions >= 0]][columns].copy()
+            yield chunk
+
+    def sort(self, column, order=Qt.SortOrder.AscendingOrder):
+        if self._frame is None or column < 0:
+            return
+        self.layoutAboutToBeChanged.emit()
+        self._relayout(lambda: self._apply_sort(column, order))
+        self.layoutChanged.emit()
+
+    def _relayout(self, reorder):
+        """Run reorder() and move persistent indexes (selection, current) along with their rows."""
+        persistent = self.persistentIndexList()
+        old_labels = [self._labels[index.row()] for index in persistent]
+        reorder()
+        if not persistent:
+            return
+        new_rows = pd.Index(self._labels).get_indexer(old_labels)
+        self.changePersistentIndexList(
+            persistent,
+            [self.index(row, index.column()) if row >= 0 else QModelIndex()
+             for index, row in zip(persistent, new_rows)]
+        )
+
+    def set_filter(self, text, search_by="All"):
+        """Show only rows containing text (case-insensitive) in the search_by column, or any column for "All".
+
+        The rows are searched on the worker when there is one.
+        """
+        self._search_text = text
+        self._search_by = search_by
+        if self._frame is None:
+            # Applied once the frame is read
+            return
+        snapshot = self._search
+        if self._worker is None:
+            self.apply_match(snapshot, text, search_by, snapshot.match(text, search_by))
+            return
+        self._worker.read(
+            snapshot.match, text, search_by,
+            on_done=lambda match: self._apply_latest(snapshot, text, search_by, match),
+            on_error=lambda e: None if isinstance(e, SearchCancelled) else self.error.emit(f"Search failed: {e}")
+        )
+
+    def _apply_latest(self, snapshot, text, search_by, match):
+        # A search started before the last set_filter() is no longer wanted
+        if (text, search_by) == (self._search_text, self._search_by):
+            self.apply_match(snapshot, text, search_by, match)
+
+    def current_filter(self):
+        return (self._search_text, self._search_by)
+
+    def search_snapshot(self):
+        return self._search
+
+    def apply_match(self, snapshot, text, search_by, match):
+        """Show the result of snapshot.match(); results computed on an older frame are ignored."""
+        if snapshot is not self._search:
+            return False
+        self._search_text = text
+        self._search_by = search_by
+        self.beginResetModel()
+        self._match = match
+        self._update_visible()
+        self.endResetModel()
+        return True
+
+    def _apply_sort(self, column, order):
+        self._sort_column = column
+        self._sort_order = order
+        values = pd.Series(self._arrays[column][self._order])
+        try:
+            ranking = values.argsort(kind='stable').to_numpy()
+        except TypeError:
+            # Mixed types in one column (e.g. ints read from disk next to strings
+            # added in this session); fall back to comparing their text
+            ranking = values.astype(str).argsort(kind='stable').to_numpy()
+        if order == Qt.SortOrder.DescendingOrder:
+            ranking = ranking[::-1]
+        self._order = self._order[ranking]
+        self._update_visible()
+
+
+def _copy_frame(frame):
+    """Copy a frame's columns and row labels out into arrays the model owns."""
+    columns = list(frame.columns)
+    return {
+        'frame': frame,
+        'columns': columns,
+        # dtype=object keeps nullable integers as ints next to missing values instead of floats
+        'arrays': [frame[column].to_numpy(dtype=object, copy=True) for column in columns],
+        'labels': frame.index.to_numpy(copy=True)
+    }
+
+
+def _same(a, b):
+    if pd.isna(a) or pd.isna(b):
+        return pd.isna(a) and pd.isna(b)
+    return bool(a == b)
+
+
+def _insertion_point(order, values, value, descending):
+    """Binary search for where a row with value goes in order, after its equals."""
+    low, high = 0, len(order)
+    while low < high:
+        middle = (low + high) // 2
+        other = values[order[middle]]
+        if (other > value) if descending else (other <= value):
+            low = middle + 1
+        else:
+            high = middle
+    return low
+
+
+def _grown(array, capacity):
+    grown = np.empty(capacity, dtype=array.dtype)
+    grown[:len(array)] = array
+    return grown
+
+
+def _blocks(rows):
+    """Group sorted row numbers into (first, last) runs of consecutive rows."""
+    blocks = []
+    for row in rows:
+        row = int(row)
+        if blocks and blocks[-1][1] == row - 1:
+            blocks[-1][1] = row
+        else:
+            blocks.append([row, row])
+    return [tuple(block) for block in blocks]
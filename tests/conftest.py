@@ -0,0 +1,20 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import csv_handler
+
+
+@pytest.fixture
+def csv_folder(tmp_path, monkeypatch):
+    """Empty tables in a temp csv-files folder, with the table store reset."""
+    monkeypatch.chdir(tmp_path)
+    csv_handler.invalidate_cache()
+    csv_handler._streamed.clear()
+    csv_handler.ensure_storage()
+    yield tmp_path / csv_handler.CSV_FOLDER
+    csv_handler.invalidate_cache()
+    csv_handler._streamed.clear()
@@ -0,0 +1,56 @@
+import pandas as pd
+import pytest
+
+import validation
+from bulk_import import import_students
+from college_handler import add_college
+from program_handler import add_program
+from student_handler import add_student, list_students
+
+HEADER = 'ID Number,First Name,Last Name,Year Level,Gender,Program Code\n'
+
+
+@pytest.fixture
+def school(csv_folder):
+    add_college({'Code': 'CCS', 'Name': 'Computer Studies'})
+    add_program({'Code': 'BSCS', 'Name': 'Computer Science', 'College': 'CCS'})
+    add_student({
+        'ID Number': '2024-0001', 'First Name': 'Ana', 'Last Name': 'Cruz',
+        'Year Level': '1', 'Gender': 'Female', 'Program Code': 'BSCS'
+    })
+    return csv_folder
+
+
+def test_rejected_rows_are_reported_with_line_and_reason(school, tmp_path):
+    path = tmp_path / 'students.csv'
+    path.write_text(HEADER + (
+        ' 2024-0002 ,Ben,Reyes,2,Male,BSCS\n'
+        '2024-0001,Ana,Cruz,1,Female,BSCS\n'
+        '2024-0003,Cy,Lim,7,Male,BSCS\n'
+        '2024-0004,Di,Tan,3,Female,BSIT\n'
+        '2024-0002,Ben,Again,2,Male,BSCS\n'  # in the next chunk
+    ))
+    progress = []
+
+    accepted, rejected, rejects_path = import_students(str(path), chunk_rows=2, progress=progress.append)
+
+    assert (accepted, rejected) == (1, 4)
+    assert rejects_path == str(tmp_path / 'students.rejects.csv')
+    assert progress == [2, 4, 5]
+    rejects = pd.read_csv(rejects_path, dtype=str)
+    assert list(rejects.columns) == ['Line'] + HEADER.strip().split(',') + ['Reason']
+    assert list(rejects['Line']) == ['3', '4', '5', '6']
+    assert list(rejects['Reason']) == [
+        validation.DUPLICATE_ID_NUMBER, validation.INVALID_YEAR_LEVEL,
+        validation.UNKNOWN_PROGRAM_CODE, validation.REPEATED_ID_NUMBER
+    ]
+    assert list(list_students()['ID Number']) == ['2024-0001', '2024-0002']
+
+
+def test_missing_columns_import_nothing(school, tmp_path):
+    path = tmp_path / 'students.csv'
+    path.write_text('ID Number,First Name\n2024-0002,Ben\n')
+
+    with pytest.raises(Exception, match='missing the columns'):
+        import_students(str(path))
+    assert len(list_students()) == 1
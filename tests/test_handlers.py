@@ -0,0 +1,79 @@
+import pytest
+
+import csv_handler
+import program_handler
+from college_handler import add_college, delete_college, update_college
+from program_handler import add_program, delete_program, update_program
+from student_handler import add_student, list_students
+
+
+@pytest.fixture
+def school(csv_folder):
+    add_college({'Code': 'CCS', 'Name': 'Computer Studies'})
+    add_college({'Code': 'COE', 'Name': 'Engineering'})
+    add_program({'Code': 'BSCS', 'Name': 'Computer Science', 'College': 'CCS'})
+    add_program({'Code': 'BSIT', 'Name': 'Information Technology', 'College': 'CCS'})
+    add_program({'Code': 'BSCE', 'Name': 'Civil Engineering', 'College': 'COE'})
+    for id_number, program_code in [('2024-0001', 'BSCS'), ('2024-0002', 'BSIT'), ('2024-0003', 'BSCS')]:
+        add_student({
+            'ID Number': id_number, 'First Name': 'Ana', 'Last Name': 'Cruz',
+            'Year Level': '1', 'Gender': 'Female', 'Program Code': program_code
+        })
+    return csv_folder
+
+
+def on_disk(filename, column):
+    csv_handler.invalidate_cache(filename)
+    return list(csv_handler.read_csv(filename)[column].astype(str))
+
+
+def test_program_rename_cascades_to_its_students(school):
+    update_program('BSCS', {'Code': 'BSCOMSCI', 'Name': 'Computer Science'})
+
+    assert on_disk('Program.csv', 'Code') == ['BSCOMSCI', 'BSIT', 'BSCE']
+    assert on_disk('Student.csv', 'Program Code') == ['BSCOMSCI', 'BSIT', 'BSCOMSCI']
+    # Both tables went through one multi-table commit
+    assert not (school / 'Program.csv.journal').exists()
+    assert not (school / 'Student.csv.journal').exists()
+
+
+def test_college_rename_cascades_to_its_programs(school):
+    update_college('CCS', {'Code': 'CICS', 'Name': 'Computer Studies'})
+
+    assert on_disk('College.csv', 'Code') == ['CICS', 'COE']
+    assert on_disk('Program.csv', 'College') == ['CICS', 'CICS', 'COE']
+    assert on_disk('Student.csv', 'Program Code') == ['BSCS', 'BSIT', 'BSCS']
+
+
+def test_failed_cascade_rolls_the_rename_back(school, monkeypatch):
+    def fail(old_code, new_code):
+        raise RuntimeError('disk full')
+
+    monkeypatch.setattr(program_handler, 'update_student_program_code', fail)
+    with pytest.raises(RuntimeError):
+        update_program('BSCS', {'Code': 'BSCOMSCI'})
+
+    assert list(csv_handler.read_csv('Program.csv')['Code']) == ['BSCS', 'BSIT', 'BSCE']
+    assert on_disk('Program.csv', 'Code') == ['BSCS', 'BSIT', 'BSCE']
+
+
+def test_referenced_rows_are_not_deleted(school):
+    with pytest.raises(Exception, match='Students are associated'):
+        delete_program('BSIT')
+    with pytest.raises(Exception, match='Programs are associated'):
+        delete_college('COE')
+
+    delete_program('BSCE')
+    delete_college('COE')
+    assert on_disk('Program.csv', 'Code') == ['BSCS', 'BSIT']
+    assert on_disk('College.csv', 'Code') == ['CCS']
+
+
+def test_deleting_in_a_transaction_after_moving_the_references(school):
+    with csv_handler.transaction():
+        csv_handler.update_references('Student.csv', 'Program Code', 'BSIT', 'BSCS')
+        delete_program('BSIT')
+
+    assert list(list_students()['Program Code'].astype(str)) == ['BSCS', 'BSCS', 'BSCS']
+    assert on_disk('Student.csv', 'Program Code') == ['BSCS', 'BSCS', 'BSCS']
+    assert on_disk('Program.csv', 'Code') == ['BSCS', 'BSCE']
@@ -0,0 +1,198 @@
+import json
+import os
+
+import pandas as pd
+import pytest
+
+import csv_handler
+
+
+def student(id_number, year_level='1', program_code='BSCS'):
+    return {
+        'ID Number': id_number, 'First Name': 'Ana', 'Last Name': 'Cruz',
+        'Year Level': year_level, 'Gender': 'Female', 'Program Code': program_code
+    }
+
+
+def reload(filename):
+    csv_handler.invalidate_cache(filename)
+    return csv_handler.read_csv(filename)
+
+
+def test_changes_are_journaled_and_replayed(csv_folder):
+    csv_handler.add_entry('Student.csv', student('2024-0001'))
+    csv_handler.add_entry('Student.csv', student('2024-0002'))
+    csv_handler.update_entry('Student.csv', 'ID Number', '2024-0001', {'Year Level': '3', 'Program Code': 'BSIT'})
+    csv_handler.add_entry('Student.csv', student('2024-0003'))
+    csv_handler.add_entry('Student.csv', student('2024-0004'))
+    csv_handler.delete_entry('Student.csv', 'ID Number', '2024-0002')
+    expected = csv_handler.read_csv('Student.csv').copy()
+
+    assert (csv_folder / 'Student.csv.journal').exists()
+    assert pd.read_csv(csv_folder / 'Student.csv').empty
+    df = reload('Student.csv')
+    pd.testing.assert_frame_equal(df, expected)
+    assert list(df['ID Number']) == ['2024-0001', '2024-0003', '2024-0004']
+    assert str(df['Year Level'].dtype) == 'Int8'
+    assert isinstance(df['Program Code'].dtype, pd.CategoricalDtype)
+    assert csv_handler._tables['Student.csv']['journal'] == 6
+
+
+def test_truncated_record_is_ignored(csv_folder):
+    csv_handler.add_entry('Student.csv', student('2024-0001'))
+    csv_handler.add_entry('Student.csv', student('2024-0002'))
+    # A crash in the middle of appending the third record
+    with open(csv_folder / 'Student.csv.journal', 'a') as file:
+        file.write('{"op": "add", "row": ["2024-00')
+
+    assert list(reload('Student.csv')['ID Number']) == ['2024-0001', '2024-0002']
+
+    # The next record starts on a line of its own
+    csv_handler.add_entry('Student.csv', student('2024-0003'))
+    assert list(reload('Student.csv')['ID Number']) == ['2024-0001', '2024-0002', '2024-0003']
+
+
+def test_journal_is_compacted_into_the_csv(csv_folder):
+    csv_handler.add_entry('College.csv', {'Code': 'CCS', 'Name': 'Computer Studies'})
+    csv_handler.compact()
+
+    assert not (csv_folder / 'College.csv.journal').exists()
+    assert list(pd.read_csv(csv_folder / 'College.csv')['Code']) == ['CCS']
+    assert list(reload('College.csv')['Code']) == ['CCS']
+
+
+def test_added_rows_are_indexed_before_they_join_the_frame(csv_folder):
+    csv_handler.add_entry('Student.csv', student('2024-0001'))
+    csv_handler.search_entries('Student.csv', 'ana')  # builds the search index
+    csv_handler.add_entry('Student.csv', student('2024-0002', year_level='2'))
+    csv_handler.add_entry('Student.csv', student('2024-0003', program_code='BSIT'))
+
+    table = csv_handler._tables['Student.csv']
+    assert len(table['appended']) == 2
+    assert sorted(csv_handler.search_entries('Student.csv', 'ana')) == [0, 1, 2]
+
+    df = csv_handler.read_csv('Student.csv')
+    assert table['appended'] == []
+    assert list(df.index) == [0, 1, 2]
+    assert list(df['Year Level']) == [1, 2, 1]
+    assert str(df['Year Level'].dtype) == 'Int8'
+    assert isinstance(df['Program Code'].dtype, pd.CategoricalDtype)
+    assert csv_handler.get_entry('Student.csv', '2024-0003')['Program Code'] == 'BSIT'
+    pd.testing.assert_frame_equal(reload('Student.csv'), df)
+
+
+def test_rollback_discards_the_block_changes(csv_folder):
+    csv_handler.add_entry('College.csv', {'Code': 'CCS', 'Name': 'Computer Studies'})
+
+    with pytest.raises(RuntimeError):
+        with csv_handler.transaction():
+            csv_handler.add_entry('College.csv', {'Code': 'COE', 'Name': 'Engineering'})
+            csv_handler.add_entry('Program.csv', {'Code': 'BSCE', 'Name': 'Civil Engineering', 'College': 'COE'})
+            raise RuntimeError('cancelled')
+
+    assert list(csv_handler.read_csv('College.csv')['Code']) == ['CCS']
+    assert csv_handler.read_csv('Program.csv').empty
+    assert list(reload('College.csv')['Code']) == ['CCS']
+    assert not os.path.exists(csv_folder / csv_handler.COMMIT_MANIFEST)
+
+
+def test_multi_table_commit_is_written_together(csv_folder):
+    with csv_handler.transaction():
+        csv_handler.add_entry('College.csv', {'Code': 'CCS', 'Name': 'Computer Studies'})
+        csv_handler.add_entry('Program.csv', {'Code': 'BSCS', 'Name': 'Computer Science', 'College': 'CCS'})
+
+    # Both tables were rewritten through the manifest rather than journaled
+    assert not (csv_folder / 'College.csv.journal').exists()
+    assert list(pd.read_csv(csv_folder / 'College.csv')['Code']) == ['CCS']
+    assert list(pd.read_csv(csv_folder / 'Program.csv')['Code']) == ['BSCS']
+
+
+def test_recover_commit_finishes_an_interrupted_commit(csv_folder):
+    csv_handler.add_entry('College.csv', {'Code': 'CCS', 'Name': 'Computer Studies'})
+    college = csv_handler.read_csv('College.csv').copy()
+    college.loc[college['Code'] == 'CCS', 'Code'] = 'CICS'
+    program = pd.DataFrame([{'Code': 'BSCS', 'Name': 'Computer Science', 'College': 'CICS'}])
+    staged = [
+        csv_handler._stage_csv('College.csv', college),
+        csv_handler._stage_csv('Program.csv', program)
+    ]
+    journal = csv_handler._journal_path('College.csv')
+    # The process died after writing the manifest and renaming the first file
+    with open(csv_folder / csv_handler.COMMIT_MANIFEST, 'w') as file:
+        json.dump({'staged': staged, 'journals': [journal]}, file)
+    os.replace(*staged[0])
+
+    csv_handler.recover_commit()
+
+    assert not (csv_folder / csv_handler.COMMIT_MANIFEST).exists()
+    assert not os.path.exists(journal)
+    assert not any(name.endswith('.tmp') for name in os.listdir(csv_folder))
+    assert list(reload('College.csv')['Code']) == ['CICS']
+    assert list(reload('Program.csv')['College']) == ['CICS']
+
+
+def test_recover_commit_drops_a_commit_that_never_started(csv_folder):
+    csv_handler.add_entry('College.csv', {'Code': 'CCS', 'Name': 'Computer Studies'})
+    # Staged, but the process died before the manifest was in place
+    csv_handler._stage_csv('College.csv', pd.DataFrame(columns=csv_handler.TABLE_COLUMNS['College.csv']))
+    with open(csv_folder / (csv_handler.COMMIT_MANIFEST + '.tmp'), 'w') as file:
+        file.write('{"staged": [')
+
+    csv_handler.recover_commit()
+
+    assert not any(name.endswith('.tmp') for name in os.listdir(csv_folder))
+    assert list(reload('College.csv')['Code']) == ['CCS']
+
+
+def test_streamed_table_is_journaled_without_loading(csv_folder):
+    csv_handler.add_entry('Student.csv', student('2024-0001'))
+    csv_handler.compact()
+    csv_handler.stream_table('Student.csv')
+
+    csv_handler.add_entry('Student.csv', student('2024-0002'))
+    csv_handler.update_entry('Student.csv', 'ID Number', '2024-0001', {'Year Level': '3'})
+    assert csv_handler.delete_entries('Student.csv', 'ID Number', ['2024-0002', '2024-0009']) == 1
+    csv_handler.add_entry('Student.csv', student('2024-0003'))
+
+    assert 'Student.csv' not in csv_handler._tables
+    assert len(pd.read_csv(csv_folder / 'Student.csv')) == 1
+    assert csv_handler.existing_keys('Student.csv', ['2024-0001', '2024-0002', '2024-0003']) == {'2024-0001', '2024-0003'}
+    assert csv_handler.get_entry('Student.csv', '2024-0001')['Year Level'] == '3'
+    assert csv_handler.is_referenced('Student.csv', 'Program Code', 'BSCS')
+    assert 'Student.csv' not in csv_handler._tables
+
+    csv_handler._streamed.clear()
+    df = reload('Student.csv')
+    assert list(df['ID Number']) == ['2024-0001', '2024-0003']
+    assert list(df['Year Level']) == [3, 1]
+
+
+def test_streamed_table_joins_a_multi_table_commit_through_its_journal(csv_folder):
+    csv_handler.add_entry('Program.csv', {'Code': 'BSCS', 'Name': 'Computer Science', 'College': 'CCS'})
+    csv_handler.add_entry('Student.csv', student('2024-0001'))
+    csv_handler.stream_table('Student.csv')
+
+    with csv_handler.transaction():
+        csv_handler.update_entry('Program.csv', 'Code', 'BSCS', {'Code': 'BSCS2'})
+        csv_handler.update_references('Student.csv', 'Program Code', 'BSCS', 'BSCS2')
+
+    assert not (csv_folder / 'Program.csv.journal').exists()
+    assert not os.path.exists(csv_folder / csv_handler.COMMIT_MANIFEST)
+    assert [record['op'] for record in csv_handler.journal_records('Student.csv')] == ['add', 'update']
+    csv_handler._streamed.clear()
+    assert list(reload('Student.csv')['Program Code']) == ['BSCS2']
+
+
+def test_streamed_compaction_keeps_records_appended_meanwhile(csv_folder):
+    csv_handler.stream_table('Student.csv')
+    csv_handler.add_entry('Student.csv', student('2024-0001'))
+    csv_handler.add_entry('Student.csv', student('2024-0002'))
+    staged = csv_handler.stage_compaction('Student.csv')
+    csv_handler.delete_entry('Student.csv', 'ID Number', '2024-0001')
+
+    assert csv_handler.commit_compaction(staged)
+
+    assert list(pd.read_csv(csv_folder / 'Student.csv')['ID Number']) == ['2024-0001', '2024-0002']
+    assert [record['op'] for record in csv_handler.journal_records('Student.csv')] == ['delete']
+    csv_handler._streamed.clear()
+    assert list(reload('Student.csv')['ID Number']) == ['2024-0002']
@@ -0,0 +1,45 @@
+import pandas as pd
+
+import csv_handler
+from paged_table import JournalOverlay, PagedCSV
+
+
+def student(id_number, first_name='Ana', program_code='BSCS'):
+    return {
+        'ID Number': id_number, 'First Name': first_name, 'Last Name': 'Cruz',
+        'Year Level': '1', 'Gender': 'Female', 'Program Code': program_code
+    }
+
+
+def rows(paged, overlay):
+    frames = [overlay.apply(start, frame) for start, frame in paged.chunks()]
+    return pd.concat(frames).values.tolist() + overlay.added
+
+
+def test_extended_overlay_matches_one_laid_over_every_record(csv_folder):
+    csv_handler.add_entries('Student.csv', [student(f'2024-000{number}') for number in range(1, 6)])
+    csv_handler.compact()
+    csv_handler.stream_table('Student.csv')
+    csv_handler.update_entry('Student.csv', 'ID Number', '2024-0002', {'First Name': 'Ben'})
+    csv_handler.update_entry('Student.csv', 'ID Number', '2024-0003', {'ID Number': '2024-0009'})
+    csv_handler.add_entry('Student.csv', student('2024-0010'))
+    csv_handler.delete_entry('Student.csv', 'ID Number', '2024-0001')
+    # Picks the renamed row by its new key, and the added one
+    csv_handler.update_entry('Student.csv', 'ID Number', '2024-0009', {'First Name': 'Cy'})
+    csv_handler.update_entry('Student.csv', 'Program Code', 'BSCS', {'Program Code': 'BSIT'})
+    csv_handler.delete_entry('Student.csv', 'ID Number', '2024-0010')
+    records = csv_handler.journal_records('Student.csv')
+
+    paged = PagedCSV(str(csv_folder / 'Student.csv'))
+    try:
+        overlay = JournalOverlay(paged, records[:2]).extended(records[2:5]).extended(records[5:])
+        assert overlay.records == len(records)
+        assert rows(paged, overlay) == rows(paged, JournalOverlay(paged, records))
+        assert rows(paged, overlay) == [
+            ['2024-0002', 'Ben', 'Cruz', '1', 'Female', 'BSIT'],
+            ['2024-0009', 'Cy', 'Cruz', '1', 'Female', 'BSIT'],
+            ['2024-0004', 'Ana', 'Cruz', '1', 'Female', 'BSIT'],
+            ['2024-0005', 'Ana', 'Cruz', '1', 'Female', 'BSIT'],
+        ]
+    finally:
+        paged.close()
@@ -0,0 +1,42 @@
+import pandas as pd
+
+from search_index import COMPACT_SLACK, SearchIndex
+
+
+def frame(rows, start=0):
+    return pd.DataFrame(rows, columns=['ID Number', 'Program Code'], index=range(start, start + len(rows)))
+
+
+def test_search_finds_added_rows_and_drops_removed_ones():
+    index = SearchIndex.from_frame(frame([['2024-0001', 'BSCS'], ['2024-0002', 'BSIT']]))
+    index.add([2], frame([['2024-0003', 'BSCS']], start=2))
+    index.remove([0])
+
+    assert index.search('bscs') == {2}
+    assert index.search('2024', 'ID Number') == {1, 2}
+    assert index.search('bscs', 'ID Number') == set()
+
+
+def test_updates_reuse_the_row_slot():
+    index = SearchIndex.from_frame(frame([['2024-0001', 'BSCS'], ['2024-0002', 'BSIT']]))
+    for number in range(3 * COMPACT_SLACK):
+        index.remove([1])
+        index.add([1], frame([[f'2025-{number:04d}', 'BSIT']], start=1))
+
+    assert index._size == 2
+    assert len(index._texts['ID Number']) <= 2 * 2 + COMPACT_SLACK + 1
+    assert index.search(f'2025-{3 * COMPACT_SLACK - 1:04d}') == {1}
+    assert index.search('2025-0000') == set()
+    assert index.search('bsit') == {1}
+
+
+def test_trigram_indexed_column_finds_values_added_later():
+    rows = [[f'2024-{number:04d}', 'BSCS' if number % 2 else 'BSIT'] for number in range(6)]
+    index = SearchIndex.from_frame(frame(rows))
+    assert 'Program Code' in index._trigrams
+    index.add([6, 7], frame([['2024-0006', 'BSPSY'], ['2024-0007', None]], start=6))
+
+    assert index.search('psy') == {6}
+    assert index.search('Sp', 'Program Code') == {6}  # shorter than a trigram
+    assert index.search('bsit', 'Program Code') == {0, 2, 4}
+    assert 7 in index.search('2024-0007')
@@ -0,0 +1,65 @@
+import json
+
+import pandas as pd
+import pytest
+
+from college_handler import add_college
+from program_handler import add_program
+from table_export import ExportCancelled, export_chunks, export_format, with_program_and_college
+
+
+def chunks():
+    yield pd.DataFrame({'ID Number': ['2024-0001', '2024-0002'], 'Year Level': pd.array([1, None], dtype='Int8')})
+    yield pd.DataFrame({'ID Number': ['2024-0003'], 'Year Level': pd.array([4], dtype='Int8')})
+
+
+def test_export_format_follows_the_extension():
+    assert export_format('out.CSV') == 'csv'
+    assert export_format('out.json') == 'json'
+    with pytest.raises(ValueError, match='.xlsx'):
+        export_format('out.xlsx')
+
+
+def test_csv_export_writes_one_header(tmp_path):
+    path = tmp_path / 'out.csv'
+    assert export_chunks(chunks(), str(path)) == 3
+    assert path.read_text().splitlines() == ['ID Number,Year Level', '2024-0001,1', '2024-0002,', '2024-0003,4']
+
+
+def test_json_export_is_one_array_of_records(tmp_path):
+    path = tmp_path / 'out.json'
+    progress = []
+    export_chunks(chunks(), str(path), progress=progress.append)
+
+    assert json.loads(path.read_text()) == [
+        {'ID Number': '2024-0001', 'Year Level': 1},
+        {'ID Number': '2024-0002', 'Year Level': None},
+        {'ID Number': '2024-0003', 'Year Level': 4}
+    ]
+    assert progress == [2, 3]
+
+
+def test_parquet_export_keeps_every_chunk(tmp_path):
+    pytest.importorskip('pyarrow')
+    path = tmp_path / 'out.parquet'
+    export_chunks(chunks(), str(path))
+    assert list(pd.read_parquet(path)['ID Number']) == ['2024-0001', '2024-0002', '2024-0003']
+
+
+def test_cancelled_export_leaves_no_file(tmp_path):
+    path = tmp_path / 'out.csv'
+    with pytest.raises(ExportCancelled):
+        export_chunks(chunks(), str(path), is_cancelled=lambda: path.exists())
+    assert not path.exists()
+
+
+def test_students_get_their_program_and_college(csv_folder):
+    add_college({'Code': 'CCS', 'Name': 'Computer Studies'})
+    add_program({'Code': 'BSCS', 'Name': 'Computer Science', 'College': 'CCS'})
+    students = pd.DataFrame({'ID Number': ['2024-0001', '2024-0002'], 'Program Code': ['BSCS', 'BSXX']})
+
+    chunk = next(with_program_and_college([students]))
+    assert chunk.iloc[0][['Program Name', 'College', 'College Name']].tolist() == [
+        'Computer Science', 'CCS', 'Computer Studies'
+    ]
+    assert chunk.iloc[1][['Program Name', 'College', 'College Name']].isna().all()
@@ -0,0 +1,68 @@
+import os
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+import pandas as pd
+import pytest
+from PyQt6.QtCore import Qt
+from PyQt6.QtTest import QAbstractItemModelTester
+from PyQt6.QtWidgets import QApplication
+
+from table_model import DataFrameTableModel
+
+
+@pytest.fixture(scope='module')
+def app():
+    return QApplication.instance() or QApplication([])
+
+
+@pytest.fixture
+def students(app):
+    frame = pd.DataFrame({'ID Number': ['2024-0001', '2024-0002', '2024-0003'], 'First Name': ['Ana', 'Ben', 'Cy']})
+    model = DataFrameTableModel(list(frame.columns), table='Student.csv', source=lambda: frame)
+    model.tester = QAbstractItemModelTester(model, QAbstractItemModelTester.FailureReportingMode.Fatal)
+    model.set_frame(frame)
+    return frame, model
+
+
+def change(inserted=(), removed=(), updated=()):
+    return {'reset': False, 'inserted': list(inserted), 'removed': list(removed), 'updated': list(updated)}
+
+
+def shown(model, column=0):
+    return [model.value(row, column) for row in range(model.rowCount())]
+
+
+def test_updating_the_sort_column_moves_the_row(students):
+    frame, model = students
+    model.sort(1, Qt.SortOrder.AscendingOrder)
+
+    frame.loc[0, 'First Name'] = 'Dee'
+    model.apply_change(change(updated=[0]))
+
+    assert shown(model, 1) == ['Ben', 'Cy', 'Dee']
+    assert shown(model) == ['2024-0002', '2024-0003', '2024-0001']
+
+
+def test_inserted_rows_are_sorted_into_place_and_filtered(students):
+    frame, model = students
+    model.sort(1, Qt.SortOrder.DescendingOrder)
+    model.set_filter('2024')
+
+    frame.loc[3] = ['2024-0004', 'Bea']
+    frame.loc[4] = ['2023-0005', 'Zoe']
+    model.apply_change(change(inserted=[3, 4]))
+
+    assert shown(model, 1) == ['Cy', 'Ben', 'Bea', 'Ana']
+
+
+def test_removed_and_updated_rows_follow_the_filter(students):
+    frame, model = students
+    model.set_filter('b')
+
+    frame.drop([1], inplace=True)
+    frame.loc[2, 'First Name'] = 'Bo'
+    model.apply_change(change(removed=[1], updated=[2]))
+
+    assert shown(model) == ['2024-0003']
+    assert shown(model, 1) == ['Bo']
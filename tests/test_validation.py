@@ -0,0 +1,100 @@
+import pandas as pd
+import pytest
+
+import validation
+from college_handler import add_college
+from program_handler import add_program
+from student_handler import add_student
+from validation import validate_colleges, validate_programs, validate_students
+
+
+@pytest.fixture
+def school(csv_folder):
+    add_college({'Code': 'CCS', 'Name': 'Computer Studies'})
+    add_program({'Code': 'BSCS', 'Name': 'Computer Science', 'College': 'CCS'})
+    add_student({
+        'ID Number': '2024-0001', 'First Name': 'Ana', 'Last Name': 'Cruz',
+        'Year Level': '1', 'Gender': 'Female', 'Program Code': 'BSCS'
+    })
+    return csv_folder
+
+
+def student(**changes):
+    row = {
+        'ID Number': '2024-0002', 'First Name': 'Ben', 'Last Name': 'Reyes',
+        'Year Level': '2', 'Gender': 'Male', 'Program Code': 'BSCS'
+    }
+    row.update(changes)
+    return row
+
+
+# The checks the student dialog made one row at a time before they were vectorized
+@pytest.mark.parametrize('changes, error', [
+    ({}, ''),
+    ({'ID Number': '2024-1'}, validation.INVALID_ID_NUMBER),
+    ({'ID Number': '24-00001'}, validation.INVALID_ID_NUMBER),
+    ({'ID Number': '2024-00011'}, validation.INVALID_ID_NUMBER),
+    ({'Year Level': '5'}, validation.INVALID_YEAR_LEVEL),
+    ({'Year Level': 'one'}, validation.INVALID_YEAR_LEVEL),
+    ({'Program Code': 'B'}, validation.INVALID_PROGRAM_CODE),
+    ({'Program Code': 'BSCS2'}, validation.INVALID_PROGRAM_CODE),
+    ({'Program Code': 'BS-IT'}, validation.UNKNOWN_PROGRAM_CODE),
+    ({'Last Name': ''}, validation.EMPTY_FIELD),
+    ({'ID Number': '2024-0001'}, validation.DUPLICATE_ID_NUMBER),
+])
+def test_student_rules(school, changes, error):
+    assert validate_students([student(**changes)]).iloc[0] == error
+
+
+def test_student_errors_per_row_in_check_order(school):
+    rows = pd.DataFrame([
+        student(**{'ID Number': 'x', 'Year Level': ''}),  # empty fields come first
+        student(**{'ID Number': 'x', 'Year Level': '9'}),
+        student(**{'ID Number': '2024-0003'}),
+        student(**{'ID Number': '2024-0003'}),
+        student(**{'ID Number': '2024-0001'}),
+    ], index=[10, 11, 12, 13, 14])
+    errors = validate_students(rows)
+
+    assert list(errors.index) == [10, 11, 12, 13, 14]
+    assert list(errors) == [
+        validation.EMPTY_FIELD, validation.INVALID_ID_NUMBER, '',
+        validation.REPEATED_ID_NUMBER, validation.DUPLICATE_ID_NUMBER
+    ]
+
+
+def test_students_own_id_is_not_taken(school):
+    assert validate_students([student(**{'ID Number': '2024-0001'})], ignore_ids=['2024-0001']).iloc[0] == ''
+    assert validate_students([student(**{'ID Number': '2024-0001'})], check_stored=False).iloc[0] == ''
+
+
+def test_program_rules(school):
+    rows = [
+        {'Code': 'BSIT', 'Name': 'Information Technology', 'College': 'CCS'},
+        {'Code': 'BS1T', 'Name': 'Other', 'College': 'CCS'},
+        {'Code': 'BSA', 'Name': 'Accountancy', 'College': 'CBA'},
+        {'Code': 'BSCS', 'Name': 'Other', 'College': 'CCS'},
+        {'Code': 'BSN', 'Name': 'Computer Science', 'College': 'CCS'},
+        {'Code': 'BSIT', 'Name': 'Other IT', 'College': 'CCS'},
+        {'Code': 'BSEE', 'Name': '', 'College': 'CCS'},
+    ]
+    assert list(validate_programs(rows)) == [
+        '', validation.INVALID_PROGRAM_CODE, validation.UNKNOWN_COLLEGE_CODE, validation.DUPLICATE_CODE,
+        validation.DUPLICATE_NAME, validation.REPEATED_CODE, validation.EMPTY_FIELD
+    ]
+    assert validate_programs(rows[3:4], ignore_codes=['BSCS']).iloc[0] == ''
+
+
+def test_college_rules(school):
+    rows = [
+        {'Code': 'COE', 'Name': 'Engineering'},
+        {'Code': 'C0E', 'Name': 'Other'},
+        {'Code': 'CCS', 'Name': 'Other'},
+        {'Code': 'CBA', 'Name': 'Computer Studies'},
+        {'Code': 'CAS', 'Name': 'Engineering'},
+    ]
+    assert list(validate_colleges(rows)) == [
+        '', validation.INVALID_COLLEGE_CODE, validation.DUPLICATE_CODE,
+        validation.DUPLICATE_NAME, validation.REPEATED_NAME
+    ]
+    assert validate_colleges(rows[2:3], ignore_codes=['CCS']).iloc[0] == ''
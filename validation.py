@@ -0,0 +1,150 @@
+import numpy as np
+import pandas as pd
+
+from csv_handler import TABLE_COLUMNS
+from reference_data import college_code_set, college_names, program_code_set, program_names
+from storage import data_lock, existing_keys, list_entries
+
+# Error codes returned for each row; '' means the row is valid. A row gets the
+# code of the first check it fails, in the order they are listed per table.
+# Values are checked as given, so callers strip their input first.
+EMPTY_FIELD = "empty field"
+INVALID_ID_NUMBER = "invalid ID Number"
+INVALID_YEAR_LEVEL = "invalid Year Level"
+INVALID_PROGRAM_CODE = "invalid Program Code"
+UNKNOWN_PROGRAM_CODE = "unknown Program Code"
+DUPLICATE_ID_NUMBER = "duplicate ID Number"
+REPEATED_ID_NUMBER = "duplicate ID Number in batch"
+INVALID_COLLEGE_CODE = "invalid College Code"
+UNKNOWN_COLLEGE_CODE = "unknown College Code"
+DUPLICATE_CODE = "duplicate Code"
+DUPLICATE_NAME = "duplicate Name"
+REPEATED_CODE = "duplicate Code in batch"
+REPEATED_NAME = "duplicate Name in batch"
+
+ID_PATTERN = r"\d{4}-\d{4}"
+PROGRAM_CODE_PATTERN = r"[A-Za-z\- ]{2,10}"
+COLLEGE_CODE_PATTERN = r"[A-Za-z]+"
+YEAR_LEVELS = ['1', '2', '3', '4']
+
+
+def _text(rows, columns):
+    """Return the columns of rows (a DataFrame or a list of dicts) as text, '' where missing."""
+    rows = pd.DataFrame(rows)
+    missing = [column for column in columns if column not in rows.columns]
+    if missing:
+        raise ValueError(f"Missing columns: {', '.join(missing)}")
+    text = {}
+    for column in columns:
+        values = rows[column]
+        if not pd.api.types.is_string_dtype(values.dtype):
+            # e.g. the nullable Year Level of a stored table
+            values = values.astype(object).where(values.notna(), '').astype(str)
+        text[column] = values.fillna('')
+    return pd.DataFrame(text, index=rows.index)
+
+
+def _any_empty(frame):
+    return np.logical_or.reduce([(frame[column] == '').to_numpy(dtype=bool) for column in frame.columns])
+
+
+def _first_error(checks, index):
+    # np.select picks the first failing check of each row
+    return pd.Series(
+        np.select([np.asarray(failed, dtype=bool) for failed, _ in checks], [code for _, code in checks], default=''),
+        index=index, dtype=object
+    )
+
+
+def _stored(values, keys, ignore):
+    """Which values are already in keys, not counting the ones in ignore."""
+    return values.isin(keys) & ~values.isin(list(ignore))
+
+
+def validate_students(rows, check_stored=True, ignore_ids=()):
+    """Return an error code per row of candidate students ('' when valid).
+
+    Checks every field is filled, the ID and program code formats, the year
+    level, that the program exists, that the ID is not stored yet (unless
+    check_stored is False, as when scanning the stored table itself; IDs in
+    ignore_ids are the rows' own) and that it is not repeated in the batch.
+    """
+    students = _text(rows, TABLE_COLUMNS['Student.csv'])
+    ids = students['ID Number']
+    program_codes = students['Program Code']
+    checks = [
+        (_any_empty(students), EMPTY_FIELD),
+        (~ids.str.fullmatch(ID_PATTERN), INVALID_ID_NUMBER),
+        (~students['Year Level'].isin(YEAR_LEVELS), INVALID_YEAR_LEVEL),
+        (~program_codes.str.fullmatch(PROGRAM_CODE_PATTERN), INVALID_PROGRAM_CODE),
+        (~program_codes.isin(program_code_set()), UNKNOWN_PROGRAM_CODE)
+    ]
+    if check_stored:
+        # Only this batch's IDs are looked up in the student key index
+        taken = existing_keys('Student.csv', ids.unique().tolist())
+        checks.append((_stored(ids, taken, ignore_ids), DUPLICATE_ID_NUMBER))
+    checks.append((ids.duplicated(), REPEATED_ID_NUMBER))
+    return _first_error(checks, students.index)
+
+
+def validate_programs(rows, check_stored=True, ignore_codes=(), ignore_names=()):
+    """Return an error code per row of candidate programs ('' when valid)."""
+    programs = _text(rows, TABLE_COLUMNS['Program.csv'])
+    codes = programs['Code']
+    names = programs['Name']
+    checks = [
+        (_any_empty(programs), EMPTY_FIELD),
+        (~codes.str.fullmatch(PROGRAM_CODE_PATTERN), INVALID_PROGRAM_CODE),
+        (~programs['College'].isin(college_code_set()), UNKNOWN_COLLEGE_CODE)
+    ]
+    if check_stored:
+        checks += [
+            (_stored(codes, program_code_set(), ignore_codes), DUPLICATE_CODE),
+            (_stored(names, program_names(), ignore_names), DUPLICATE_NAME)
+        ]
+    checks += [(codes.duplicated(), REPEATED_CODE), (names.duplicated(), REPEATED_NAME)]
+    return _first_error(checks, programs.index)
+
+
+def validate_colleges(rows, check_stored=True, ignore_codes=(), ignore_names=()):
+    """Return an error code per row of candidate colleges ('' when valid)."""
+    colleges = _text(rows, TABLE_COLUMNS['College.csv'])
+    codes = colleges['Code']
+    names = colleges['Name']
+    checks = [
+        (_any_empty(colleges), EMPTY_FIELD),
+        (~codes.str.fullmatch(COLLEGE_CODE_PATTERN), INVALID_COLLEGE_CODE)
+    ]
+    if check_stored:
+        checks += [
+            (_stored(codes, college_code_set(), ignore_codes), DUPLICATE_CODE),
+            (_stored(names, college_names(), ignore_names), DUPLICATE_NAME)
+        ]
+    checks += [(codes.duplicated(), REPEATED_CODE), (names.duplicated(), REPEATED_NAME)]
+    return _first_error(checks, colleges.index)
+
+
+VALIDATORS = {
+    'Student.csv': validate_students,
+    'Program.csv': validate_programs,
+    'College.csv': validate_colleges
+}
+
+
+def scan_table(filename):
+    """Validate every stored row of a table; returns the error code per row label."""
+    with data_lock():
+        rows = list_entries(filename).copy()
+    return VALIDATORS[filename](rows, check_stored=False)
+
+
+if __name__ == "__main__":
+    from storage import ensure_storage
+
+    ensure_storage()
+    for filename in VALIDATORS:
+        errors = scan_table(filename)
+        failed = errors[errors != '']
+        print(f"{filename}: {len(errors)} rows, {len(failed)} with errors")
+        for code, count in failed.value_counts().items():
+            print(f"  {count:>8}  {code}")